@@ -0,0 +1,112 @@
+from typing import Optional
+import httpx
+from fastapi import Request
+from kubernetes import client
+
+from services.informer import InformerCache
+from services.discovery import DiscoveryIndex
+from services.sanitizer import Sanitizer
+from services.comparison import ComparisonEngine
+from services.capacity import CapacityService, CapacityReportStore
+from services.troubleshooter import Troubleshooter
+from services.kb import KnowledgeBase
+from utils.offload import BlockingExecutor
+from utils.singleflight import SingleFlight
+from utils.kube import ClientManager
+from utils.cache import TTLCache
+
+def get_informers(request: Request) -> Optional[InformerCache]:
+    """
+    FastAPI dependency returning the shared informer cache, if one was started
+    """
+    return getattr(request.app.state, "informers", None)
+
+def get_kube_executor(request: Request) -> BlockingExecutor:
+    """
+    FastAPI dependency returning the shared executor for blocking Kubernetes client calls
+    """
+    return request.app.state.kube_executor
+
+def get_analysis_executor(request: Request) -> BlockingExecutor:
+    """
+    FastAPI dependency returning the executor for CPU-bound troubleshooting, KB search, comparison and export work
+    """
+    return request.app.state.analysis_executor
+
+def get_kube_flight(request: Request) -> SingleFlight:
+    """
+    FastAPI dependency returning the coalescer shared by identical concurrent apiserver reads
+    """
+    return request.app.state.kube_flight
+
+def get_fast_json(request: Request) -> bool:
+    """
+    FastAPI dependency telling whether trusted apiserver data skips response_model validation (server.fast_json)
+    """
+    return getattr(request.app.state, "fast_json", False)
+
+def get_client_manager(request: Request) -> ClientManager:
+    """
+    FastAPI dependency returning the application-scoped Kubernetes client manager
+    """
+    return request.app.state.kube_clients
+
+def get_api_client(request: Request) -> client.ApiClient:
+    """
+    FastAPI dependency returning the shared, pooled Kubernetes ApiClient
+    """
+    return request.app.state.kube_clients.api_client
+
+def get_cluster_info_cache(request: Request) -> TTLCache:
+    """
+    FastAPI dependency returning the cache holding the combined ClusterInfo
+    """
+    return request.app.state.cluster_info_cache
+
+def get_discovery(request: Request) -> DiscoveryIndex:
+    """
+    FastAPI dependency returning the kind to API resource discovery index
+    """
+    return request.app.state.discovery
+
+def get_sanitizer(request: Request) -> Sanitizer:
+    """
+    FastAPI dependency returning the metadata cleaner compiled from features.metadata_cleaner.strip_fields
+    """
+    return request.app.state.sanitizer
+
+def get_comparison_engine(request: Request) -> Optional[ComparisonEngine]:
+    """
+    FastAPI dependency returning the cluster comparison engine, or None when the feature is disabled
+    """
+    return getattr(request.app.state, "comparison", None)
+
+def get_capacity_service(request: Request) -> Optional[CapacityService]:
+    """
+    FastAPI dependency returning the node capacity report service, or None when the feature is disabled
+    """
+    return getattr(request.app.state, "capacity", None)
+
+def get_capacity_store(request: Request) -> Optional[CapacityReportStore]:
+    """
+    FastAPI dependency returning the per-cluster capacity report partitions, or None when not configured
+    """
+    return getattr(request.app.state, "capacity_store", None)
+
+def get_troubleshooter(request: Request) -> Optional[Troubleshooter]:
+    """
+    FastAPI dependency returning the event-driven troubleshooter, or None when the feature is disabled
+    """
+    return getattr(request.app.state, "troubleshooter", None)
+
+def get_knowledge_base(request: Request) -> Optional[KnowledgeBase]:
+    """
+    FastAPI dependency returning the local KB search index, or None when KB search is disabled
+    """
+    return getattr(request.app.state, "kb", None)
+
+def get_http_client(request: Request) -> httpx.AsyncClient:
+    """
+    FastAPI dependency returning the shared client for outbound HTTP calls
+    """
+    return request.app.state.http_client
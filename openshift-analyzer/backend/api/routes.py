@@ -1,12 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
-from kubernetes import client, config
+import asyncio
+import logging
+import os
+from fastapi import APIRouter, Depends, HTTPException, Header, Path, Query, Response
+from fastapi.responses import StreamingResponse, FileResponse
+from starlette.background import BackgroundTask
+from kubernetes import client
 from kubernetes.client.rest import ApiException
-import yaml
+from kubernetes.config.config_exception import ConfigException
 import json
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel
+from typing import List, Dict, Any, Optional, Callable, Iterator, AsyncIterator
+from pydantic import BaseModel, Field
+
+from api.dependencies import (
+    get_informers,
+    get_kube_executor,
+    get_analysis_executor,
+    get_kube_flight,
+    get_fast_json,
+    get_api_client,
+    get_cluster_info_cache,
+    get_discovery,
+    get_sanitizer,
+    get_comparison_engine,
+    get_capacity_service,
+    get_capacity_store,
+    get_troubleshooter,
+    get_knowledge_base,
+)
+from services.informer import InformerCache
+from services.discovery import DiscoveryIndex
+from services.sanitizer import Sanitizer
+from services.comparison import ComparisonEngine, Comparison
+from services.capacity import CapacityService, CapacityReportStore, export_file, report_rows, MEDIA_TYPES
+from services.export import ManifestExporter, yaml_stream, tar_stream
+from services.troubleshooter import Troubleshooter
+from services.kb import KnowledgeBase
+from utils.offload import BlockingExecutor
+from utils.singleflight import SingleFlight, FlightKey, kube_read_key
+from utils.kube import resource_path, get_json
+from utils.cache import TTLCache
+from utils.etag import make_etag, etag_matches, not_modified, set_etag
+from utils.responses import fast_json
 
 router = APIRouter()
+logger = logging.getLogger("openshift-analyzer")
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+DEFAULT_PAGE_SIZE = 500
+CLUSTER_INFO_CACHE_KEY = "cluster"
 
 # Models
 class Resource(BaseModel):
@@ -39,60 +80,94 @@ class OperatorInfo(BaseModel):
     channel: Optional[str] = None
     csv_name: Optional[str] = None
 
+class ExportRequest(BaseModel):
+    """Bulk export request"""
+    namespace: str
+    kinds: List[str] = Field(..., min_items=1)
+    label_selector: Optional[str] = None
+    format: str = Field("yaml", regex="^(yaml|tar)$")
+
+class ComparisonRequest(BaseModel):
+    """Cross-cluster comparison request"""
+    contexts: List[str] = Field(..., min_items=2, description="Kubeconfig contexts to compare; 'in-cluster' is the local cluster")
+    kinds: Optional[List[str]] = None
+    namespace: Optional[str] = None
+
+class NodeCapacity(BaseModel):
+    """Requested capacity of a worker node and its MachineSet"""
+    node: str
+    machine: Optional[str] = None
+    machineset: Optional[str] = None
+    desired: Optional[int] = None
+    current: Optional[int] = None
+    ready: Optional[int] = None
+    available: Optional[int] = None
+    age: Optional[str] = None
+    cpu_requested: Optional[float] = Field(None, description="Requested CPU over allocatable")
+    memory_requested: Optional[float] = Field(None, description="Requested memory over allocatable")
+
+class CapacityReport(BaseModel):
+    """Worker node capacity report"""
+    cluster: str
+    nodes: List[NodeCapacity]
+    errors: Dict[str, str] = {}
+
 # API Endpoints
 
 @router.get("/resources/{namespace}/{kind}/{name}", response_model=Resource)
 async def get_resource(
+    response: Response,
     namespace: str = Path(..., description="Namespace of the resource"),
     kind: str = Path(..., description="Kind of the resource (e.g., Deployment, Service)"),
     name: str = Path(..., description="Name of the resource"),
-    sanitize: bool = Query(False, description="Whether to sanitize the resource metadata")
+    sanitize: bool = Query(False, description="Whether to sanitize the resource metadata"),
+    if_none_match: Optional[str] = Header(None, description="ETag of a cached copy; 304 is returned if it is still current"),
+    informers: Optional[InformerCache] = Depends(get_informers),
+    kube: BlockingExecutor = Depends(get_kube_executor),
+    flight: SingleFlight = Depends(get_kube_flight),
+    api_client: client.ApiClient = Depends(get_api_client),
+    discovery: DiscoveryIndex = Depends(get_discovery),
+    sanitizer: Sanitizer = Depends(get_sanitizer),
+    fast: bool = Depends(get_fast_json)
 ):
     """
     Get a Kubernetes resource by namespace, kind and name
+
+    Any kind known to API discovery is supported; use "Kind.group" to pick a
+    specific API group. The namespace is ignored for cluster-scoped kinds.
+    The ETag follows the object's resourceVersion.
     """
     try:
-        api_client = client.ApiClient()
-        
         # Determine the correct API based on resource kind
-        resource_info = get_resource_api_info(kind)
+        resource_info = discovery.lookup(kind)
         if not resource_info:
             raise HTTPException(status_code=400, detail=f"Unknown resource kind: {kind}")
-        
-        # Call the appropriate API
-        api_version = resource_info["api_version"]
-        group = resource_info["group"]
-        version = resource_info["version"]
-        plural = resource_info["plural"]
-        
-        if group:
-            # Custom resource
-            custom_api = client.CustomObjectsApi(api_client)
-            resource = custom_api.get_namespaced_custom_object(
-                group, version, namespace, plural, name
-            )
+
+        if not resource_info.get("namespaced", True):
+            namespace = None
+
+        # Serve from the informer cache when the kind is watched and synced
+        if informers is not None and informers.has_synced(kind):
+            resource = informers.get(kind, namespace, name)
+            if resource is None:
+                raise HTTPException(status_code=404, detail=f"Resource {kind}/{name} not found in namespace {namespace}")
         else:
-            # Core resource
-            if kind == "Pod":
-                resource = client.CoreV1Api(api_client).read_namespaced_pod(name, namespace)
-            elif kind == "Service":
-                resource = client.CoreV1Api(api_client).read_namespaced_service(name, namespace)
-            elif kind == "ConfigMap":
-                resource = client.CoreV1Api(api_client).read_namespaced_config_map(name, namespace)
-            elif kind == "Secret":
-                resource = client.CoreV1Api(api_client).read_namespaced_secret(name, namespace)
-            elif kind == "Deployment":
-                resource = client.AppsV1Api(api_client).read_namespaced_deployment(name, namespace)
-            else:
-                raise HTTPException(status_code=400, detail=f"Unsupported resource kind: {kind}")
-
-            # Convert to dict
-            resource = api_client.sanitize_for_serialization(resource)
+            path = resource_path(resource_info, namespace, name)
+            key = kube_read_key("get", resource_info, namespace, name)
+            resource = await flight.do(key, kube.run, get_json, api_client, path)
+
+        metadata = resource.get("metadata", {})
+        etag = make_etag(metadata.get("uid"), metadata.get("resourceVersion"), sanitize)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
         
         # Sanitize if requested
         if sanitize:
-            resource = sanitize_resource(resource)
-            
+            resource = sanitizer.sanitize(resource)
+
+        if fast:
+            return fast_json(resource, response, Resource)
         return resource
     
     except ApiException as e:
@@ -100,88 +175,295 @@ async def get_resource(
             raise HTTPException(status_code=404, detail=f"Resource {kind}/{name} not found in namespace {namespace}")
         else:
             raise HTTPException(status_code=e.status, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out waiting for the Kubernetes API")
 
 @router.get("/namespaces", response_model=List[NamespaceInfo])
-async def list_namespaces():
+async def list_namespaces(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of namespaces to return per page"),
+    continue_token: Optional[str] = Query(None, alias="continue", description="Continue token returned by a previous page"),
+    stream: bool = Query(False, description="Stream namespaces as NDJSON as apiserver pages arrive"),
+    if_none_match: Optional[str] = Header(None, description="ETag of a cached copy; 304 is returned if it is still current"),
+    informers: Optional[InformerCache] = Depends(get_informers),
+    discovery: DiscoveryIndex = Depends(get_discovery),
+    kube: BlockingExecutor = Depends(get_kube_executor),
+    flight: SingleFlight = Depends(get_kube_flight),
+    api_client: client.ApiClient = Depends(get_api_client),
+    fast: bool = Depends(get_fast_json)
+):
     """
     List all namespaces in the cluster
     """
     try:
-        api_client = client.ApiClient()
-        core_v1 = client.CoreV1Api(api_client)
-        namespaces = core_v1.list_namespace()
-        
-        result = []
-        for ns in namespaces.items:
-            ns_dict = api_client.sanitize_for_serialization(ns)
-            result.append({
-                "name": ns_dict["metadata"]["name"],
-                "status": ns_dict["status"]["phase"],
-                "labels": ns_dict["metadata"].get("labels"),
-                "annotations": ns_dict["metadata"].get("annotations")
-            })
-            
-        return result
+        return await list_collection("Namespace", namespace_info, response, limit, continue_token, stream, if_none_match, informers, discovery, kube, flight, api_client, fast)
         
     except ApiException as e:
         raise HTTPException(status_code=e.status, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out waiting for the Kubernetes API")
 
 @router.get("/operators", response_model=List[OperatorInfo])
-async def list_operators():
+async def list_operators(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of operators to return per page"),
+    continue_token: Optional[str] = Query(None, alias="continue", description="Continue token returned by a previous page"),
+    stream: bool = Query(False, description="Stream operators as NDJSON as apiserver pages arrive"),
+    if_none_match: Optional[str] = Header(None, description="ETag of a cached copy; 304 is returned if it is still current"),
+    informers: Optional[InformerCache] = Depends(get_informers),
+    discovery: DiscoveryIndex = Depends(get_discovery),
+    kube: BlockingExecutor = Depends(get_kube_executor),
+    flight: SingleFlight = Depends(get_kube_flight),
+    api_client: client.ApiClient = Depends(get_api_client),
+    fast: bool = Depends(get_fast_json)
+):
     """
     List all installed operators in the cluster
     """
     try:
-        api_client = client.ApiClient()
-        custom_api = client.CustomObjectsApi(api_client)
+        # ClusterServiceVersions (CSVs) across all namespaces
+        return await list_collection("ClusterServiceVersion", operator_info, response, limit, continue_token, stream, if_none_match, informers, discovery, kube, flight, api_client, fast)
         
-        # List ClusterServiceVersions (CSVs) across all namespaces
-        csvs = custom_api.list_cluster_custom_object(
-            "operators.coreos.com", 
-            "v1alpha1", 
-            "clusterserviceversions"
+    except ApiException as e:
+        raise HTTPException(status_code=e.status, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out waiting for the Kubernetes API")
+
+@router.post("/export")
+async def export_resources(
+    export: ExportRequest,
+    informers: Optional[InformerCache] = Depends(get_informers),
+    kube: BlockingExecutor = Depends(get_kube_executor),
+    analysis: BlockingExecutor = Depends(get_analysis_executor),
+    api_client: client.ApiClient = Depends(get_api_client),
+    discovery: DiscoveryIndex = Depends(get_discovery),
+    sanitizer: Sanitizer = Depends(get_sanitizer)
+):
+    """
+    Export sanitized manifests of several kinds in a namespace as one streamed
+    multi-document YAML file or tar archive
+    """
+    unknown = [kind for kind in export.kinds if not discovery.lookup(kind)]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown resource kinds: {', '.join(unknown)}")
+
+    exporter = ManifestExporter(kube, analysis, api_client, discovery, informers, sanitizer.sanitize, page_size=DEFAULT_PAGE_SIZE)
+
+    if export.format == "tar":
+        return StreamingResponse(
+            tar_stream(exporter, export.namespace, export.kinds, export.label_selector),
+            media_type="application/x-tar",
+            headers={"Content-Disposition": f'attachment; filename="{export.namespace}.tar"'},
         )
-        
-        result = []
-        for csv in csvs.get("items", []):
-            result.append({
-                "name": csv["spec"]["displayName"],
-                "namespace": csv["metadata"]["namespace"],
-                "version": csv["spec"]["version"],
-                "channel": csv["spec"].get("channel"),
-                "csv_name": csv["metadata"]["name"]
-            })
-            
-        return result
-        
+
+    return StreamingResponse(
+        yaml_stream(exporter, export.namespace, export.kinds, export.label_selector),
+        media_type="application/yaml",
+        headers={"Content-Disposition": f'attachment; filename="{export.namespace}.yaml"'},
+    )
+
+@router.post("/compare")
+async def compare_clusters(
+    comparison_request: ComparisonRequest,
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of differences to return"),
+    engine: Optional[ComparisonEngine] = Depends(get_comparison_engine)
+):
+    """
+    Snapshot resources from several kubeconfig contexts and return the first page of differences
+    """
+    if engine is None:
+        raise HTTPException(status_code=404, detail="Cluster comparison is disabled")
+
+    try:
+        comparison = await engine.compare(
+            comparison_request.contexts,
+            comparison_request.kinds or engine.default_kinds,
+            comparison_request.namespace,
+        )
+    except (ValueError, ConfigException) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return comparison_page(comparison, 0, limit)
+
+@router.get("/compare/{comparison_id}")
+async def get_comparison(
+    comparison_id: str = Path(..., description="ID returned by POST /compare"),
+    offset: int = Query(0, ge=0, description="Index of the first difference to return"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of differences to return"),
+    engine: Optional[ComparisonEngine] = Depends(get_comparison_engine)
+):
+    """
+    Get a page of differences from an earlier comparison
+    """
+    if engine is None:
+        raise HTTPException(status_code=404, detail="Cluster comparison is disabled")
+
+    comparison = engine.get(comparison_id)
+    if comparison is None:
+        raise HTTPException(status_code=404, detail=f"Comparison {comparison_id} not found or expired")
+
+    return comparison_page(comparison, offset, limit)
+
+@router.get("/capacity", response_model=CapacityReport)
+async def get_capacity(
+    format: str = Query("json", regex="^(json|xlsx|csv|parquet)$", description="json, or xlsx, csv or parquet for a download"),
+    capacity: Optional[CapacityService] = Depends(get_capacity_service)
+):
+    """
+    Get CPU and memory requests against allocatable for every worker node, with its Machine and MachineSet
+    """
+    if capacity is None:
+        raise HTTPException(status_code=404, detail="Capacity report is disabled")
+
+    report = await capacity.report()
+
+    if format != "json":
+        return await capacity_file_response([(report["cluster"], report_rows(report))], format, f"{report['cluster']}-capacity")
+
+    return report
+
+@router.get("/nodes/metrics")
+async def get_node_metrics(
+    node: Optional[List[str]] = Query(None, description="Nodes to include, default all"),
+    metric: Optional[List[str]] = Query(None, description="cpu_requested, memory_requested, cpu_usage or memory_usage, default all"),
+    capacity: Optional[CapacityService] = Depends(get_capacity_service)
+):
+    """
+    Get CPU and memory requests and usage against allocatable per node, for dashboards
+    """
+    if capacity is None:
+        raise HTTPException(status_code=404, detail="Capacity report is disabled")
+
+    try:
+        return await capacity.node_metrics(node, metric)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/capacity/snapshots")
+async def save_capacity_snapshot(
+    capacity: Optional[CapacityService] = Depends(get_capacity_service),
+    store: Optional[CapacityReportStore] = Depends(get_capacity_store)
+):
+    """
+    Store the current capacity report as this cluster's partition of the multi-cluster report
+    """
+    if capacity is None or store is None:
+        raise HTTPException(status_code=404, detail="Capacity report store is disabled")
+
+    report = await capacity.report()
+    await asyncio.to_thread(store.save, report)
+    return {"cluster": report["cluster"], "nodes": len(report["nodes"]), "errors": report["errors"]}
+
+@router.get("/capacity/report")
+async def export_capacity_report(
+    format: str = Query("xlsx", regex="^(xlsx|csv|parquet)$", description="Output format"),
+    store: Optional[CapacityReportStore] = Depends(get_capacity_store)
+):
+    """
+    Download the multi-cluster capacity report merged from every stored cluster partition
+    """
+    if store is None:
+        raise HTTPException(status_code=404, detail="Capacity report store is disabled")
+
+    return await capacity_file_response(store.partitions(), format, "openshift_clusters_capacity_report")
+
+@router.get("/troubleshoot/{namespace}")
+async def troubleshoot_namespace(
+    namespace: str = Path(..., description="Namespace to diagnose"),
+    troubleshooter: Optional[Troubleshooter] = Depends(get_troubleshooter)
+):
+    """
+    Run the troubleshooting rules over the recent events of every object in a namespace
+    """
+    if troubleshooter is None:
+        raise HTTPException(status_code=404, detail="Troubleshooter is disabled")
+
+    return await troubleshooter.namespace_report(namespace)
+
+@router.get("/troubleshoot/{namespace}/{kind}/{name}")
+async def troubleshoot_resource(
+    namespace: str = Path(..., description="Namespace of the resource"),
+    kind: str = Path(..., description="Kind of the resource (e.g., Pod, Deployment)"),
+    name: str = Path(..., description="Name of the resource"),
+    troubleshooter: Optional[Troubleshooter] = Depends(get_troubleshooter)
+):
+    """
+    Run the troubleshooting rules over the recent events of a resource, its owners and its pods
+    """
+    if troubleshooter is None:
+        raise HTTPException(status_code=404, detail="Troubleshooter is disabled")
+
+    try:
+        report = await troubleshooter.diagnose(namespace, kind, name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except ApiException as e:
         raise HTTPException(status_code=e.status, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out waiting for the Kubernetes API")
+
+    if report is None:
+        raise HTTPException(status_code=404, detail=f"Resource {kind}/{name} not found in namespace {namespace}")
+    return report
+
+@router.get("/kb/search")
+async def search_kb(
+    q: str = Query(..., min_length=1, description="Search terms, e.g. an event reason or error message"),
+    limit: Optional[int] = Query(None, ge=1, le=50, description="Maximum number of articles, default features.troubleshooter.kb_search.max_results"),
+    kb: Optional[KnowledgeBase] = Depends(get_knowledge_base),
+    analysis: BlockingExecutor = Depends(get_analysis_executor)
+):
+    """
+    Search the local knowledge base articles, best BM25 match first
+    """
+    if kb is None:
+        raise HTTPException(status_code=404, detail="KB search is disabled")
+
+    # Uncached queries score postings under the index lock
+    return {"query": q, "results": await analysis.run(kb.search, q, limit)}
 
 @router.get("/cluster", response_model=ClusterInfo)
-async def get_cluster_info():
+async def get_cluster_info(
+    kube: BlockingExecutor = Depends(get_kube_executor),
+    flight: SingleFlight = Depends(get_kube_flight),
+    api_client: client.ApiClient = Depends(get_api_client),
+    discovery: DiscoveryIndex = Depends(get_discovery),
+    cache: TTLCache = Depends(get_cluster_info_cache)
+):
     """
     Get information about the current OpenShift cluster
     """
+    # Served from memory until the TTL expires or ClusterVersion changes
+    result = cache.get(CLUSTER_INFO_CACHE_KEY)
+    if result is not None:
+        return result
+
     try:
-        api_client = client.ApiClient()
         version_api = client.VersionApi(api_client)
-        version_info = version_api.get_code()
-        
-        # Get cluster version from OpenShift API
         custom_api = client.CustomObjectsApi(api_client)
-        cluster_version = custom_api.get_cluster_custom_object(
-            "config.openshift.io", 
-            "v1", 
-            "clusterversions",
-            "version"
-        )
-        
-        # Get infrastructure info
-        infra = custom_api.get_cluster_custom_object(
-            "config.openshift.io", 
-            "v1", 
-            "infrastructures",
-            "cluster"
+
+        # Server version, cluster version and infrastructure info are independent;
+        # tabs polling while the cache is empty share the same three calls
+        version_info, cluster_version, infra = await asyncio.gather(
+            flight.do(FlightKey("get", "version", None, None, ()), kube.run, version_api.get_code),
+            flight.do(
+                kube_read_key("get", discovery.lookup("ClusterVersion"), name="version"),
+                kube.run,
+                custom_api.get_cluster_custom_object,
+                "config.openshift.io",
+                "v1",
+                "clusterversions",
+                "version"
+            ),
+            flight.do(
+                kube_read_key("get", discovery.lookup("Infrastructure"), name="cluster"),
+                kube.run,
+                custom_api.get_cluster_custom_object,
+                "config.openshift.io",
+                "v1",
+                "infrastructures",
+                "cluster"
+            ),
         )
         
         result = {
@@ -190,76 +472,212 @@ async def get_cluster_info():
             "platform": infra["status"]["platform"],
             "api_url": infra["status"]["apiServerURL"]
         }
-            
+
+        cache.set(CLUSTER_INFO_CACHE_KEY, result)
         return result
         
     except ApiException as e:
         raise HTTPException(status_code=e.status, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out waiting for the Kubernetes API")
 
 # Helper functions
-def get_resource_api_info(kind: str) -> Dict[str, str]:
-    """
-    Get API information for a given resource kind
-    """
-    # Map of resource kinds to API versions and plurals
-    resource_map = {
-        "Pod": {"api_version": "v1", "group": "", "version": "v1", "plural": "pods"},
-        "Service": {"api_version": "v1", "group": "", "version": "v1", "plural": "services"},
-        "ConfigMap": {"api_version": "v1", "group": "", "version": "v1", "plural": "configmaps"},
-        "Secret": {"api_version": "v1", "group": "", "version": "v1", "plural": "secrets"},
-        "Deployment": {"api_version": "apps/v1", "group": "apps", "version": "v1", "plural": "deployments"},
-        "StatefulSet": {"api_version": "apps/v1", "group": "apps", "version": "v1", "plural": "statefulsets"},
-        "DaemonSet": {"api_version": "apps/v1", "group": "apps", "version": "v1", "plural": "daemonsets"},
-        "Route": {"api_version": "route.openshift.io/v1", "group": "route.openshift.io", "version": "v1", "plural": "routes"},
-        "DeploymentConfig": {"api_version": "apps.openshift.io/v1", "group": "apps.openshift.io", "version": "v1", "plural": "deploymentconfigs"},
-        "Build": {"api_version": "build.openshift.io/v1", "group": "build.openshift.io", "version": "v1", "plural": "builds"},
-        "BuildConfig": {"api_version": "build.openshift.io/v1", "group": "build.openshift.io", "version": "v1", "plural": "buildconfigs"},
-        "CronJob": {"api_version": "batch/v1", "group": "batch", "version": "v1", "plural": "cronjobs"},
-        "Job": {"api_version": "batch/v1", "group": "batch", "version": "v1", "plural": "jobs"},
-        "PersistentVolumeClaim": {"api_version": "v1", "group": "", "version": "v1", "plural": "persistentvolumeclaims"},
-        "PersistentVolume": {"api_version": "v1", "group": "", "version": "v1", "plural": "persistentvolumes"},
-        "Ingress": {"api_version": "networking.k8s.io/v1", "group": "networking.k8s.io", "version": "v1", "plural": "ingresses"},
-        "MachineSet": {"api_version": "machine.openshift.io/v1beta1", "group": "machine.openshift.io", "version": "v1beta1", "plural": "machinesets"},
-        "Machine": {"api_version": "machine.openshift.io/v1beta1", "group": "machine.openshift.io", "version": "v1beta1", "plural": "machines"},
-        "ClusterOperator": {"api_version": "config.openshift.io/v1", "group": "config.openshift.io", "version": "v1", "plural": "clusteroperators"},
+async def list_collection(
+    kind: str,
+    transform: Callable[[Dict[str, Any]], Dict[str, Any]],
+    response: Response,
+    limit: Optional[int],
+    continue_token: Optional[str],
+    stream: bool,
+    if_none_match: Optional[str],
+    informers: Optional[InformerCache],
+    discovery: DiscoveryIndex,
+    kube: BlockingExecutor,
+    flight: SingleFlight,
+    api_client: client.ApiClient,
+    fast: bool = False,
+):
+    """
+    List a collection from the informer cache or the apiserver
+
+    Unpaginated requests are served from the informer cache when it has
+    synced. Paginated requests go to the apiserver, since continue tokens
+    are issued by it, and the next token is returned in the X-Continue-Token
+    header. In stream mode items are sent as NDJSON, one chunk per page.
+
+    Non-streamed responses carry an ETag derived from the list
+    resourceVersion; a matching If-None-Match is answered with 304 before
+    any item is transformed or serialised. With fast set, the items are
+    encoded directly instead of being validated against the response model.
+    """
+    paginated = limit is not None or continue_token is not None
+
+    if informers is not None and informers.has_synced(kind) and not paginated:
+        # Read before listing: the store may move past it, never lag behind it
+        etag = make_etag(kind, informers.informer(kind).resource_version)
+        if not stream and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        items = [transform(obj) for obj in informers.list(kind)]
+        if stream:
+            return StreamingResponse(ndjson_chunks(items), media_type=NDJSON_MEDIA_TYPE)
+        set_etag(response, etag)
+        return fast_json(items, response) if fast else items
+
+    resource_info = discovery.lookup(kind)
+    page_size = limit or (DEFAULT_PAGE_SIZE if stream else None)
+
+    # The first page is fetched before responding so apiserver errors still
+    # map to an HTTP status in stream mode
+    page = await list_page(kube, flight, api_client, resource_info, page_size, continue_token)
+
+    if stream:
+        return StreamingResponse(stream_pages(kube, flight, api_client, resource_info, transform, page, page_size), media_type=NDJSON_MEDIA_TYPE)
+
+    metadata = page.get("metadata", {})
+    next_token = metadata.get("continue")
+    if next_token:
+        response.headers["X-Continue-Token"] = next_token
+
+    # The URL carries limit and continue, so the list resourceVersion identifies the page
+    etag = make_etag(kind, metadata.get("resourceVersion"))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    items = [transform(obj) for obj in page.get("items", [])]
+    return fast_json(items, response) if fast else items
+
+async def list_page(
+    kube: BlockingExecutor,
+    flight: SingleFlight,
+    api_client: client.ApiClient,
+    resource_info: Dict[str, Any],
+    limit: Optional[int] = None,
+    continue_token: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Fetch one page of a collection, resolved through discovery, from the apiserver as plain JSON
+
+    Identical page requests in flight at the same time share one call.
+    """
+    query_params = []
+    if limit:
+        query_params.append(("limit", limit))
+    if continue_token:
+        query_params.append(("continue", continue_token))
+
+    key = kube_read_key("list", resource_info, query_params=query_params)
+    return await flight.do(key, kube.run, get_json, api_client, resource_path(resource_info), query_params)
+
+async def stream_pages(
+    kube: BlockingExecutor,
+    flight: SingleFlight,
+    api_client: client.ApiClient,
+    resource_info: Dict[str, Any],
+    transform: Callable[[Dict[str, Any]], Dict[str, Any]],
+    page: Dict[str, Any],
+    page_size: int,
+) -> AsyncIterator[str]:
+    """
+    Yield NDJSON chunks, fetching the next apiserver page only after the previous one was sent
+    """
+    while True:
+        yield "".join(json.dumps(transform(obj)) + "\n" for obj in page.get("items", []))
+
+        continue_token = page.get("metadata", {}).get("continue")
+        if not continue_token:
+            break
+
+        try:
+            page = await list_page(kube, flight, api_client, resource_info, page_size, continue_token)
+        except (ApiException, asyncio.TimeoutError) as e:
+            # Headers are already sent, so the stream can only be cut short
+            logger.error(f"Streaming {resource_info['plural']} list aborted: {e}")
+            break
+
+def ndjson_chunks(items: List[Dict[str, Any]]) -> Iterator[str]:
+    """
+    Yield NDJSON chunks of DEFAULT_PAGE_SIZE items from an in-memory list
+    """
+    for start in range(0, len(items), DEFAULT_PAGE_SIZE):
+        yield "".join(json.dumps(item) + "\n" for item in items[start:start + DEFAULT_PAGE_SIZE])
+
+# Map of resource kinds to API versions and plurals, used until the
+# discovery index has been built and for kinds it does not know about
+RESOURCE_MAP = {
+    "Namespace": {"api_version": "v1", "group": "", "version": "v1", "plural": "namespaces", "namespaced": False},
+    "Node": {"api_version": "v1", "group": "", "version": "v1", "plural": "nodes", "namespaced": False},
+    "Pod": {"api_version": "v1", "group": "", "version": "v1", "plural": "pods"},
+    "Service": {"api_version": "v1", "group": "", "version": "v1", "plural": "services"},
+    "ConfigMap": {"api_version": "v1", "group": "", "version": "v1", "plural": "configmaps"},
+    "Secret": {"api_version": "v1", "group": "", "version": "v1", "plural": "secrets"},
+    "Deployment": {"api_version": "apps/v1", "group": "apps", "version": "v1", "plural": "deployments"},
+    "StatefulSet": {"api_version": "apps/v1", "group": "apps", "version": "v1", "plural": "statefulsets"},
+    "DaemonSet": {"api_version": "apps/v1", "group": "apps", "version": "v1", "plural": "daemonsets"},
+    "Route": {"api_version": "route.openshift.io/v1", "group": "route.openshift.io", "version": "v1", "plural": "routes"},
+    "DeploymentConfig": {"api_version": "apps.openshift.io/v1", "group": "apps.openshift.io", "version": "v1", "plural": "deploymentconfigs"},
+    "Build": {"api_version": "build.openshift.io/v1", "group": "build.openshift.io", "version": "v1", "plural": "builds"},
+    "BuildConfig": {"api_version": "build.openshift.io/v1", "group": "build.openshift.io", "version": "v1", "plural": "buildconfigs"},
+    "CronJob": {"api_version": "batch/v1", "group": "batch", "version": "v1", "plural": "cronjobs"},
+    "Job": {"api_version": "batch/v1", "group": "batch", "version": "v1", "plural": "jobs"},
+    "PersistentVolumeClaim": {"api_version": "v1", "group": "", "version": "v1", "plural": "persistentvolumeclaims"},
+    "PersistentVolume": {"api_version": "v1", "group": "", "version": "v1", "plural": "persistentvolumes", "namespaced": False},
+    "Ingress": {"api_version": "networking.k8s.io/v1", "group": "networking.k8s.io", "version": "v1", "plural": "ingresses"},
+    "MachineSet": {"api_version": "machine.openshift.io/v1beta1", "group": "machine.openshift.io", "version": "v1beta1", "plural": "machinesets"},
+    "Machine": {"api_version": "machine.openshift.io/v1beta1", "group": "machine.openshift.io", "version": "v1beta1", "plural": "machines"},
+    "ClusterOperator": {"api_version": "config.openshift.io/v1", "group": "config.openshift.io", "version": "v1", "plural": "clusteroperators", "namespaced": False},
+    "ClusterVersion": {"api_version": "config.openshift.io/v1", "group": "config.openshift.io", "version": "v1", "plural": "clusterversions", "namespaced": False},
+    "Infrastructure": {"api_version": "config.openshift.io/v1", "group": "config.openshift.io", "version": "v1", "plural": "infrastructures", "namespaced": False},
+    "ClusterServiceVersion": {"api_version": "operators.coreos.com/v1alpha1", "group": "operators.coreos.com", "version": "v1alpha1", "plural": "clusterserviceversions"},
+}
+
+async def capacity_file_response(partitions, format: str, filename: str) -> FileResponse:
+    """
+    Write capacity report partitions to a temporary file and send it, deleting it afterwards
+    """
+    try:
+        path = await asyncio.to_thread(export_file, partitions, format)
+    except ImportError as e:
+        raise HTTPException(status_code=501, detail=f"{format} export is not available: {e}")
+
+    return FileResponse(
+        path,
+        media_type=MEDIA_TYPES[format],
+        filename=f"{filename}.{format}",
+        background=BackgroundTask(os.unlink, path),
+    )
+
+def comparison_page(comparison: Comparison, offset: int, limit: int) -> Dict[str, Any]:
+    """
+    Build a paginated comparison response
+    """
+    result = comparison.summary()
+    result.update({
+        "offset": offset,
+        "limit": limit,
+        "items": comparison.page(offset, limit),
+    })
+    return result
+
+def namespace_info(ns: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a NamespaceInfo dict from a serialized Namespace
+    """
+    return {
+        "name": ns["metadata"]["name"],
+        "status": ns["status"]["phase"],
+        "labels": ns["metadata"].get("labels"),
+        "annotations": ns["metadata"].get("annotations")
+    }
+
+def operator_info(csv: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build an OperatorInfo dict from a ClusterServiceVersion
+    """
+    return {
+        "name": csv["spec"]["displayName"],
+        "namespace": csv["metadata"]["namespace"],
+        "version": csv["spec"]["version"],
+        "channel": csv["spec"].get("channel"),
+        "csv_name": csv["metadata"]["name"]
     }
-    
-    return resource_map.get(kind, None)
-
-def sanitize_resource(resource: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Sanitize a resource by removing non-reusable fields
-    """
-    fields_to_remove = [
-        "status",
-        "metadata.managedFields",
-        "metadata.creationTimestamp",
-        "metadata.resourceVersion",
-        "metadata.selfLink",
-        "metadata.uid",
-        "metadata.generation",
-        "metadata.annotations.kubectl.kubernetes.io/last-applied-configuration"
-    ]
-    
-    # Deep copy to avoid modifying the original
-    sanitized = json.loads(json.dumps(resource))
-    
-    for field in fields_to_remove:
-        parts = field.split(".")
-        current = sanitized
-        
-        # Navigate to the nested field
-        for i, part in enumerate(parts):
-            if i == len(parts) - 1:
-                # Last part, remove it
-                if part in current:
-                    del current[part]
-            else:
-                # Navigate deeper
-                if part in current and isinstance(current[part], dict):
-                    current = current[part]
-                else:
-                    # Path doesn't exist, stop
-                    break
-                    
-    return sanitized 
\ No newline at end of file
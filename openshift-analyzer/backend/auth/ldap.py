@@ -1,23 +1,25 @@
 import os
+import asyncio
 import logging
-import json
 import ldap
-from fastapi import APIRouter, Depends, HTTPException, Request, Form
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from fastapi.responses import RedirectResponse
+import ldap.dn
+import ldap.filter
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
-import jwt
-from datetime import datetime, timedelta
-from utils.config import load_config
+from utils.config import get_settings
+from utils.metrics import time_auth
+from utils.offload import BlockingExecutor
+from utils.cache import TTLCache
+from auth.ldap_pool import LdapConnectionPool, PoolTimeout
+from auth.tokens import JWT_EXPIRATION, create_jwt_token, claims_to_user, get_token_claims
 
 router = APIRouter()
 logger = logging.getLogger("openshift-analyzer")
 
-# Load configuration
-config_path = os.environ.get("CONFIG_PATH", "/app/config/config.yaml")
-app_config = load_config(config_path)
-ldap_config = app_config.get("auth", {}).get("ldap", {})
+# Configuration is parsed once and shared with main
+ldap_config = get_settings().auth.ldap
 
 # Models
 class Token(BaseModel):
@@ -39,18 +41,195 @@ LDAP_BIND_PASSWORD = os.environ.get("LDAP_BIND_PASSWORD", ldap_config.get("bind_
 LDAP_SEARCH_BASE = os.environ.get("LDAP_SEARCH_BASE", ldap_config.get("search_base", ""))
 LDAP_SEARCH_FILTER = os.environ.get("LDAP_SEARCH_FILTER", ldap_config.get("search_filter", "(uid=%s)"))
 LDAP_USE_SSL = os.environ.get("LDAP_USE_SSL", "false").lower() == "true"
-JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "openshift-analyzer-secret-key")
-JWT_ALGORITHM = "HS256"
-JWT_EXPIRATION = 3600  # 1 hour
 
-# Configure OAuth2
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
+class LdapAuthenticator:
+    """
+    LDAP login backed by connection pools and a short-lived user cache
+
+    Searches run on a pool of connections pre-bound as the service
+    account; user binds run on a separate pool so they never change the
+    identity of a search connection. The user's DN and attributes are
+    cached for cache_ttl seconds, so a repeated login within that window
+    costs a single bind.
+    """
+
+    def __init__(
+        self,
+        search_pool: Optional[LdapConnectionPool],
+        bind_pool: LdapConnectionPool,
+        search_base: str,
+        search_filter: str,
+        cache_ttl: float = 60,
+        cache_size: int = 1024,
+    ):
+        self.search_pool = search_pool
+        self.bind_pool = bind_pool
+        self.search_base = search_base
+        self.search_filter = search_filter
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+
+    def authenticate(self, username: str, password: str) -> Optional[Dict[str, Any]]:
+        """
+        Authenticate user with LDAP
+        
+        Args:
+            username: Username
+            password: Password
+            
+        Returns:
+            User information if authentication is successful, None otherwise
+
+        Raises:
+            PoolTimeout: If no LDAP connection became available
+            ldap.SERVER_DOWN: If the LDAP server cannot be reached
+        """
+        # An empty password would be an anonymous bind, which always succeeds
+        if not username or not password:
+            return None
+
+        user_info = self.cache.get(username)
+        if user_info is None:
+            user_info = self.lookup(username)
+            if user_info is None:
+                return None
+            self.cache.set(username, user_info)
+
+        try:
+            with self.bind_pool.connection() as conn:
+                conn.simple_bind_s(user_info["dn"], password)
+        except ldap.INVALID_CREDENTIALS:
+            logger.error(f"Invalid credentials for user: {username}")
+            return None
+
+        return dict(user_info)
+
+    def lookup(self, username: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the user's DN, mail, name and groups
+        """
+        if self.search_pool is None:
+            # Direct bind with the user's credentials
+            return {
+                "username": username,
+                "dn": self.search_filter.replace("%s", ldap.dn.escape_dn_chars(username))
+            }
+
+        search_filter = self.search_filter.replace("%s", ldap.filter.escape_filter_chars(username))
+        with self.search_pool.connection() as conn:
+            result = conn.search_s(
+                self.search_base,
+                ldap.SCOPE_SUBTREE,
+                search_filter,
+                ["uid", "mail", "cn", "memberOf"]
+            )
+        # Drop search continuation references
+        result = [entry for entry in result if entry[0]]
+
+        if len(result) != 1:
+            logger.error(f"User not found or multiple users found: {username}")
+            return None
+
+        user_dn = result[0][0]
+        user_attributes = result[0][1]
+
+        # Extract user attributes
+        user_info = {
+            "username": username,
+            "dn": user_dn
+        }
+
+        if "mail" in user_attributes:
+            user_info["email"] = user_attributes["mail"][0].decode("utf-8")
+
+        if "cn" in user_attributes:
+            user_info["full_name"] = user_attributes["cn"][0].decode("utf-8")
+
+        # Extract groups
+        if "memberOf" in user_attributes:
+            groups = []
+            for group_dn in user_attributes["memberOf"]:
+                group_dn = group_dn.decode("utf-8")
+                # Extract group name from DN
+                for part in group_dn.split(","):
+                    if part.lower().startswith("cn="):
+                        groups.append(part[3:])
+                        break
+            user_info["groups"] = groups
+
+        return user_info
+
+    def warm(self):
+        """Open the service connections ahead of the first logins"""
+        if self.search_pool is not None:
+            self.search_pool.warm()
+
+    def close(self):
+        for pool in (self.search_pool, self.bind_pool):
+            if pool is not None:
+                pool.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "search_pool": self.search_pool.stats() if self.search_pool is not None else {},
+            "bind_pool": self.bind_pool.stats(),
+            "user_cache": self.cache.stats(),
+        }
+
+def create_ldap_authenticator(pool_config: Dict[str, Any], cache_config: Dict[str, Any]) -> LdapAuthenticator:
+    """
+    Build the authenticator from the LDAP_* settings and auth.ldap.pool / auth.ldap.cache
+    """
+    ldap_uri = f"ldap{'s' if LDAP_USE_SSL else ''}://{LDAP_SERVER}:{LDAP_PORT}"
+    pool_kwargs = {
+        "timeout": float(pool_config.get("timeout", 10)),
+        "health_check_interval": float(pool_config.get("health_check_interval", 30)),
+        "max_lifetime": float(pool_config.get("max_lifetime", 600)),
+        # Certificates were never verified before; enable once the CA is trusted
+        "verify_tls": bool(pool_config.get("verify_tls", False)),
+    }
+
+    search_pool = None
+    # If admin bind credentials are provided, use them to search for the user
+    if LDAP_BIND_DN and LDAP_BIND_PASSWORD:
+        search_pool = LdapConnectionPool(
+            ldap_uri, LDAP_BIND_DN, LDAP_BIND_PASSWORD, size=int(pool_config.get("size", 4)), **pool_kwargs
+        )
+    bind_pool = LdapConnectionPool(ldap_uri, size=int(pool_config.get("bind_size", 8)), **pool_kwargs)
+
+    return LdapAuthenticator(
+        search_pool,
+        bind_pool,
+        LDAP_SEARCH_BASE,
+        LDAP_SEARCH_FILTER,
+        cache_ttl=float(cache_config.get("ttl", 60)),
+        cache_size=int(cache_config.get("size", 1024)),
+    )
+
+def get_ldap_authenticator(request: Request) -> LdapAuthenticator:
+    """
+    FastAPI dependency returning the pooled LDAP authenticator
+    """
+    authenticator = getattr(request.app.state, "ldap_authenticator", None)
+    if authenticator is None:
+        raise HTTPException(status_code=503, detail="LDAP authentication is not configured")
+    return authenticator
+
+def get_ldap_executor(request: Request) -> BlockingExecutor:
+    """
+    FastAPI dependency returning the executor for blocking LDAP calls
+    """
+    return request.app.state.ldap_executor
 
 @router.post("/token", response_model=Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login_for_access_token(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    authenticator: LdapAuthenticator = Depends(get_ldap_authenticator),
+    ldap_executor: BlockingExecutor = Depends(get_ldap_executor)
+):
     """Authenticate user with LDAP and return JWT token"""
     try:
-        user = authenticate_ldap(form_data.username, form_data.password)
+        with time_auth("ldap", "authenticate"):
+            user = await ldap_executor.run(authenticator.authenticate, form_data.username, form_data.password)
         if not user:
             raise HTTPException(status_code=401, detail="Invalid credentials")
             
@@ -62,153 +241,23 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
             "token_type": "bearer",
             "expires_in": JWT_EXPIRATION
         }
+    except HTTPException:
+        raise
+    except (PoolTimeout, asyncio.TimeoutError, ldap.SERVER_DOWN) as e:
+        logger.error(f"LDAP unavailable: {str(e)}")
+        raise HTTPException(status_code=503, detail="Authentication service unavailable")
     except Exception as e:
         logger.error(f"LDAP authentication error: {str(e)}")
         raise HTTPException(status_code=401, detail="Authentication error")
 
 @router.get("/user", response_model=User)
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    """Get current user info from JWT token"""
-    try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        if datetime.fromtimestamp(payload["exp"]) < datetime.now():
-            raise HTTPException(status_code=401, detail="Token expired")
-            
-        return {
-            "username": payload["sub"],
-            "email": payload.get("email"),
-            "full_name": payload.get("name"),
-            "groups": payload.get("groups", [])
-        }
-    except jwt.PyJWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
-        
+async def get_current_user(claims: Dict[str, Any] = Depends(get_token_claims)):
+    """Get current user info from the verified JWT token"""
+    return claims_to_user(claims)
+
 @router.get("/logout")
 async def logout():
     """Logout (client-side only)"""
     # JWT tokens are stateless, so server-side logout is not needed
     # The client should discard the token
     return {"detail": "Logged out successfully"}
-
-def authenticate_ldap(username: str, password: str) -> Optional[Dict[str, Any]]:
-    """
-    Authenticate user with LDAP
-    
-    Args:
-        username: Username
-        password: Password
-        
-    Returns:
-        User information if authentication is successful, None otherwise
-    """
-    if not all([LDAP_SERVER, LDAP_SEARCH_BASE, LDAP_SEARCH_FILTER]):
-        logger.error("LDAP configuration missing")
-        return None
-        
-    try:
-        # Connect to LDAP server
-        ldap_uri = f"ldap{'s' if LDAP_USE_SSL else ''}://{LDAP_SERVER}:{LDAP_PORT}"
-        ldap_client = ldap.initialize(ldap_uri)
-        ldap_client.set_option(ldap.OPT_REFERRALS, 0)
-        
-        if LDAP_USE_SSL:
-            ldap_client.set_option(ldap.OPT_X_TLS_REQUIRE_CERT, ldap.OPT_X_TLS_NEVER)
-            
-        # If admin bind credentials are provided, use them to search for the user
-        if LDAP_BIND_DN and LDAP_BIND_PASSWORD:
-            ldap_client.simple_bind_s(LDAP_BIND_DN, LDAP_BIND_PASSWORD)
-            search_filter = LDAP_SEARCH_FILTER.replace("%s", username)
-            
-            # Search for the user
-            result = ldap_client.search_s(
-                LDAP_SEARCH_BASE,
-                ldap.SCOPE_SUBTREE,
-                search_filter,
-                ["uid", "mail", "cn", "memberOf"]
-            )
-            
-            if not result or len(result) != 1:
-                logger.error(f"User not found or multiple users found: {username}")
-                return None
-                
-            user_dn = result[0][0]
-            user_attributes = result[0][1]
-            
-            # Authenticate with the user's credentials
-            ldap_client.simple_bind_s(user_dn, password)
-            
-            # Extract user attributes
-            user_info = {
-                "username": username,
-                "dn": user_dn
-            }
-            
-            if "mail" in user_attributes:
-                user_info["email"] = user_attributes["mail"][0].decode("utf-8")
-                
-            if "cn" in user_attributes:
-                user_info["full_name"] = user_attributes["cn"][0].decode("utf-8")
-                
-            # Extract groups
-            if "memberOf" in user_attributes:
-                groups = []
-                for group_dn in user_attributes["memberOf"]:
-                    group_dn = group_dn.decode("utf-8")
-                    # Extract group name from DN
-                    for part in group_dn.split(","):
-                        if part.startswith("cn="):
-                            groups.append(part[3:])
-                            break
-                user_info["groups"] = groups
-                
-            return user_info
-        else:
-            # Direct bind with the user's credentials
-            user_dn = LDAP_SEARCH_FILTER.replace("%s", username)
-            ldap_client.simple_bind_s(user_dn, password)
-            
-            return {
-                "username": username,
-                "dn": user_dn
-            }
-            
-    except ldap.INVALID_CREDENTIALS:
-        logger.error(f"Invalid credentials for user: {username}")
-        return None
-    except ldap.SERVER_DOWN:
-        logger.error("LDAP server is down")
-        return None
-    except ldap.LDAPError as e:
-        logger.error(f"LDAP error: {str(e)}")
-        return None
-    finally:
-        ldap_client.unbind_s()
-
-def create_jwt_token(user: Dict[str, Any]) -> str:
-    """
-    Create JWT token for the user
-    
-    Args:
-        user: User information
-        
-    Returns:
-        JWT token
-    """
-    expiration = datetime.now() + timedelta(seconds=JWT_EXPIRATION)
-    
-    payload = {
-        "sub": user["username"],
-        "exp": expiration.timestamp(),
-        "iat": datetime.now().timestamp()
-    }
-    
-    if "email" in user:
-        payload["email"] = user["email"]
-        
-    if "full_name" in user:
-        payload["name"] = user["full_name"]
-        
-    if "groups" in user:
-        payload["groups"] = user["groups"]
-        
-    return jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM) 
\ No newline at end of file
@@ -0,0 +1,178 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Callable, Iterator
+import ldap
+
+logger = logging.getLogger("openshift-analyzer")
+
+# Errors after which a connection cannot be trusted and is dropped
+CONNECTION_ERRORS = (ldap.SERVER_DOWN, ldap.CONNECT_ERROR, ldap.TIMEOUT, ldap.UNAVAILABLE)
+
+class PoolTimeout(Exception):
+    """No LDAP connection became available in time"""
+
+class LdapConnectionPool:
+    """
+    Bounded pool of reusable LDAP connections
+
+    With bind_dn set, every connection is bound as that service account
+    when it is opened, so checked out connections are ready to search.
+    Idle connections are checked with a WhoAmI request before reuse once
+    they have been idle longer than health_check_interval, and replaced
+    after max_lifetime. Connections that hit a network error are dropped.
+    All methods block and are meant to run off the event loop.
+
+    Args:
+        uri: ldap:// or ldaps:// URI
+        bind_dn: Service account DN, or None for unbound connections
+        bind_password: Service account password
+        size: Maximum number of open connections
+        timeout: Network and operation timeout, also the wait for a free connection
+        health_check_interval: Idle seconds after which a connection is checked before reuse
+        max_lifetime: Seconds after which a connection is closed and reopened
+        verify_tls: Verify the server certificate for ldaps://
+        factory: Creates a connection object from a URI, ldap.initialize by default
+    """
+
+    def __init__(
+        self,
+        uri: str,
+        bind_dn: Optional[str] = None,
+        bind_password: Optional[str] = None,
+        size: int = 4,
+        timeout: float = 10,
+        health_check_interval: float = 30,
+        max_lifetime: float = 600,
+        verify_tls: bool = True,
+        factory: Optional[Callable[[str], Any]] = None,
+    ):
+        self.uri = uri
+        self.bind_dn = bind_dn
+        self.bind_password = bind_password
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.max_lifetime = max_lifetime
+        self.verify_tls = verify_tls
+        self._factory = factory or ldap.initialize
+        # (connection, opened at, last returned at); most recently used on the right
+        self._idle: deque = deque()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._stats = {"opened": 0, "reused": 0, "dropped": 0, "health_checks": 0}
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """
+        Check out a connection for the duration of the with block
+
+        Raises:
+            PoolTimeout: If every connection stayed in use for timeout seconds
+            ldap.LDAPError: If a new connection cannot be opened or bound
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(f"No LDAP connection to {self.uri} available within {self.timeout}s")
+        try:
+            conn, opened_at = self._checkout()
+            try:
+                yield conn
+            except CONNECTION_ERRORS:
+                self._drop(conn)
+                raise
+            except BaseException:
+                # Operation errors such as INVALID_CREDENTIALS leave the connection usable
+                self._checkin(conn, opened_at)
+                raise
+            else:
+                self._checkin(conn, opened_at)
+        finally:
+            self._slots.release()
+
+    def warm(self, count: Optional[int] = None):
+        """
+        Open and bind connections up to count (default size) ahead of the first logins
+        """
+        count = self.size if count is None else min(count, self.size)
+        while True:
+            with self._lock:
+                if len(self._idle) >= count:
+                    return
+            conn = self._open()
+            self._checkin(conn, time.monotonic())
+
+    def close(self):
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn, _, _ in idle:
+            self._unbind(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        """Idle connections and open/reuse/drop counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["idle"] = len(self._idle)
+        stats["size"] = self.size
+        return stats
+
+    def _checkout(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, opened_at, returned_at = self._idle.pop()
+
+            now = time.monotonic()
+            if now - opened_at > self.max_lifetime:
+                self._drop(conn)
+                continue
+            if now - returned_at > self.health_check_interval:
+                self._count("health_checks")
+                try:
+                    conn.whoami_s()
+                except ldap.LDAPError as e:
+                    logger.info(f"Dropping stale LDAP connection to {self.uri}: {e}")
+                    self._drop(conn)
+                    continue
+            self._count("reused")
+            return conn, opened_at
+
+        return self._open(), time.monotonic()
+
+    def _open(self):
+        conn = self._factory(self.uri)
+        conn.set_option(ldap.OPT_REFERRALS, 0)
+        conn.set_option(ldap.OPT_NETWORK_TIMEOUT, self.timeout)
+        conn.set_option(ldap.OPT_TIMEOUT, self.timeout)
+        if not self.verify_tls:
+            conn.set_option(ldap.OPT_X_TLS_REQUIRE_CERT, ldap.OPT_X_TLS_NEVER)
+            conn.set_option(ldap.OPT_X_TLS_NEWCTX, 0)
+        if self.bind_dn:
+            try:
+                conn.simple_bind_s(self.bind_dn, self.bind_password)
+            except ldap.LDAPError:
+                self._unbind(conn)
+                raise
+        self._count("opened")
+        return conn
+
+    def _checkin(self, conn, opened_at: float):
+        with self._lock:
+            self._idle.append((conn, opened_at, time.monotonic()))
+
+    def _drop(self, conn):
+        self._count("dropped")
+        self._unbind(conn)
+
+    def _unbind(self, conn):
+        try:
+            conn.unbind_s()
+        except ldap.LDAPError:
+            pass
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
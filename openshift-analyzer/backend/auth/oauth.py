@@ -1,23 +1,21 @@
 import os
 import logging
 import httpx
-import json
-from fastapi import APIRouter, Depends, HTTPException, Request, Response
-from fastapi.security import OAuth2PasswordBearer, OAuth2AuthorizationCodeBearer
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import RedirectResponse
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
-import jwt
-from jose import JWTError, jwt as jose_jwt
-from utils.config import load_config
+from utils.config import get_settings
+from utils.metrics import time_auth
+from api.dependencies import get_http_client
+from auth.tokens import JWT_EXPIRATION, create_jwt_token, user_claims, claims_to_user, get_token_claims
+from auth.sessions import SESSION_COOKIE, get_session_store
 
 router = APIRouter()
 logger = logging.getLogger("openshift-analyzer")
 
-# Load configuration
-config_path = os.environ.get("CONFIG_PATH", "/app/config/config.yaml")
-app_config = load_config(config_path)
-oauth_config = app_config.get("auth", {}).get("oauth", {})
+# Configuration is parsed once and shared with main
+oauth_config = get_settings().auth.oauth
 
 # Models
 class Token(BaseModel):
@@ -40,9 +38,6 @@ OPENSHIFT_AUTH_URL = os.environ.get("OPENSHIFT_AUTH_URL", "")
 OPENSHIFT_TOKEN_URL = os.environ.get("OPENSHIFT_TOKEN_URL", "")
 OPENSHIFT_API_URL = os.environ.get("OPENSHIFT_API_URL", "")
 
-# Configure OAuth2
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
-
 @router.get("/login")
 async def login():
     """Redirect to OpenShift OAuth login"""
@@ -66,7 +61,12 @@ async def login():
     return RedirectResponse(url=login_url)
 
 @router.get("/callback")
-async def callback(code: str, request: Request):
+async def callback(
+    code: str,
+    request: Request,
+    http_client: httpx.AsyncClient = Depends(get_http_client),
+    session_store = Depends(get_session_store)
+):
     """Handle OAuth callback from OpenShift"""
     try:
         if not OPENSHIFT_TOKEN_URL:
@@ -84,74 +84,71 @@ async def callback(code: str, request: Request):
             "grant_type": "authorization_code",
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(token_url, data=token_data)
-            if response.status_code != 200:
-                logger.error(f"Failed to get token: {response.text}")
-                raise HTTPException(status_code=400, detail="Failed to get token")
-                
-            token_json = response.json()
-            
-            # Get user info from token
-            user_info = await get_user_info(token_json["access_token"])
-            
-            # Create session with user info and tokens
-            # This is a simplified version - in production, use secure cookies or session storage
-            response = RedirectResponse(url="/")
-            response.set_cookie(
-                key="access_token",
-                value=token_json["access_token"],
-                httponly=True,
-                secure=True,
-                samesite="lax",
-            )
-            response.set_cookie(
-                key="user_info",
-                value=json.dumps(user_info),
-                httponly=True,
-                secure=True,
-                samesite="lax",
-            )
+        with time_auth("oauth", "token_exchange"):
+            response = await http_client.post(token_url, data=token_data)
+        if response.status_code != 200:
+            logger.error(f"Failed to get token: {response.text}")
+            raise HTTPException(status_code=400, detail="Failed to get token")
             
-            return response
+        token_json = response.json()
+        
+        # Get user info from token
+        user_info = await get_user_info(token_json["access_token"], http_client)
+        
+        # User info is kept server-side for the whole session; the browser
+        # only carries the opaque session ID
+        session_id = await session_store.create(user_claims(user_info, ttl=session_store.ttl))
+        response = RedirectResponse(url="/")
+        response.set_cookie(
+            key=SESSION_COOKIE,
+            value=session_id,
+            max_age=int(session_store.ttl),
+            httponly=True,
+            secure=True,
+            samesite="lax",
+        )
+        
+        return response
             
     except Exception as e:
         logger.error(f"OAuth callback error: {str(e)}")
         raise HTTPException(status_code=400, detail=f"OAuth callback error: {str(e)}")
 
 @router.get("/token", response_model=Token)
-async def get_token(request: Request):
-    """Get current token from session"""
-    access_token = request.cookies.get("access_token")
-    if not access_token:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-        
-    # In a real application, you would validate the token here
+async def get_token(claims: Dict[str, Any] = Depends(get_token_claims)):
+    """Issue a bearer token for API clients from the current session"""
     return {
-        "access_token": access_token,
+        "access_token": create_jwt_token(claims_to_user(claims)),
         "token_type": "bearer",
-        "expires_in": 3600,  # Placeholder value
+        "expires_in": JWT_EXPIRATION,
     }
 
 @router.get("/user", response_model=User)
-async def get_current_user(request: Request):
-    """Get current user info from session"""
-    user_info = request.cookies.get("user_info")
-    if not user_info:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-        
-    return json.loads(user_info)
+async def get_current_user(claims: Dict[str, Any] = Depends(get_token_claims)):
+    """Get current user info from the verified session token"""
+    return claims_to_user(claims)
 
 @router.get("/logout")
-async def logout():
+async def logout(request: Request, session_store = Depends(get_session_store)):
     """Logout and clear session"""
+    session_id = request.cookies.get(SESSION_COOKIE)
+    if session_id and session_store is not None:
+        await session_store.delete(session_id)
     response = RedirectResponse(url="/")
+    response.delete_cookie(SESSION_COOKIE)
+    # Cookies set by earlier releases
     response.delete_cookie("access_token")
     response.delete_cookie("user_info")
     return response
 
-async def get_user_info(token: str) -> Dict[str, Any]:
-    """Get user info from OpenShift API using token"""
+async def get_user_info(token: str, http_client: httpx.AsyncClient) -> Dict[str, Any]:
+    """
+    Get user info from OpenShift API using token
+
+    Args:
+        token: OpenShift access token
+        http_client: Shared outbound HTTP client
+    """
     try:
         if not OPENSHIFT_API_URL:
             # Use default OpenShift API URL if not specified
@@ -161,34 +158,22 @@ async def get_user_info(token: str) -> Dict[str, Any]:
             
         headers = {"Authorization": f"Bearer {token}"}
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(api_url, headers=headers)
-            if response.status_code != 200:
-                logger.error(f"Failed to get user info: {response.text}")
-                raise HTTPException(status_code=400, detail="Failed to get user info")
-                
-            user_data = response.json()
+        with time_auth("oauth", "user_info"):
+            response = await http_client.get(api_url, headers=headers)
+        if response.status_code != 200:
+            logger.error(f"Failed to get user info: {response.text}")
+            raise HTTPException(status_code=400, detail="Failed to get user info")
             
-            return {
-                "username": user_data["metadata"]["name"],
-                "full_name": user_data.get("fullName"),
-                "groups": user_data.get("groups", []),
-            }
+        user_data = response.json()
+        
+        user_info = {
+            "username": user_data["metadata"]["name"],
+            "full_name": user_data.get("fullName"),
+            "groups": user_data.get("groups", []),
+        }
             
     except Exception as e:
         logger.error(f"Get user info error: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Get user info error: {str(e)}")
 
-async def verify_token(token: str = Depends(oauth2_scheme)):
-    """Verify JWT token and extract claims"""
-    try:
-        # This would use the OpenShift public keys to validate the token
-        # For now, we just decode the token without verification
-        payload = jwt.decode(token, options={"verify_signature": False})
-        return payload
-    except JWTError:
-        raise HTTPException(
-            status_code=401,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        ) 
\ No newline at end of file
+    return user_info
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import logging
+import secrets
+from fastapi import Request
+from typing import Dict, Any, Optional
+
+from utils.cache import TTLCache
+
+logger = logging.getLogger("openshift-analyzer")
+
+# Cookie holding the opaque session ID
+SESSION_COOKIE = "session"
+
+def _session_key(session_id: str) -> str:
+    # Only the digest is stored, so a dump of the store cannot be replayed as cookies
+    return hashlib.sha256(session_id.encode()).hexdigest()
+
+class MemorySessionStore:
+    """
+    Sessions held in process memory, least recently used evicted first
+
+    Sessions are lost on restart and are not shared between replicas; use
+    RedisSessionStore when running more than one pod.
+
+    Args:
+        ttl: Seconds a session stays valid after it was created
+        max_sessions: Maximum number of sessions kept
+    """
+
+    backend = "memory"
+
+    def __init__(self, ttl: float = 28800, max_sessions: int = 10000):
+        self.ttl = ttl
+        self.cache = TTLCache(maxsize=max_sessions, ttl=ttl)
+
+    async def create(self, data: Dict[str, Any]) -> str:
+        """Store data under a new random session ID and return the ID"""
+        session_id = secrets.token_urlsafe(32)
+        self.cache.set(_session_key(session_id), data)
+        return session_id
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self.cache.get(_session_key(session_id))
+
+    async def delete(self, session_id: str):
+        self.cache.pop(_session_key(session_id))
+
+    async def close(self):
+        self.cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend, **self.cache.stats()}
+
+class RedisSessionStore:
+    """
+    Sessions held in a Redis-compatible server, shared by all replicas
+
+    Every session is one key with the session TTL as its expiry.
+
+    Args:
+        client: redis.asyncio client
+        ttl: Seconds a session stays valid after it was created
+        prefix: Key prefix
+    """
+
+    backend = "redis"
+
+    def __init__(self, client, ttl: float = 28800, prefix: str = "openshift-analyzer:session:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def create(self, data: Dict[str, Any]) -> str:
+        """Store data under a new random session ID and return the ID"""
+        session_id = secrets.token_urlsafe(32)
+        await self.client.set(self.prefix + _session_key(session_id), json.dumps(data), ex=int(self.ttl))
+        return session_id
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        value = await self.client.get(self.prefix + _session_key(session_id))
+        return json.loads(value) if value is not None else None
+
+    async def delete(self, session_id: str):
+        await self.client.delete(self.prefix + _session_key(session_id))
+
+    async def close(self):
+        await self.client.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend}
+
+def get_session_store(request: Request):
+    """
+    FastAPI dependency returning the server-side session store, if one was created
+    """
+    return getattr(request.app.state, "session_store", None)
+
+def create_session_store(session_config: Dict[str, Any]):
+    """
+    Build the session store configured in auth.sessions
+
+    The redis backend needs the optional redis package; without it, or
+    without a redis_url, sessions fall back to process memory.
+    """
+    ttl = float(session_config.get("ttl", 28800))
+    if session_config.get("backend", "memory") == "redis":
+        redis_url = session_config.get("redis_url")
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            logger.error("Session backend redis needs the redis package, using memory sessions")
+        else:
+            if redis_url:
+                return RedisSessionStore(redis.from_url(redis_url), ttl=ttl)
+            logger.error("Session backend redis needs auth.sessions.redis_url, using memory sessions")
+
+    return MemorySessionStore(ttl=ttl, max_sessions=int(session_config.get("max_sessions", 10000)))
@@ -0,0 +1,315 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import httpx
+import jwt
+from fastapi import HTTPException, Request
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, List, Union
+
+from utils.cache import TTLCache
+from utils.metrics import time_auth
+from auth.sessions import SESSION_COOKIE
+
+logger = logging.getLogger("openshift-analyzer")
+
+# Tokens issued by /auth/token and the OAuth callback; there is no default,
+# since anyone knowing the key can mint tokens for every /api route
+JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY") or None
+JWT_ALGORITHM = "HS256"
+JWT_EXPIRATION = 3600  # 1 hour
+
+class InvalidToken(Exception):
+    """The token is malformed, expired, or its signature does not verify"""
+
+class JwksKeySet:
+    """
+    Signing keys fetched from a JWKS endpoint
+
+    Keys are refetched every refresh_interval seconds, and earlier when a
+    token names a key ID that is not known yet (key rotation), at most once
+    every min_refresh_interval seconds so unknown key IDs cannot be used to
+    hammer the endpoint. If a refetch fails the previous keys stay in use.
+
+    Args:
+        url: JWKS URL, e.g. https://idp.example.com/.well-known/jwks.json
+        refresh_interval: Seconds after which the key set is refetched
+        min_refresh_interval: Minimum seconds between two fetches
+        verify: CA bundle path, or False to skip certificate verification
+        timeout: Request timeout in seconds
+    """
+
+    def __init__(
+        self,
+        url: str,
+        refresh_interval: float = 3600,
+        min_refresh_interval: float = 60,
+        verify: Union[str, bool] = True,
+        timeout: float = 10,
+    ):
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self._keys: Dict[Optional[str], Any] = {}
+        self._fetched_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._client = httpx.AsyncClient(verify=verify, timeout=timeout)
+
+    async def get_key(self, kid: Optional[str]) -> Any:
+        """
+        Return the verification key for a key ID, refetching the set if needed
+
+        Raises:
+            InvalidToken: If no key matches the key ID
+        """
+        if self._stale(self.refresh_interval) or (kid not in self._keys and self._stale(self.min_refresh_interval)):
+            async with self._lock:
+                # Another request may have refreshed while this one waited
+                if self._stale(self.refresh_interval) or (kid not in self._keys and self._stale(self.min_refresh_interval)):
+                    await self.refresh()
+
+        key = self._keys.get(kid)
+        if key is None and kid is None and len(self._keys) == 1:
+            key = next(iter(self._keys.values()))
+        if key is None:
+            raise InvalidToken(f"Unknown signing key {kid!r}")
+        return key
+
+    async def refresh(self):
+        """Fetch the key set, keeping the current keys if the fetch fails"""
+        self._fetched_at = time.monotonic()
+        try:
+            with time_auth("jwks", "fetch"):
+                response = await self._client.get(self.url)
+                response.raise_for_status()
+                key_set = jwt.PyJWKSet.from_dict(response.json())
+        except (httpx.HTTPError, ValueError, jwt.PyJWTError) as e:
+            logger.warning(f"Cannot fetch JWKS from {self.url}: {e}")
+            return
+
+        self._keys = {key.key_id: key.key for key in key_set.keys}
+        logger.info(f"Loaded {len(self._keys)} signing keys from {self.url}")
+
+    def _stale(self, age: float) -> bool:
+        return self._fetched_at is None or time.monotonic() - self._fetched_at > age
+
+    async def close(self):
+        await self._client.aclose()
+
+class TokenVerifier:
+    """
+    Verifies bearer JWTs and caches their claims until they expire
+
+    HMAC tokens (HS*) are checked against the shared secret and every other
+    algorithm against the JWKS key set, so a public key can never be used
+    as an HMAC secret. Claims are cached under the SHA-256 digest of the
+    token, never the token itself, so repeated requests with the same token
+    skip parsing and signature checks entirely.
+
+    Args:
+        secret: HMAC secret, or None to reject HS* tokens
+        algorithms: Accepted signing algorithms
+        jwks: Key set for asymmetric algorithms, or None to reject them
+        audience: Required aud claim of JWKS-signed tokens
+        issuer: Required iss claim of JWKS-signed tokens
+        leeway: Allowed clock skew in seconds
+        cache_size: Maximum number of cached tokens
+    """
+
+    def __init__(
+        self,
+        secret: Optional[str] = None,
+        algorithms: Optional[List[str]] = None,
+        jwks: Optional[JwksKeySet] = None,
+        audience: Optional[str] = None,
+        issuer: Optional[str] = None,
+        leeway: float = 30,
+        cache_size: int = 4096,
+    ):
+        self.secret = secret
+        self.algorithms = set(algorithms or [JWT_ALGORITHM])
+        self.jwks = jwks
+        self.audience = audience
+        self.issuer = issuer
+        self.leeway = leeway
+        self.cache = TTLCache(maxsize=cache_size, ttl=JWT_EXPIRATION)
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Return the claims of a valid token
+
+        Raises:
+            InvalidToken: If the token does not verify or has expired
+        """
+        digest = hashlib.sha256(token.encode()).hexdigest()
+        claims = self.cache.get(digest)
+        if claims is not None:
+            return claims
+
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError as e:
+            raise InvalidToken(str(e))
+        algorithm = header.get("alg")
+        if algorithm not in self.algorithms:
+            raise InvalidToken(f"Algorithm {algorithm!r} is not accepted")
+
+        if algorithm.startswith("HS"):
+            if not self.secret:
+                raise InvalidToken("HMAC-signed tokens are not accepted")
+            key, audience, issuer = self.secret, None, None
+        else:
+            if self.jwks is None:
+                raise InvalidToken("No JWKS is configured for asymmetric tokens")
+            key = await self.jwks.get_key(header.get("kid"))
+            audience, issuer = self.audience, self.issuer
+
+        try:
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=[algorithm],
+                audience=audience,
+                issuer=issuer,
+                leeway=self.leeway,
+                options={"require": ["exp", "sub"]},
+            )
+        except jwt.PyJWTError as e:
+            raise InvalidToken(str(e))
+
+        ttl = float(claims["exp"]) + self.leeway - time.time()
+        if ttl > 0:
+            self.cache.set(digest, claims, ttl=ttl)
+        return claims
+
+    async def close(self):
+        if self.jwks is not None:
+            await self.jwks.close()
+
+def create_token_verifier(jwt_config: Dict[str, Any]) -> TokenVerifier:
+    """
+    Build the verifier from JWT_SECRET_KEY and auth.jwt
+
+    Raises:
+        RuntimeError: If HS* algorithms are accepted but JWT_SECRET_KEY is not set
+    """
+    algorithms = jwt_config.get("algorithms", [JWT_ALGORITHM])
+    if not JWT_SECRET_KEY and any(algorithm.startswith("HS") for algorithm in algorithms):
+        raise RuntimeError("JWT_SECRET_KEY must be set to accept HS* tokens; set it or remove HS* from auth.jwt.algorithms")
+
+    jwks = None
+    if jwt_config.get("jwks_url"):
+        jwks = JwksKeySet(
+            jwt_config["jwks_url"],
+            refresh_interval=float(jwt_config.get("jwks_refresh_interval", 3600)),
+            min_refresh_interval=float(jwt_config.get("jwks_min_refresh_interval", 60)),
+            verify=jwt_config.get("jwks_ca_path") or True,
+        )
+    return TokenVerifier(
+        secret=JWT_SECRET_KEY,
+        algorithms=algorithms,
+        jwks=jwks,
+        audience=jwt_config.get("audience") or None,
+        issuer=jwt_config.get("issuer") or None,
+        leeway=float(jwt_config.get("leeway", 30)),
+        cache_size=int(jwt_config.get("cache_size", 4096)),
+    )
+
+def user_claims(user: Dict[str, Any], ttl: float = JWT_EXPIRATION) -> Dict[str, Any]:
+    """
+    Claims describing a user, valid for ttl seconds
+
+    Args:
+        user: User information
+
+    Returns:
+        Claims for a JWT token or a server-side session
+    """
+    expiration = datetime.now() + timedelta(seconds=ttl)
+
+    payload = {
+        "sub": user["username"],
+        "exp": expiration.timestamp(),
+        "iat": datetime.now().timestamp()
+    }
+
+    if user.get("email"):
+        payload["email"] = user["email"]
+
+    if user.get("full_name"):
+        payload["name"] = user["full_name"]
+
+    if "groups" in user:
+        payload["groups"] = user["groups"]
+
+    return payload
+
+def create_jwt_token(user: Dict[str, Any]) -> str:
+    """
+    Create JWT token for the user
+
+    Args:
+        user: User information
+
+    Returns:
+        JWT token
+
+    Raises:
+        RuntimeError: If JWT_SECRET_KEY is not set
+    """
+    if not JWT_SECRET_KEY:
+        raise RuntimeError("JWT_SECRET_KEY is not set, cannot issue tokens")
+    return jwt.encode(user_claims(user), JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+
+def claims_to_user(claims: Dict[str, Any]) -> Dict[str, Any]:
+    """Map token claims to the User model fields"""
+    return {
+        "username": claims.get("preferred_username") or claims["sub"],
+        "email": claims.get("email"),
+        "full_name": claims.get("name"),
+        "groups": claims.get("groups", [])
+    }
+
+def request_token(request: Request) -> Optional[str]:
+    """Bearer token from the Authorization header"""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        return token
+    return None
+
+async def get_token_claims(request: Request) -> Dict[str, Any]:
+    """
+    FastAPI dependency returning the verified claims of the request's token or session
+
+    A bearer token in the Authorization header is verified as a JWT;
+    without one, the claims are loaded from the server-side session named
+    by the session cookie set at login.
+
+    Raises:
+        HTTPException: 401 if neither a valid token nor a live session is presented
+    """
+    token = request_token(request)
+    if not token:
+        session_id = request.cookies.get(SESSION_COOKIE)
+        session_store = getattr(request.app.state, "session_store", None)
+        if session_id and session_store is not None:
+            claims = await session_store.get(session_id)
+            if claims is not None and claims["exp"] > time.time():
+                return claims
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+
+    verifier = getattr(request.app.state, "token_verifier", None)
+    if verifier is None:
+        raise HTTPException(status_code=503, detail="Authentication is not configured")
+
+    try:
+        return await verifier.verify(token)
+    except InvalidToken as e:
+        logger.info(f"Rejected token: {e}")
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
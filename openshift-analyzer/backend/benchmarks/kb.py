@@ -0,0 +1,42 @@
+"""
+Index build, incremental update and query latency on a synthetic corpus,
+run from backend/: python -m benchmarks.kb
+"""
+import os
+import random
+import tempfile
+import time
+import timeit
+
+from services.kb import KnowledgeBase
+
+ARTICLES = 5000
+VOCABULARY = [f"word{i}" for i in range(20000)] + [
+    "crashloopbackoff", "imagepullbackoff", "failedscheduling", "oomkilled", "probe", "quota", "taint", "pvc", "registry", "certificate",
+]
+
+def main():
+    random.seed(1)
+    with tempfile.TemporaryDirectory() as directory:
+        for i in range(ARTICLES):
+            with open(os.path.join(directory, f"article-{i}.md"), "w") as f:
+                f.write(f"# Article {i} {random.choice(VOCABULARY[-10:])}\n\n" + " ".join(random.choices(VOCABULARY, k=400)))
+
+        kb = KnowledgeBase(directory, cache_size=1024)
+        started = time.perf_counter()
+        kb.refresh()
+        print(f"Indexed {kb.stats()['articles']} articles, {kb.stats()['terms']} terms in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        with open(os.path.join(directory, "article-7.md"), "a") as f:
+            f.write(" crashloopbackoff restart")
+        started = time.perf_counter()
+        kb.refresh()
+        print(f"Re-indexed one changed article in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        query = "pod in CrashLoopBackOff after OOMKilled"
+        cold = min(timeit.repeat(lambda: (kb.cache.clear(), kb.search(query)), number=20, repeat=5)) / 20
+        cached = min(timeit.repeat(lambda: kb.search(query), number=10000, repeat=5)) / 10000
+        print(f"Query: uncached {cold * 1000:.2f} ms, cached {cached * 1000000:.1f} us")
+
+if __name__ == "__main__":
+    main()
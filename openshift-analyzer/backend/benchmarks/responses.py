@@ -0,0 +1,46 @@
+"""
+Serialisation cost of a 10k-item list through response_model versus the
+fast path, run from backend/: python -m benchmarks.responses
+"""
+import asyncio
+import json
+import timeit
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from api.routes import NamespaceInfo, OperatorInfo
+from utils.responses import FastJSONResponse, orjson
+
+NAMESPACES = [
+    {
+        "name": f"project-{i}",
+        "status": "Active",
+        "labels": {"kubernetes.io/metadata.name": f"project-{i}", "team": f"team-{i % 40}"},
+        "annotations": {"openshift.io/requester": f"user{i % 300}", "openshift.io/sa.scc.uid-range": "1000650000/10000"},
+    }
+    for i in range(10000)
+]
+
+OPERATORS = [
+    {"name": f"operator-{i}", "namespace": f"ns-{i % 500}", "version": f"4.{i % 20}.{i % 7}", "channel": "stable", "csv_name": f"operator-{i}.v4.{i % 20}.{i % 7}"}
+    for i in range(10000)
+]
+
+def validated(field, items) -> bytes:
+    content = asyncio.run(serialize_response(field=field, response_content=items))
+    return JSONResponse(content).body
+
+def main():
+    encoder = "orjson" if orjson is not None else "stdlib json"
+    for name, model, items in (("NamespaceInfo", NamespaceInfo, NAMESPACES), ("OperatorInfo", OperatorInfo, OPERATORS)):
+        field = create_response_field(name=f"response_{name}", type_=List[model])
+        assert json.loads(validated(field, items)) == json.loads(FastJSONResponse(items).body)
+        slow = min(timeit.repeat(lambda: validated(field, items), number=3, repeat=3)) / 3
+        fast = min(timeit.repeat(lambda: FastJSONResponse(items).body, number=3, repeat=3)) / 3
+        print(f"{name} x10k: response_model {slow * 1000:.1f} ms, fast path ({encoder}) {fast * 1000:.1f} ms ({slow / fast:.0f}x)")
+
+if __name__ == "__main__":
+    main()
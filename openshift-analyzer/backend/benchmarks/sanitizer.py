@@ -0,0 +1,68 @@
+"""
+Sanitizer against the previous JSON round-trip implementation, run from backend/:
+python -m benchmarks.sanitizer
+"""
+import json
+import timeit
+from typing import Dict, Any
+
+from services.sanitizer import Sanitizer, DEFAULT_STRIP_FIELDS
+
+def legacy_sanitize(resource: Dict[str, Any]) -> Dict[str, Any]:
+    sanitized = json.loads(json.dumps(resource))
+    for field in DEFAULT_STRIP_FIELDS:
+        parts = field.split(".")
+        current = sanitized
+        for i, part in enumerate(parts):
+            if i == len(parts) - 1:
+                if part in current:
+                    del current[part]
+            elif part in current and isinstance(current[part], dict):
+                current = current[part]
+            else:
+                break
+    return sanitized
+
+METADATA = {
+    "name": "example",
+    "namespace": "default",
+    "uid": "0d3c5a8e-5f0a-4b8e-9d1c-2f6a0e9b7c41",
+    "resourceVersion": "123456",
+    "generation": 4,
+    "creationTimestamp": "2024-01-01T00:00:00Z",
+    "annotations": {"kubectl.kubernetes.io/last-applied-configuration": "{}" * 2000},
+    "managedFields": [{"manager": f"m{i}", "fieldsV1": {"f:spec": {}}} for i in range(20)],
+}
+
+CRD = {
+    "apiVersion": "apiextensions.k8s.io/v1",
+    "kind": "CustomResourceDefinition",
+    "metadata": METADATA,
+    "spec": {
+        "versions": [{
+            "name": f"v{v}",
+            "schema": {"openAPIV3Schema": {"properties": {
+                f"field{i}": {"type": "object", "properties": {f"sub{j}": {"type": "string", "description": "x" * 80} for j in range(20)}}
+                for i in range(100)
+            }}},
+        } for v in range(3)],
+    },
+    "status": {"conditions": [{"type": "Established", "status": "True"}] * 10},
+}
+
+CONFIGMAP = {
+    "apiVersion": "v1",
+    "kind": "ConfigMap",
+    "metadata": METADATA,
+    "data": {f"key{i}": "value" * 200 for i in range(2000)},
+}
+
+def main():
+    sanitizer = Sanitizer()
+    for name, resource in (("CRD", CRD), ("ConfigMap", CONFIGMAP)):
+        legacy = min(timeit.repeat(lambda: legacy_sanitize(resource), number=20, repeat=5)) / 20
+        compiled = min(timeit.repeat(lambda: sanitizer.sanitize(resource), number=20, repeat=5)) / 20
+        print(f"{name}: legacy {legacy * 1000:.3f} ms, compiled {compiled * 1000:.3f} ms ({legacy / compiled:.0f}x)")
+
+if __name__ == "__main__":
+    main()
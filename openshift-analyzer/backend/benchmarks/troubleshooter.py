@@ -0,0 +1,48 @@
+"""
+Index lookups and rule evaluation over a full ring buffer, run from
+backend/: python -m benchmarks.troubleshooter
+"""
+import time
+import timeit
+from datetime import datetime, timezone
+from typing import Dict, Any
+
+from services.troubleshooter import EventStore, compile_rules
+
+MESSAGES = [
+    ("BackOff", "Back-off restarting failed container app in pod web-1"),
+    ("Failed", "Error: ImagePullBackOff"),
+    ("FailedScheduling", "0/6 nodes are available: 3 Insufficient cpu, 3 node(s) had untolerated taint"),
+    ("Pulled", "Container image already present on machine"),
+    ("Unhealthy", "Readiness probe failed: connection refused"),
+]
+
+def synthetic_event(i: int) -> Dict[str, Any]:
+    namespace = f"project-{i % 200}"
+    reason, message = MESSAGES[i % 5]
+    stamp = datetime.fromtimestamp(time.time() - i % 1800, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return {
+        "metadata": {"uid": f"event-{i}", "namespace": namespace, "name": f"event-{i}"},
+        "involvedObject": {"kind": "Pod", "namespace": namespace, "name": f"pod-{i % 1000}", "uid": f"pod-{i % 1000}"},
+        "reason": reason,
+        "message": message,
+        "count": 1 + i % 7,
+        "firstTimestamp": stamp,
+        "lastTimestamp": stamp,
+    }
+
+def main():
+    store = EventStore(max_events=20000)
+    started = time.perf_counter()
+    store.replace(synthetic_event(i) for i in range(25000))
+    print(f"Loaded 25000 events into a 20000 slot ring in {(time.perf_counter() - started) * 1000:.0f} ms: {store.stats()}")
+
+    rules = compile_rules()
+    since = time.time() - 3600
+    namespace = min(timeit.repeat(lambda: rules.evaluate(store.for_namespace("project-7"), since), number=100, repeat=5)) / 100
+    pod = min(timeit.repeat(lambda: rules.evaluate(store.for_objects(["pod-7", "pod-207"]), since), number=1000, repeat=5)) / 1000
+    print(f"Namespace report ({len(store.for_namespace('project-7'))} events): {namespace * 1000:.3f} ms")
+    print(f"Object report ({len(store.for_objects(['pod-7', 'pod-207']))} events): {pod * 1000:.3f} ms")
+
+if __name__ == "__main__":
+    main()
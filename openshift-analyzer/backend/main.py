@@ -1,18 +1,34 @@
 import os
-import yaml
+import time
+import asyncio
 import logging
-from fastapi import FastAPI, Depends, HTTPException, Request
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.security import OAuth2PasswordBearer
-from kubernetes import client, config
+from kubernetes import config
 
 # Import local modules
-from api.routes import router as api_router
-from auth.oauth import router as oauth_router
-from auth.ldap import router as ldap_router
-from utils.config import load_config
+from api.routes import router as api_router, RESOURCE_MAP
+from auth.tokens import create_token_verifier, get_token_claims
+from auth.sessions import create_session_store
+from utils.config import Settings, SettingsWatcher, get_settings, changed_sections, on_settings_change
+from services.informer import InformerCache
+from services.discovery import DiscoveryIndex
+from services.sanitizer import Sanitizer
+from services.comparison import ComparisonEngine, KubeconfigClients
+from services.prometheus import PrometheusClient
+from services.capacity import CapacityService, CapacityReportStore
+from services.kb import KnowledgeBase
+from services.troubleshooter import Troubleshooter, compile_rules
+from utils.offload import BlockingExecutor
+from utils.singleflight import SingleFlight
+from utils.kube import ClientManager
+from utils.cache import TTLCache
+from utils.http import create_http_client
+from utils.metrics import MetricsMiddleware, STATS_COLLECTOR, latest as latest_metrics
+from utils.access_log import AccessLogMiddleware, configure_access_logger
 
 # Setup logging
 logging.basicConfig(
@@ -21,118 +37,574 @@ logging.basicConfig(
 )
 logger = logging.getLogger("openshift-analyzer")
 
-# Load configuration
-config_path = os.environ.get("CONFIG_PATH", "/app/config/config.yaml")
-try:
-    app_config = load_config(config_path)
-    logger.info(f"Configuration loaded from {config_path}")
-except Exception as e:
-    logger.error(f"Failed to load configuration: {e}")
-    app_config = {}
+# Load configuration once; components read their sections from these settings
+settings = get_settings()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start components in dependency order, serve, then stop them in reverse
+
+    Only what requests need right away is created before the app starts
+    serving; API discovery, informer syncs and LDAP binds are warmed up in
+    the background and reported by /health/ready.
+    """
+    app.state.warmup = {}
+    app.state.ready = False
+    app.state.draining = False
+    for start in STARTUP:
+        await start()
+    warmup = asyncio.create_task(warm_up())
+    try:
+        yield
+    finally:
+        # Fail readiness first so the endpoint is taken out of rotation while stopping
+        app.state.draining = True
+        warmup.cancel()
+        for stop in SHUTDOWN:
+            await stop()
 
 # Initialize FastAPI app
 app = FastAPI(
-    title=app_config.get("app", {}).get("name", "OpenShift Analyzer"),
-    description=app_config.get("app", {}).get("description", "OpenShift resource analysis tool"),
-    version=app_config.get("app", {}).get("version", "1.0.0"),
+    title=settings.app.name,
+    description=settings.app.description,
+    version=settings.app.version,
+    lifespan=lifespan,
 )
 
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=app_config.get("server", {}).get("cors", {}).get("origins", ["*"]),
+    allow_origins=settings.server.cors.get("origins", ["*"]),
     allow_credentials=True,
-    allow_methods=app_config.get("server", {}).get("cors", {}).get("methods", ["*"]),
-    allow_headers=app_config.get("server", {}).get("cors", {}).get("headers", ["*"]),
+    allow_methods=settings.server.cors.get("methods", ["*"]),
+    allow_headers=settings.server.cors.get("headers", ["*"]),
+)
+
+# Opt-in: list and resource routes encode apiserver data directly instead of
+# validating it against their response models
+app.state.fast_json = settings.server.fast_json
+
+# Request latency by route template and in-flight requests
+metrics_config = settings.metrics
+metrics_enabled = metrics_config.get("enabled", True)
+if metrics_enabled:
+    app.add_middleware(MetricsMiddleware, exclude_paths=metrics_config.get("exclude_paths", ["/metrics", "/health", "/health/live", "/health/ready"]))
+
+# Structured access log, written from a background thread
+access_log_config = settings.access_log
+access_log_listener = None
+if access_log_config.get("enabled", True):
+    access_log_listener = configure_access_logger()
+    app.add_middleware(
+        AccessLogMiddleware,
+        exclude_paths=access_log_config.get("exclude_paths", ["/health", "/metrics"]),
+        sample_rates=access_log_config.get("sample_rates", {}),
+        default_sample_rate=float(access_log_config.get("default_sample_rate", 1.0)),
+        slow_threshold=float(access_log_config.get("slow_threshold", 5.0)),
+    )
+
+# Blocking Kubernetes client calls run in a bounded pool so a slow apiserver
+# call does not stall the event loop
+kube_config = settings.kubernetes
+app.state.kube_executor = BlockingExecutor(
+    "kube",
+    max_concurrency=int(kube_config.get("max_concurrency", 32)),
+    timeout=float(kube_config.get("timeout", 30)),
+    timeout_kwarg="_request_timeout",
 )
 
-# Initialize Kubernetes client
+# ClusterInfo is polled by every browser tab but almost never changes
+app.state.cluster_info_cache = TTLCache(maxsize=1, ttl=float(kube_config.get("cluster_info_ttl", 300)))
+
+# Identical reads issued while one is in flight share its apiserver call
+app.state.kube_flight = SingleFlight(enabled=bool(kube_config.get("coalesce_reads", True)))
+
+# Troubleshooting rule evaluation, KB scoring, comparison snapshot hashing and
+# export YAML dumps are CPU-bound; a small pool of their own keeps them off the
+# event loop without taking apiserver slots
+app.state.analysis_executor = BlockingExecutor(
+    "analysis",
+    max_concurrency=int(settings.feature("troubleshooter").get("max_concurrency", 4)),
+    timeout=None,
+)
+
+STATS_COLLECTOR.register_executor("kube", app.state.kube_executor.stats)
+STATS_COLLECTOR.register_executor("analysis", app.state.analysis_executor.stats)
+STATS_COLLECTOR.register_cache("cluster_info", app.state.cluster_info_cache.stats)
+
+# Metadata cleaner field paths are compiled once
 try:
-    if app_config.get("kubernetes", {}).get("in_cluster", True):
-        config.load_incluster_config()
-        logger.info("Loaded in-cluster Kubernetes configuration")
-    else:
-        kubeconfig_path = app_config.get("kubernetes", {}).get("kubeconfig_path")
-        if kubeconfig_path and os.path.exists(kubeconfig_path):
-            config.load_kube_config(kubeconfig_path)
-            logger.info(f"Loaded Kubernetes configuration from {kubeconfig_path}")
+    app.state.sanitizer = Sanitizer(settings.feature("metadata_cleaner").get("strip_fields"))
+except ValueError as e:
+    logger.error(f"Invalid metadata_cleaner.strip_fields, using defaults: {e}")
+    app.state.sanitizer = Sanitizer()
+
+async def start_access_log():
+    """Start the thread writing access log records"""
+    if access_log_listener is not None:
+        access_log_listener.start()
+
+async def stop_access_log():
+    """Flush pending access log records"""
+    if access_log_listener is not None:
+        access_log_listener.stop()
+
+# Settings read per request; every other section is applied when components
+# are built at startup, so changing it needs a restart
+RELOADABLE_SECTIONS = {"app"}
+
+def warn_restart_required(old: Settings, new: Settings):
+    restart = [name for name in changed_sections(old, new) if name not in RELOADABLE_SECTIONS]
+    if restart:
+        logger.warning(f"Changes to {', '.join(restart)} take effect after a restart")
+
+async def start_config_watcher():
+    """Reload the settings when the mounted ConfigMap changes"""
+    reload_config = settings.server.config_reload
+    app.state.config_watcher = None
+    if not reload_config.get("enabled", True):
+        return
+    on_settings_change(warn_restart_required)
+    app.state.config_watcher = SettingsWatcher(poll_interval=float(reload_config.get("poll_interval", 10)))
+    app.state.config_watcher.start()
+
+async def stop_config_watcher():
+    """Stop watching the configuration file"""
+    if app.state.config_watcher is not None:
+        await app.state.config_watcher.stop()
+
+async def start_http_client():
+    """Create the shared client for outbound HTTP calls"""
+    app.state.http_client = create_http_client(settings.http)
+
+async def stop_http_client():
+    """Close pooled outbound HTTP connections"""
+    await app.state.http_client.aclose()
+
+def load_kube_config():
+    """Load the in-cluster or kubeconfig credentials used as the client default"""
+    try:
+        if settings.kubernetes.get("in_cluster", True):
+            config.load_incluster_config()
+            logger.info("Loaded in-cluster Kubernetes configuration")
         else:
-            config.load_kube_config()
-            logger.info("Loaded default Kubernetes configuration")
-except Exception as e:
-    logger.error(f"Failed to load Kubernetes configuration: {e}")
+            kubeconfig_path = settings.kubernetes.get("kubeconfig_path")
+            if kubeconfig_path and os.path.exists(kubeconfig_path):
+                config.load_kube_config(kubeconfig_path)
+                logger.info(f"Loaded Kubernetes configuration from {kubeconfig_path}")
+            else:
+                config.load_kube_config()
+                logger.info("Loaded default Kubernetes configuration")
+    except Exception as e:
+        logger.error(f"Failed to load Kubernetes configuration: {e}")
+
+async def start_kube_clients():
+    """Load the Kubernetes credentials and create the shared, pooled API clients"""
+    # Kubeconfig parsing and exec credential plugins block, so they run off the event loop
+    await asyncio.to_thread(load_kube_config)
+    pool_config = kube_config.get("connection_pool", {})
+    app.state.kube_clients = ClientManager(
+        pool_maxsize=int(pool_config.get("maxsize", kube_config.get("max_concurrency", 32))),
+        watch_pool_maxsize=int(pool_config.get("watch_maxsize", 16)),
+        pool_block=pool_config.get("block", False),
+        keepalive=pool_config.get("keepalive", True),
+        keepalive_idle=int(pool_config.get("keepalive_idle", 60)),
+    )
+
+async def start_discovery():
+    """Create the kind to API resource index; it serves the built-in resource map until warmed up"""
+    discovery_config = kube_config.get("discovery", {})
+    app.state.discovery = DiscoveryIndex(
+        app.state.kube_clients.api_client,
+        fallback=RESOURCE_MAP,
+        refresh_interval=float(discovery_config.get("refresh_interval", 300)),
+    )
+
+async def warm_discovery():
+    """Build the kind to API resource index once, then refresh it in the background"""
+    discovery = app.state.discovery
+    try:
+        # refresh() fans out over its own thread pool and takes no request timeout
+        await asyncio.wait_for(asyncio.to_thread(discovery.refresh), float(kube_config.get("discovery", {}).get("timeout", 60)))
+        app.state.warmup["discovery"] = "ready"
+    except Exception as e:
+        logger.error(f"Initial API discovery failed, using built-in resource map: {e}")
+        app.state.warmup["discovery"] = "fallback"
+    discovery.start()
+
+async def start_comparison():
+    """Create the cross-cluster comparison engine when the feature is enabled"""
+    comparison_config = settings.feature("cluster_comparison")
+    if not comparison_config.get("enabled", True):
+        return
+    clients = KubeconfigClients(
+        app.state.kube_clients.api_client,
+        comparison_config.get("kubeconfig_path", kube_config.get("kubeconfig_path")),
+    )
+    app.state.comparison = ComparisonEngine(
+        app.state.kube_executor,
+        app.state.analysis_executor,
+        app.state.sanitizer,
+        app.state.discovery.lookup,
+        clients.get,
+        default_kinds=comparison_config.get("default_resource_types", []),
+        result_ttl=float(comparison_config.get("result_ttl", 1800)),
+    )
+
+async def start_capacity():
+    """Create the Prometheus client and the node capacity report service"""
+    prometheus_config = settings.prometheus
+    prometheus = None
+    if prometheus_config.get("url"):
+        try:
+            prometheus = PrometheusClient(
+                prometheus_config["url"],
+                token_path=prometheus_config.get("token_path"),
+                verify=prometheus_config.get("ca_path") or prometheus_config.get("verify", True),
+                timeout=float(prometheus_config.get("timeout", 30)),
+                step=float(prometheus_config.get("step", 30)),
+                cache_size=int(prometheus_config.get("cache_size", 256)),
+                max_connections=int(prometheus_config.get("max_connections", 10)),
+            )
+        except OSError as e:
+            # Typically the service CA bundle is not mounted outside the cluster
+            logger.error(f"Cannot create the Prometheus client, node metrics are unavailable: {e}")
+    app.state.prometheus = prometheus
+    if prometheus is not None:
+        STATS_COLLECTOR.register_cache("prometheus_query", prometheus.cache.stats)
+
+    capacity_config = settings.feature("capacity")
+    if not capacity_config.get("enabled", True):
+        return
+    app.state.capacity = CapacityService(
+        app.state.kube_executor,
+        app.state.kube_clients.api_client,
+        app.state.discovery.lookup,
+        prometheus,
+        namespace_pattern=capacity_config.get("namespace_pattern", ".*"),
+    )
+
+    report_dir = capacity_config.get("report_dir")
+    if report_dir:
+        try:
+            app.state.capacity_store = CapacityReportStore(report_dir)
+        except OSError as e:
+            logger.error(f"Cannot use capacity report directory {report_dir}: {e}")
+
+async def start_kb():
+    """Create the local KB search index; articles are indexed during warm-up"""
+    troubleshooter_config = settings.feature("troubleshooter")
+    kb_config = troubleshooter_config.get("kb_search", {})
+    if not troubleshooter_config.get("enabled", True) or not kb_config.get("enabled", True):
+        return
+    if kb_config.get("source", "local") != "local":
+        logger.warning(f"KB source {kb_config.get('source')} is not supported, searching local articles only")
+    app.state.kb = KnowledgeBase(
+        kb_config.get("directory", "/app/kb"),
+        max_results=int(kb_config.get("max_results", 5)),
+        cache_size=int(kb_config.get("cache_size", 1024)),
+        reload_interval=float(kb_config.get("reload_interval", 60)),
+    )
+    STATS_COLLECTOR.register_cache("kb_search", app.state.kb.cache.stats)
+
+async def warm_kb():
+    """Build the KB index, then pick up article changes in the background"""
+    kb = getattr(app.state, "kb", None)
+    if kb is None:
+        return
+    try:
+        await asyncio.to_thread(kb.refresh)
+        app.state.warmup["kb"] = "ready"
+    except Exception as e:
+        logger.error(f"Cannot index KB articles in {kb.directory}: {e}")
+        app.state.warmup["kb"] = "unavailable"
+    kb.start()
 
-# Mount API router
-app.include_router(api_router, prefix="/api", tags=["api"])
+async def start_troubleshooter():
+    """Watch Events cluster-wide into the indexed store used by the troubleshooting rules"""
+    troubleshooter_config = settings.feature("troubleshooter")
+    if not troubleshooter_config.get("enabled", True):
+        return
+    try:
+        rules = compile_rules(troubleshooter_config.get("rules", []))
+    except ValueError as e:
+        logger.error(f"Ignoring configured troubleshooter rules: {e}")
+        rules = compile_rules()
+
+    events_config = troubleshooter_config.get("events", {})
+    informer_config = kube_config.get("informers", {})
+    app.state.troubleshooter = Troubleshooter(
+        app.state.kube_clients.watch_client,
+        app.state.kube_executor,
+        app.state.analysis_executor,
+        app.state.kube_clients.api_client,
+        app.state.kube_flight,
+        app.state.discovery.lookup,
+        lambda: getattr(app.state, "informers", None),
+        rules,
+        max_events=int(events_config.get("max_events", 20000)),
+        window=float(events_config.get("window", 3600)),
+        page_size=int(informer_config.get("page_size", 500)),
+        watch_timeout=int(informer_config.get("watch_timeout", 300)),
+        kb=getattr(app.state, "kb", None),
+    )
+    app.state.troubleshooter.start()
+
+async def start_token_verifier():
+    """Create the JWT verifier shared by the API and auth routes"""
+    if not auth_enabled:
+        return
+    app.state.token_verifier = create_token_verifier(settings.auth.jwt)
+    STATS_COLLECTOR.register_cache("auth_tokens", app.state.token_verifier.cache.stats)
+
+async def start_sessions():
+    """Create the server-side session store used by the OAuth login"""
+    if not (auth_enabled and auth_type == "oauth"):
+        return
+    app.state.session_store = create_session_store(settings.auth.sessions)
+    if app.state.session_store.backend == "memory":
+        STATS_COLLECTOR.register_cache("sessions", app.state.session_store.cache.stats)
+    logger.info(f"Using {app.state.session_store.backend} sessions")
+
+async def start_ldap():
+    """Create the LDAP connection pools and warm the service connections in the background"""
+    if not (auth_enabled and auth_type == "ldap"):
+        return
+
+    from auth.ldap import create_ldap_authenticator
+
+    ldap_config = settings.auth.ldap
+    pool_config = ldap_config.get("pool", {})
+    authenticator = create_ldap_authenticator(pool_config, ldap_config.get("cache", {}))
+    app.state.ldap_authenticator = authenticator
+    app.state.ldap_executor = BlockingExecutor(
+        "ldap",
+        max_concurrency=int(pool_config.get("size", 4)) + int(pool_config.get("bind_size", 8)),
+        timeout=float(pool_config.get("timeout", 10)) * 2,
+    )
+    STATS_COLLECTOR.register_executor("ldap", app.state.ldap_executor.stats)
+    STATS_COLLECTOR.register_cache("ldap_users", authenticator.cache.stats)
+
+async def warm_ldap():
+    """Pre-bind the LDAP service connections ahead of the first logins"""
+    authenticator = getattr(app.state, "ldap_authenticator", None)
+    if authenticator is None:
+        return
+    try:
+        await app.state.ldap_executor.run(authenticator.warm)
+        app.state.warmup["ldap"] = "ready"
+    except Exception as e:
+        logger.warning(f"Could not pre-bind LDAP connections: {e}")
+        app.state.warmup["ldap"] = "unavailable"
+
+async def start_informers():
+    """Start list+watch informers so API reads are served from memory"""
+    informer_config = settings.kubernetes.get("informers", {})
+    if not informer_config.get("enabled", True):
+        logger.info("Informer cache disabled")
+        return
+
+    informers = InformerCache(
+        app.state.kube_clients.watch_client,
+        page_size=int(informer_config.get("page_size", 500)),
+        watch_timeout=int(informer_config.get("watch_timeout", 300)),
+    )
+    informers.start(informer_config.get("kinds", ["Namespace", "ClusterServiceVersion", "ClusterVersion"]), app.state.discovery.lookup)
+    app.state.informers = informers
+
+    # Drop the cached ClusterInfo as soon as the ClusterVersion changes
+    if informers.informer("ClusterVersion") is not None:
+        informers.add_handler("ClusterVersion", lambda event_type, obj: app.state.cluster_info_cache.clear())
+    logger.info(f"Started informers for {', '.join(informers.status().keys())}")
+
+    # Reads fall back to the apiserver until an informer has synced, so
+    # readiness only waits a bounded time for the initial lists
+    synced = await asyncio.to_thread(informers.wait_for_sync, float(informer_config.get("sync_timeout", 30)))
+    app.state.warmup["informers"] = "ready" if synced else "syncing"
+
+async def warm_up():
+    """Warm caches and connections in the background, then report the app ready"""
+    started = time.perf_counter()
+    await warm_discovery()
+    # Informers resolve their kinds through discovery, so they start afterwards
+    await asyncio.gather(start_informers(), warm_ldap(), warm_kb())
+    app.state.ready = True
+    logger.info(f"Warm-up finished in {time.perf_counter() - started:.2f}s: {app.state.warmup}")
+
+async def stop_informers():
+    """Stop informer and discovery loops, the Kubernetes call pool and client connections"""
+    informers = getattr(app.state, "informers", None)
+    if informers is not None:
+        informers.stop()
+    troubleshooter = getattr(app.state, "troubleshooter", None)
+    if troubleshooter is not None:
+        troubleshooter.stop()
+    kb = getattr(app.state, "kb", None)
+    if kb is not None:
+        kb.stop()
+    app.state.discovery.stop()
+    app.state.kube_executor.shutdown()
+    app.state.analysis_executor.shutdown()
+    app.state.kube_clients.close()
+    if app.state.prometheus is not None:
+        await app.state.prometheus.close()
+    ldap_authenticator = getattr(app.state, "ldap_authenticator", None)
+    if ldap_authenticator is not None:
+        app.state.ldap_executor.shutdown()
+        ldap_authenticator.close()
+    token_verifier = getattr(app.state, "token_verifier", None)
+    if token_verifier is not None:
+        await token_verifier.close()
+    session_store = getattr(app.state, "session_store", None)
+    if session_store is not None:
+        await session_store.close()
 
 # Configure authentication based on config
-auth_enabled = app_config.get("auth", {}).get("enabled", False)
-auth_type = app_config.get("auth", {}).get("type", "none")
+auth_enabled = settings.auth.enabled
+auth_type = settings.auth.type
 
+# Mount API router; every API request needs a verified token when auth is enabled
+app.include_router(
+    api_router,
+    prefix="/api",
+    tags=["api"],
+    dependencies=[Depends(get_token_claims)] if auth_enabled else [],
+)
+
+# Only the configured backend is imported; python-ldap is not loaded for OAuth
 if auth_enabled:
     if auth_type == "oauth":
+        from auth.oauth import router as oauth_router
         app.include_router(oauth_router, prefix="/auth", tags=["auth"])
         logger.info("OAuth authentication enabled")
     elif auth_type == "ldap":
+        from auth.ldap import router as ldap_router
         app.include_router(ldap_router, prefix="/auth", tags=["auth"])
         logger.info("LDAP authentication enabled")
     else:
         logger.warn(f"Unknown authentication type: {auth_type}")
 
-# Mount static files (frontend)
-try:
-    app.mount("/", StaticFiles(directory="/app/frontend", html=True), name="frontend")
-    logger.info("Mounted frontend static files")
-except Exception as e:
-    logger.warning(f"Failed to mount frontend static files: {e}")
+# Run by lifespan in this order before serving; warm_up() continues in the background
+STARTUP = [
+    start_access_log,
+    start_config_watcher,
+    start_http_client,
+    start_kube_clients,
+    start_discovery,
+    start_comparison,
+    start_capacity,
+    start_kb,
+    start_troubleshooter,
+    start_token_verifier,
+    start_sessions,
+    start_ldap,
+]
+SHUTDOWN = [
+    stop_informers,
+    stop_http_client,
+    stop_config_watcher,
+    stop_access_log,
+]
 
 @app.get("/health")
-async def health_check():
-    """Health check endpoint for liveness/readiness probes"""
+@app.get("/health/live")
+async def health_live():
+    """Liveness: the process is up and the event loop is responsive"""
     return {"status": "ok"}
 
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness: warm-up has finished and the app is not shutting down"""
+    warmup = getattr(app.state, "warmup", {})
+    if not getattr(app.state, "ready", False) or app.state.draining:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "draining" if getattr(app.state, "draining", False) else "starting", "warmup": warmup},
+        )
+    return {"status": "ok", "warmup": warmup}
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics"""
+    if not metrics_enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    body, content_type = latest_metrics()
+    return Response(body, media_type=content_type)
+
+@app.get("/status")
+async def get_status():
+    """Kubernetes client pool, executor, informer, Prometheus and cache usage"""
+    informers = getattr(app.state, "informers", None)
+    prometheus = getattr(app.state, "prometheus", None)
+    ldap_authenticator = getattr(app.state, "ldap_authenticator", None)
+    token_verifier = getattr(app.state, "token_verifier", None)
+    session_store = getattr(app.state, "session_store", None)
+    troubleshooter = getattr(app.state, "troubleshooter", None)
+    kb = getattr(app.state, "kb", None)
+    return {
+        "auth": {
+            "token_cache": token_verifier.cache.stats() if token_verifier is not None else {},
+            "sessions": session_store.stats() if session_store is not None else {},
+        },
+        "ldap": ldap_authenticator.stats() if ldap_authenticator is not None else {},
+        "troubleshooter": troubleshooter.stats() if troubleshooter is not None else {},
+        "kb": kb.stats() if kb is not None else {},
+        "prometheus": {
+            "query_cache": prometheus.cache.stats() if prometheus is not None else {},
+        },
+        "kubernetes": {
+            "connection_pools": app.state.kube_clients.stats(),
+            "executor": app.state.kube_executor.stats(),
+            "coalesced_reads": app.state.kube_flight.stats(),
+            "informers": informers.status() if informers is not None else {},
+            "cluster_info_cache": app.state.cluster_info_cache.stats(),
+        }
+    }
+
 @app.get("/config")
-async def get_public_config():
-    """Returns public configuration for frontend"""
+async def get_public_config(current: Settings = Depends(get_settings)):
+    """Returns public configuration for frontend, reflecting reloaded settings"""
     public_config = {
-        "app": app_config.get("app", {}),
+        "app": current.app.dict(),
         "features": {
             "metadata_cleaner": {
-                "enabled": app_config.get("features", {}).get("metadata_cleaner", {}).get("enabled", True)
+                "enabled": current.feature("metadata_cleaner").get("enabled", True)
             },
             "troubleshooter": {
-                "enabled": app_config.get("features", {}).get("troubleshooter", {}).get("enabled", True),
+                "enabled": current.feature("troubleshooter").get("enabled", True),
                 "kb_search": {
-                    "enabled": app_config.get("features", {}).get("troubleshooter", {}).get("kb_search", {}).get("enabled", True)
+                    "enabled": current.feature("troubleshooter").get("kb_search", {}).get("enabled", True)
                 }
             },
             "cluster_comparison": {
-                "enabled": app_config.get("features", {}).get("cluster_comparison", {}).get("enabled", True),
-                "default_resource_types": app_config.get("features", {}).get("cluster_comparison", {}).get("default_resource_types", [])
+                "enabled": current.feature("cluster_comparison").get("enabled", True),
+                "default_resource_types": list(current.feature("cluster_comparison").get("default_resource_types", []))
             },
             "operator_analysis": {
-                "enabled": app_config.get("features", {}).get("operator_analysis", {}).get("enabled", True)
+                "enabled": current.feature("operator_analysis").get("enabled", True)
             }
         },
         "auth": {
+            # Auth routes are mounted at startup, so these do not follow reloads
             "enabled": auth_enabled,
             "type": auth_type
         }
     }
     return public_config
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Middleware to log all requests"""
-    logger.info(f"{request.method} {request.url.path}")
-    response = await call_next(request)
-    return response
+# Mount static files (frontend) last; a mount at / would shadow every route declared after it
+try:
+    app.mount("/", StaticFiles(directory="/app/frontend", html=True), name="frontend")
+    logger.info("Mounted frontend static files")
+except Exception as e:
+    logger.warning(f"Failed to mount frontend static files: {e}")
 
 if __name__ == "__main__":
     import uvicorn
     
-    host = app_config.get("server", {}).get("host", "0.0.0.0")
-    port = int(app_config.get("server", {}).get("port", 8080))
-    debug = app_config.get("server", {}).get("debug", False)
+    host = settings.server.host
+    port = settings.server.port
+    debug = settings.server.debug
     
-    uvicorn.run("main:app", host=host, port=port, reload=debug) 
\ No newline at end of file
+    uvicorn.run("main:app", host=host, port=port, reload=debug)
@@ -0,0 +1,410 @@
+import asyncio
+import csv
+import logging
+import os
+import re
+import tempfile
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Callable, Iterator
+from kubernetes import client
+from kubernetes.client.rest import ApiException
+
+from services.prometheus import PrometheusClient, PrometheusError
+from utils.kube import resource_path, get_json
+from utils.offload import BlockingExecutor
+
+logger = logging.getLogger("openshift-analyzer")
+
+MACHINE_API_NAMESPACE = "openshift-machine-api"
+MACHINESET_LABEL = "machine.openshift.io/cluster-api-machineset"
+CONTROL_PLANE_LABELS = ("node-role.kubernetes.io/master", "node-role.kubernetes.io/control-plane")
+
+# Requests of running or pending pods over allocatable, for every node in one query
+REQUESTED_RATIO_QUERY = (
+    "sum by (node) ("
+    "sum by (node, namespace, pod) (kube_pod_container_resource_requests{{resource='{resource}', namespace=~'{namespaces}'}})"
+    " * on (namespace, pod) group_left() "
+    "max by (namespace, pod) (kube_pod_status_phase{{phase=~'Pending|Running'}} == 1)"
+    ") / sum by (node) (kube_node_status_allocatable{{resource='{resource}'}})"
+)
+
+# Per-node metrics, each a single "by (node)" aggregation over all nodes
+NODE_METRIC_QUERIES = {
+    "cpu_requested": REQUESTED_RATIO_QUERY.replace("{resource}", "cpu"),
+    "memory_requested": REQUESTED_RATIO_QUERY.replace("{resource}", "memory"),
+    "cpu_usage": (
+        "sum by (node) (rate(container_cpu_usage_seconds_total{{container!='', pod!=''}}[5m]))"
+        " / sum by (node) (kube_node_status_allocatable{{resource='cpu'}})"
+    ),
+    "memory_usage": (
+        "sum by (node) (container_memory_working_set_bytes{{container!='', pod!=''}})"
+        " / sum by (node) (kube_node_status_allocatable{{resource='memory'}})"
+    ),
+}
+
+XLSX_HEADER = ["Machineset", "Desired", "Current", "Ready", "Available", "Age", "MachineName", "Node", "QueryResultCpu", "QueryResultMem"]
+
+# Report columns in workbook order, with the type used to restore values read back from CSV
+COLUMNS = [
+    ("machineset", str),
+    ("desired", int),
+    ("current", int),
+    ("ready", int),
+    ("available", int),
+    ("age", str),
+    ("machine", str),
+    ("node", str),
+    ("cpu_requested", float),
+    ("memory_requested", float),
+]
+
+MEDIA_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+class CapacityService:
+    """
+    Worker node capacity report and per-node metrics
+
+    Nodes, Machines and MachineSets are each read with one paginated list
+    and joined in memory; every node metric comes from one vectorised
+    PromQL query covering all nodes. Queries go through the shared
+    PrometheusClient cache, so the report and dashboards polling
+    node_metrics() within the same step window reuse each other's results.
+    """
+
+    def __init__(
+        self,
+        kube: BlockingExecutor,
+        api_client: client.ApiClient,
+        lookup: Callable[[str], Optional[Dict[str, Any]]],
+        prometheus: Optional[PrometheusClient],
+        namespace_pattern: str = ".*",
+        page_size: int = 500,
+    ):
+        self.kube = kube
+        self.api_client = api_client
+        self.lookup = lookup
+        self.prometheus = prometheus
+        self.namespace_pattern = namespace_pattern
+        self.page_size = page_size
+
+    async def report(self) -> Dict[str, Any]:
+        """
+        Build the capacity report for the local cluster
+
+        Returns:
+            Dict with cluster, nodes (one row per worker node) and errors
+        """
+        errors: Dict[str, str] = {}
+        infrastructure, nodes, machines, machinesets, cpu, memory = await asyncio.gather(
+            self._get("Infrastructure", "cluster", errors),
+            self._list("Node", None, errors),
+            self._list("Machine", MACHINE_API_NAMESPACE, errors),
+            self._list("MachineSet", MACHINE_API_NAMESPACE, errors),
+            self._node_metric("cpu_requested", None, errors),
+            self._node_metric("memory_requested", None, errors),
+        )
+
+        machine_by_node = {}
+        for machine in machines:
+            node_ref = machine.get("status", {}).get("nodeRef") or {}
+            if node_ref.get("name"):
+                machine_by_node[node_ref["name"]] = machine
+        machineset_by_name = {machineset["metadata"]["name"]: machineset for machineset in machinesets}
+
+        now = datetime.now(timezone.utc)
+        rows = []
+        for node in sorted(nodes, key=lambda node: node["metadata"]["name"]):
+            labels = node["metadata"].get("labels") or {}
+            if any(label in labels for label in CONTROL_PLANE_LABELS):
+                continue
+
+            name = node["metadata"]["name"]
+            machine = machine_by_node.get(name)
+            machineset_name = _machineset_name(machine) if machine else None
+            machineset = machineset_by_name.get(machineset_name, {})
+            status = machineset.get("status", {})
+            rows.append({
+                "machineset": machineset_name,
+                "desired": machineset.get("spec", {}).get("replicas"),
+                "current": status.get("replicas"),
+                "ready": status.get("readyReplicas"),
+                "available": status.get("availableReplicas"),
+                "age": _age(machineset["metadata"].get("creationTimestamp"), now) if machineset else None,
+                "machine": machine["metadata"]["name"] if machine else None,
+                "node": name,
+                "cpu_requested": cpu.get(name),
+                "memory_requested": memory.get(name),
+            })
+
+        return {
+            "cluster": (infrastructure or {}).get("status", {}).get("infrastructureName", "cluster"),
+            "nodes": rows,
+            "errors": errors,
+        }
+
+    async def _list(self, kind: str, namespace: Optional[str], errors: Dict[str, str]) -> List[Dict[str, Any]]:
+        resource_info = self.lookup(kind)
+        if not resource_info:
+            # The Machine API is absent on UPI and hosted control plane clusters
+            errors[kind] = "not served by this cluster"
+            return []
+
+        path = resource_path(resource_info, namespace)
+        items = []
+        continue_token = None
+        try:
+            while True:
+                query_params = [("limit", self.page_size)]
+                if continue_token:
+                    query_params.append(("continue", continue_token))
+
+                page = await self.kube.run(get_json, self.api_client, path, query_params)
+                items.extend(page.get("items", []))
+
+                continue_token = page.get("metadata", {}).get("continue")
+                if not continue_token:
+                    return items
+
+        except ApiException as e:
+            logger.warning(f"Capacity report: listing {kind} failed: {e.status} {e.reason}")
+            errors[kind] = f"{e.status} {e.reason}"
+        except asyncio.TimeoutError:
+            logger.warning(f"Capacity report: listing {kind} timed out")
+            errors[kind] = "timed out waiting for the Kubernetes API"
+        return []
+
+    async def _get(self, kind: str, name: str, errors: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        resource_info = self.lookup(kind)
+        if not resource_info:
+            return None
+        try:
+            return await self.kube.run(get_json, self.api_client, resource_path(resource_info, None, name))
+        except (ApiException, asyncio.TimeoutError) as e:
+            logger.warning(f"Capacity report: reading {kind}/{name} failed: {e}")
+            errors[kind] = str(e)
+            return None
+
+    async def node_metrics(self, nodes: Optional[List[str]] = None, metrics: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Get node metrics for dashboards
+
+        Args:
+            nodes: Restrict the result to these nodes, default all
+            metrics: Names from NODE_METRIC_QUERIES, default all
+
+        Returns:
+            Dict with nodes ({node: {metric: value}}) and errors
+
+        Raises:
+            ValueError: If a metric name is unknown
+        """
+        metrics = metrics or list(NODE_METRIC_QUERIES)
+        unknown = [metric for metric in metrics if metric not in NODE_METRIC_QUERIES]
+        if unknown:
+            raise ValueError(f"Unknown node metrics: {', '.join(unknown)}")
+
+        errors: Dict[str, str] = {}
+        results = await asyncio.gather(*(self._node_metric(metric, nodes, errors) for metric in metrics))
+
+        by_node: Dict[str, Dict[str, float]] = {}
+        for metric, values in zip(metrics, results):
+            for node, value in values.items():
+                by_node.setdefault(node, {})[metric] = value
+        return {"nodes": by_node, "errors": errors}
+
+    async def _node_metric(self, metric: str, nodes: Optional[List[str]], errors: Dict[str, str]) -> Dict[str, float]:
+        if self.prometheus is None:
+            errors[f"prometheus/{metric}"] = "Prometheus is not configured"
+            return {}
+        promql = NODE_METRIC_QUERIES[metric].format(namespaces=self.namespace_pattern)
+        try:
+            return await self.prometheus.query_by_label(promql, "node", nodes)
+        except PrometheusError as e:
+            logger.warning(f"Node metric {metric} query failed: {e}")
+            errors[f"prometheus/{metric}"] = str(e)
+            return {}
+
+def _machineset_name(machine: Dict[str, Any]) -> Optional[str]:
+    labels = machine["metadata"].get("labels") or {}
+    if MACHINESET_LABEL in labels:
+        return labels[MACHINESET_LABEL]
+    for owner in machine["metadata"].get("ownerReferences") or []:
+        if owner.get("kind") == "MachineSet":
+            return owner.get("name")
+    return None
+
+def _age(timestamp: Optional[str], now: datetime) -> Optional[str]:
+    """
+    Format the time since an RFC 3339 timestamp the way oc does (5d, 3h, 12m)
+    """
+    if not timestamp:
+        return None
+    created = datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    seconds = int((now - created).total_seconds())
+    if seconds >= 86400:
+        return f"{seconds // 86400}d"
+    if seconds >= 3600:
+        return f"{seconds // 3600}h"
+    if seconds >= 60:
+        return f"{seconds // 60}m"
+    return f"{max(seconds, 0)}s"
+
+def report_rows(report: Dict[str, Any]) -> Iterator[List[Any]]:
+    """
+    Yield the rows of a capacity report in column order
+    """
+    for row in report["nodes"]:
+        yield [row[column] for column, _ in COLUMNS]
+
+def write_xlsx(path: str, sheets: Iterator[tuple]):
+    """
+    Write (sheet name, rows) pairs to a workbook in write-only mode
+
+    Rows are streamed to disk as they are produced, so memory does not
+    grow with the number of sheets or rows.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for name, rows in sheets:
+        # Sheet names are limited to 31 characters and cannot contain []:*?/\
+        sheet = workbook.create_sheet(re.sub(r"[\[\]:*?/\\]", "_", name)[:31])
+        sheet.append(XLSX_HEADER)
+        for row in rows:
+            sheet.append(row)
+    workbook.save(path)
+
+def write_parquet(path: str, partitions: Iterator[tuple], batch_size: int = 10000):
+    """
+    Write (cluster, rows) pairs to a Parquet file, one or more row groups per cluster
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_types = {str: pa.string(), int: pa.int64(), float: pa.float64()}
+    schema = pa.schema([("cluster", pa.string())] + [(column, arrow_types[kind]) for column, kind in COLUMNS])
+
+    def flush(cluster: str, batch: List[List[Any]]):
+        columns = [[cluster] * len(batch)] + [list(values) for values in zip(*batch)]
+        writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+
+    with pq.ParquetWriter(path, schema) as writer:
+        for cluster, rows in partitions:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) == batch_size:
+                    flush(cluster, batch)
+                    batch = []
+            if batch:
+                flush(cluster, batch)
+
+def export_file(partitions: Iterator[tuple], format: str) -> str:
+    """
+    Write (cluster, rows) pairs to a temporary xlsx, csv or parquet file
+
+    Returns:
+        Path of the file, to be deleted by the caller
+
+    Raises:
+        ValueError: If the format is not supported
+        ImportError: If the library for the format is not installed
+    """
+    fd, path = tempfile.mkstemp(suffix=f".{format}")
+    os.close(fd)
+    try:
+        if format == "xlsx":
+            write_xlsx(path, partitions)
+        elif format == "parquet":
+            write_parquet(path, partitions)
+        elif format == "csv":
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["cluster"] + [column for column, _ in COLUMNS])
+                for cluster, rows in partitions:
+                    writer.writerows([cluster] + row for row in rows)
+        else:
+            raise ValueError(f"Unsupported report format: {format}")
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+class CapacityReportStore:
+    """
+    Multi-cluster capacity report kept as one CSV partition per cluster
+
+    Saving a cluster's report replaces only that cluster's partition, so a
+    run never reads or rewrites the data of other clusters. Exports merge
+    the partitions lazily, streaming rows from disk into the output file.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def save(self, report: Dict[str, Any]) -> str:
+        """
+        Atomically replace the partition of the report's cluster
+
+        Returns:
+            Path of the partition file
+        """
+        path = self._partition_path(report["cluster"])
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow([report["cluster"]])
+                writer.writerows(report_rows(report))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return path
+
+    def clusters(self) -> List[str]:
+        """Clusters that have a saved partition"""
+        return [cluster for cluster, _ in self._partitions()]
+
+    def partitions(self) -> Iterator[tuple]:
+        """
+        Yield (cluster, rows) pairs where rows lazily reads the partition file
+        """
+        for cluster, path in self._partitions():
+            yield cluster, self._read_rows(path)
+
+    def export(self, format: str) -> str:
+        """
+        Merge every partition into a temporary xlsx, csv or parquet file
+
+        Returns:
+            Path of the file, to be deleted by the caller
+        """
+        return export_file(self.partitions(), format)
+
+    def _partitions(self) -> List[tuple]:
+        partitions = []
+        for entry in sorted(os.listdir(self.directory)):
+            if not entry.endswith(".csv"):
+                continue
+            path = os.path.join(self.directory, entry)
+            with open(path, newline="") as f:
+                header = next(csv.reader(f), None)
+            if header:
+                partitions.append((header[0], path))
+        return partitions
+
+    def _read_rows(self, path: str) -> Iterator[List[Any]]:
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                yield [kind(value) if value != "" else None for (_, kind), value in zip(COLUMNS, row)]
+
+    def _partition_path(self, cluster: str) -> str:
+        return os.path.join(self.directory, re.sub(r"[^A-Za-z0-9_.-]", "_", cluster) + ".csv")
@@ -0,0 +1,276 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import uuid
+from typing import Dict, Any, Optional, List, Tuple, Callable
+from kubernetes import client, config
+from kubernetes.client.rest import ApiException
+
+from services.sanitizer import Sanitizer
+from utils.cache import TTLCache
+from utils.kube import resource_path, get_json, InstrumentedApiClient
+from utils.offload import BlockingExecutor
+
+logger = logging.getLogger("openshift-analyzer")
+
+# Context name that refers to the cluster the analyzer itself runs against
+LOCAL_CONTEXT = "in-cluster"
+
+ObjectKey = Tuple[str, str, str]
+
+def content_hash(manifest: Dict[str, Any]) -> str:
+    """
+    Hash of the canonical JSON form of a manifest
+    """
+    canonical = json.dumps(manifest, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def _escape(key: str) -> str:
+    return key.replace("\\", "\\\\").replace(".", "\\.")
+
+def structural_diff(left: Any, right: Any, path: str = "") -> List[Dict[str, Any]]:
+    """
+    List the field-level differences between two manifests
+
+    Paths use the metadata_cleaner syntax: dots between keys (escaped inside
+    keys) and [n] for list indices.
+    """
+    if isinstance(left, dict) and isinstance(right, dict):
+        changes = []
+        for key in sorted(set(left) | set(right)):
+            child = f"{path}.{_escape(key)}" if path else _escape(key)
+            if key not in right:
+                changes.append({"path": child, "op": "removed", "left": left[key], "right": None})
+            elif key not in left:
+                changes.append({"path": child, "op": "added", "left": None, "right": right[key]})
+            elif left[key] != right[key]:
+                changes.extend(structural_diff(left[key], right[key], child))
+        return changes
+
+    if isinstance(left, list) and isinstance(right, list):
+        changes = []
+        for index in range(max(len(left), len(right))):
+            child = f"{path}[{index}]"
+            if index >= len(right):
+                changes.append({"path": child, "op": "removed", "left": left[index], "right": None})
+            elif index >= len(left):
+                changes.append({"path": child, "op": "added", "left": None, "right": right[index]})
+            elif left[index] != right[index]:
+                changes.extend(structural_diff(left[index], right[index], child))
+        return changes
+
+    if left != right:
+        return [{"path": path, "op": "changed", "left": left, "right": right}]
+    return []
+
+class ClusterSnapshot:
+    """Sanitized objects of one cluster keyed by (kind, namespace, name) with their content hashes"""
+
+    def __init__(self, cluster: str):
+        self.cluster = cluster
+        self.objects: Dict[ObjectKey, Tuple[str, Dict[str, Any]]] = {}
+        self.errors: Dict[str, str] = {}
+
+class Comparison:
+    """
+    Result of comparing snapshots of several clusters
+
+    Objects whose content hash matches on every cluster are counted as
+    identical and never compared field by field. Structural diffs are only
+    computed for the page of differing objects being requested.
+    """
+
+    def __init__(self, comparison_id: str, kinds: List[str], namespace: Optional[str], snapshots: List[ClusterSnapshot]):
+        self.id = comparison_id
+        self.kinds = kinds
+        self.namespace = namespace
+        self.snapshots = snapshots
+        self._diffs: Dict[ObjectKey, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        # A kind that failed on any cluster would show up as missing there,
+        # so it is left out of the comparison and only reported as an error
+        failed_kinds = {kind for snapshot in snapshots for kind in snapshot.errors}
+        keys = set()
+        for snapshot in snapshots:
+            keys.update(key for key in snapshot.objects if key[0] not in failed_kinds)
+
+        self.identical = 0
+        self.differences: List[ObjectKey] = []
+        for key in sorted(keys):
+            hashes = {snapshot.objects[key][0] if key in snapshot.objects else None for snapshot in snapshots}
+            if len(hashes) == 1 and None not in hashes:
+                self.identical += 1
+            else:
+                self.differences.append(key)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "clusters": [snapshot.cluster for snapshot in self.snapshots],
+            "kinds": self.kinds,
+            "namespace": self.namespace,
+            "objects": {snapshot.cluster: len(snapshot.objects) for snapshot in self.snapshots},
+            "identical": self.identical,
+            "different": len(self.differences),
+            "errors": {snapshot.cluster: snapshot.errors for snapshot in self.snapshots if snapshot.errors},
+        }
+
+    def page(self, offset: int, limit: int) -> List[Dict[str, Any]]:
+        return [self._diff(key) for key in self.differences[offset:offset + limit]]
+
+    def _diff(self, key: ObjectKey) -> Dict[str, Any]:
+        with self._lock:
+            cached = self._diffs.get(key)
+        if cached is not None:
+            return cached
+
+        kind, namespace, name = key
+        present = [snapshot for snapshot in self.snapshots if key in snapshot.objects]
+        base = present[0]
+        base_manifest = base.objects[key][1]
+        base_hash = base.objects[key][0]
+
+        changes = {}
+        for snapshot in present[1:]:
+            object_hash, manifest = snapshot.objects[key]
+            if object_hash != base_hash:
+                changes[snapshot.cluster] = structural_diff(base_manifest, manifest)
+
+        diff = {
+            "kind": kind,
+            "namespace": namespace or None,
+            "name": name,
+            "status": "different" if len(present) == len(self.snapshots) else "missing",
+            "present_in": [snapshot.cluster for snapshot in present],
+            "base": base.cluster,
+            "changes": changes,
+        }
+        with self._lock:
+            self._diffs[key] = diff
+        return diff
+
+class KubeconfigClients:
+    """
+    ApiClients for kubeconfig contexts, created once per context and reused
+    """
+
+    def __init__(self, local_client: client.ApiClient, kubeconfig_path: Optional[str] = None):
+        self.local_client = local_client
+        self.kubeconfig_path = kubeconfig_path
+        self._clients: Dict[str, client.ApiClient] = {}
+        self._lock = threading.Lock()
+
+    def get(self, context: str) -> client.ApiClient:
+        if context == LOCAL_CONTEXT:
+            return self.local_client
+        with self._lock:
+            api_client = self._clients.get(context)
+            if api_client is None:
+                configuration = client.Configuration()
+                config.load_kube_config(config_file=self.kubeconfig_path, context=context, client_configuration=configuration, persist_config=False)
+                api_client = InstrumentedApiClient(configuration)
+                self._clients[context] = api_client
+            return api_client
+
+class ComparisonEngine:
+    """
+    Snapshot the same kinds from several clusters concurrently and diff them
+    """
+
+    def __init__(
+        self,
+        kube: BlockingExecutor,
+        analysis: BlockingExecutor,
+        sanitizer: Sanitizer,
+        lookup: Callable[[str], Optional[Dict[str, Any]]],
+        clients: Callable[[str], client.ApiClient],
+        default_kinds: Optional[List[str]] = None,
+        page_size: int = 500,
+        result_ttl: float = 1800,
+        max_results: int = 16,
+    ):
+        self.kube = kube
+        self.analysis = analysis
+        self.sanitizer = sanitizer
+        self.lookup = lookup
+        self.clients = clients
+        self.default_kinds = default_kinds or []
+        self.page_size = page_size
+        self._results = TTLCache(maxsize=max_results, ttl=result_ttl)
+
+    def get(self, comparison_id: str) -> Optional[Comparison]:
+        return self._results.get(comparison_id)
+
+    async def compare(self, contexts: List[str], kinds: List[str], namespace: Optional[str] = None) -> Comparison:
+        """
+        Snapshot every cluster and kind concurrently and build a Comparison
+
+        Raises:
+            ValueError: If a kind is unknown
+            ConfigException: If a context is not in the kubeconfig
+        """
+        resource_infos = {}
+        for kind in kinds:
+            resource_info = self.lookup(kind)
+            if not resource_info:
+                raise ValueError(f"Unknown resource kind: {kind}")
+            resource_infos[kind] = resource_info
+
+        snapshots = [ClusterSnapshot(context) for context in contexts]
+        # The first use of a context reads the kubeconfig and may run an exec
+        # credential plugin
+        api_clients = await asyncio.gather(*(asyncio.to_thread(self.clients, context) for context in contexts))
+
+        await asyncio.gather(*(
+            self._snapshot_kind(snapshot, api_client, kind, resource_infos[kind], namespace)
+            for snapshot, api_client in zip(snapshots, api_clients)
+            for kind in kinds
+        ))
+
+        comparison = Comparison(uuid.uuid4().hex, kinds, namespace, snapshots)
+        self._results.set(comparison.id, comparison)
+        return comparison
+
+    def _snapshot_page(self, kind: str, items: List[Dict[str, Any]]) -> Dict[ObjectKey, Tuple[str, Dict[str, Any]]]:
+        """
+        Sanitize and hash one page of objects
+        """
+        objects = {}
+        for obj in items:
+            manifest = self.sanitizer.sanitize(obj)
+            metadata = manifest.get("metadata", {})
+            objects[(kind, metadata.get("namespace") or "", metadata["name"])] = (content_hash(manifest), manifest)
+        return objects
+
+    async def _snapshot_kind(
+        self,
+        snapshot: ClusterSnapshot,
+        api_client: client.ApiClient,
+        kind: str,
+        resource_info: Dict[str, Any],
+        namespace: Optional[str],
+    ):
+        path = resource_path(resource_info, namespace if resource_info.get("namespaced", True) else None)
+        continue_token = None
+        try:
+            while True:
+                query_params = [("limit", self.page_size)]
+                if continue_token:
+                    query_params.append(("continue", continue_token))
+
+                page = await self.kube.run(get_json, api_client, path, query_params)
+                snapshot.objects.update(await self.analysis.run(self._snapshot_page, kind, page.get("items", [])))
+
+                continue_token = page.get("metadata", {}).get("continue")
+                if not continue_token:
+                    break
+
+        except ApiException as e:
+            logger.warning(f"Snapshot of {kind} on {snapshot.cluster} failed: {e.status} {e.reason}")
+            snapshot.errors[kind] = f"{e.status} {e.reason}"
+        except asyncio.TimeoutError:
+            logger.warning(f"Snapshot of {kind} on {snapshot.cluster} timed out")
+            snapshot.errors[kind] = "timed out waiting for the Kubernetes API"
@@ -0,0 +1,105 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Tuple
+from kubernetes import client
+
+from utils.kube import get_json
+
+logger = logging.getLogger("openshift-analyzer")
+
+class DiscoveryIndex:
+    """
+    Kind to group/version/resource index built from apiserver discovery
+
+    Every kind served by the cluster is indexed under its bare kind (core
+    and higher priority groups win, following the order the apiserver
+    returns groups in) and under "Kind.group" for disambiguation. Lookups
+    fall back to a static map until the first discovery completes.
+    """
+
+    def __init__(
+        self,
+        api_client: client.ApiClient,
+        fallback: Optional[Dict[str, Dict[str, Any]]] = None,
+        refresh_interval: float = 300,
+        max_workers: int = 8,
+    ):
+        self.api_client = api_client
+        self.fallback = fallback or {}
+        self.refresh_interval = refresh_interval
+        self.max_workers = max_workers
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def lookup(self, kind: str) -> Optional[Dict[str, Any]]:
+        """
+        Get API information for a kind or "Kind.group"
+
+        Returns:
+            Dict with api_version, group, version, plural and namespaced keys, or None
+        """
+        return self._index.get(kind) or self.fallback.get(kind)
+
+    def kinds(self) -> List[str]:
+        return [key for key in self._index if "." not in key]
+
+    def refresh(self):
+        """Rebuild the index from /api and /apis and swap it in atomically"""
+        group_versions = [("", version) for version in get_json(self.api_client, "/api").get("versions", [])]
+        for group in get_json(self.api_client, "/apis").get("groups", []):
+            preferred = group.get("preferredVersion") or group["versions"][0]
+            group_versions.append((group["name"], preferred["version"]))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            resource_lists = list(pool.map(self._fetch_resources, group_versions))
+
+        index: Dict[str, Dict[str, Any]] = {}
+        for (group, version), resources in zip(group_versions, resource_lists):
+            for resource in resources:
+                # Skip subresources such as pods/log or deployments/scale
+                if "/" in resource["name"]:
+                    continue
+                info = {
+                    "api_version": f"{group}/{version}" if group else version,
+                    "group": group,
+                    "version": version,
+                    "plural": resource["name"],
+                    "namespaced": resource.get("namespaced", True),
+                    "verbs": resource.get("verbs", []),
+                }
+                kind = resource["kind"]
+                index.setdefault(kind, info)
+                if group:
+                    index.setdefault(f"{kind}.{group}", info)
+
+        self._index = index
+        logger.info(f"Discovery index refreshed: {len(self.kinds())} kinds across {len(group_versions)} group versions")
+
+    def _fetch_resources(self, group_version: Tuple[str, str]) -> List[Dict[str, Any]]:
+        group, version = group_version
+        path = f"/apis/{group}/{version}" if group else f"/api/{version}"
+        try:
+            return get_json(self.api_client, path).get("resources", [])
+        except Exception as e:
+            # Aggregated APIs can be temporarily unavailable; keep the rest
+            logger.warning(f"Discovery of {path} failed: {e}")
+            return []
+
+    def start(self):
+        """Refresh the index periodically in a background thread"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="discovery", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Discovery refresh failed, keeping previous index: {e}")
@@ -0,0 +1,184 @@
+import asyncio
+import io
+import logging
+import tarfile
+import time
+import yaml
+from typing import Dict, Any, Optional, List, Callable, AsyncIterator, Tuple
+from kubernetes import client
+from kubernetes.client.rest import ApiException
+
+from services.discovery import DiscoveryIndex
+from services.informer import InformerCache
+from utils.kube import resource_path, get_json
+from utils.offload import BlockingExecutor
+
+logger = logging.getLogger("openshift-analyzer")
+
+# libyaml is several times faster than the pure Python emitter
+YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+class ExportError:
+    """A kind that could not be exported"""
+
+    def __init__(self, kind: str, reason: str):
+        self.kind = kind
+        self.reason = reason
+
+class ManifestExporter:
+    """
+    Concurrently fetch, sanitize and serialise every object of several kinds in a namespace
+
+    One task per kind pages through the apiserver (or reads the informer
+    cache in pages of the same size) and pushes each page, sanitized and
+    dumped to YAML in one analysis executor call, onto a bounded queue, so
+    output can be streamed while the remaining kinds are still being
+    fetched and the event loop never runs the emitter.
+    """
+
+    def __init__(
+        self,
+        kube: BlockingExecutor,
+        analysis: BlockingExecutor,
+        api_client: client.ApiClient,
+        discovery: DiscoveryIndex,
+        informers: Optional[InformerCache],
+        sanitize: Callable[[Dict[str, Any]], Dict[str, Any]],
+        page_size: int = 500,
+        queue_size: int = 4,
+    ):
+        self.kube = kube
+        self.analysis = analysis
+        self.api_client = api_client
+        self.discovery = discovery
+        self.informers = informers
+        self.sanitize = sanitize
+        self.page_size = page_size
+        self.queue_size = queue_size
+        self.errors: List[ExportError] = []
+
+    async def documents(self, namespace: str, kinds: List[str], label_selector: Optional[str] = None) -> AsyncIterator[Tuple[str, List[Tuple[str, str]]]]:
+        """
+        Yield (kind, [(name, YAML document), ...]) batches, one per page, as they are fetched
+
+        Kinds that fail are recorded in self.errors instead of aborting the export.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        tasks = [asyncio.create_task(self._fetch_kind(queue, namespace, kind, label_selector)) for kind in kinds]
+        remaining = len(tasks)
+
+        try:
+            while remaining:
+                item = await queue.get()
+                if item is None:
+                    remaining -= 1
+                    continue
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _fetch_kind(self, queue: asyncio.Queue, namespace: str, kind: str, label_selector: Optional[str]):
+        try:
+            await self._list_kind(queue, namespace, kind, label_selector)
+        except ApiException as e:
+            logger.warning(f"Export of {kind} in {namespace} failed: {e.status} {e.reason}")
+            self.errors.append(ExportError(kind, f"{e.status} {e.reason}"))
+        except asyncio.TimeoutError:
+            logger.warning(f"Export of {kind} in {namespace} timed out")
+            self.errors.append(ExportError(kind, "timed out waiting for the Kubernetes API"))
+        except Exception as e:
+            logger.error(f"Export of {kind} in {namespace} failed: {e}")
+            self.errors.append(ExportError(kind, str(e)))
+
+        # Cancellation (the client went away) skips this, nobody is reading
+        await queue.put(None)
+
+    async def _list_kind(self, queue: asyncio.Queue, namespace: str, kind: str, label_selector: Optional[str]):
+        resource_info = self.discovery.lookup(kind)
+        if not resource_info:
+            self.errors.append(ExportError(kind, "unknown resource kind"))
+            return
+        if not resource_info.get("namespaced", True):
+            self.errors.append(ExportError(kind, "cluster-scoped kind cannot be exported from a namespace"))
+            return
+
+        if self.informers is not None and self.informers.has_synced(kind) and not label_selector:
+            objects = self.informers.list(kind, namespace)
+            for start in range(0, len(objects), self.page_size):
+                await self._put_page(queue, kind, resource_info, objects[start:start + self.page_size])
+            return
+
+        path = resource_path(resource_info, namespace)
+        continue_token = None
+        while True:
+            query_params = [("limit", self.page_size)]
+            if label_selector:
+                query_params.append(("labelSelector", label_selector))
+            if continue_token:
+                query_params.append(("continue", continue_token))
+
+            page = await self.kube.run(get_json, self.api_client, path, query_params)
+            await self._put_page(queue, kind, resource_info, page.get("items", []))
+
+            continue_token = page.get("metadata", {}).get("continue")
+            if not continue_token:
+                break
+
+    async def _put_page(self, queue: asyncio.Queue, kind: str, resource_info: Dict[str, Any], objects: List[Dict[str, Any]]):
+        if objects:
+            await queue.put((kind, await self.analysis.run(self._dump_page, objects, kind, resource_info)))
+
+    def _dump_page(self, objects: List[Dict[str, Any]], kind: str, resource_info: Dict[str, Any]) -> List[Tuple[str, str]]:
+        documents = []
+        for obj in objects:
+            manifest = self.sanitize(obj)
+            # List items do not carry their own kind/apiVersion
+            manifest.setdefault("kind", kind)
+            manifest.setdefault("apiVersion", resource_info["api_version"])
+            documents.append((manifest["metadata"]["name"], yaml.dump(manifest, Dumper=YamlDumper, default_flow_style=False)))
+        return documents
+
+async def yaml_stream(exporter: ManifestExporter, namespace: str, kinds: List[str], label_selector: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Stream a multi-document YAML file, one document per manifest
+    """
+    async for kind, documents in exporter.documents(namespace, kinds, label_selector):
+        yield "".join("---\n" + document for _, document in documents)
+
+    for error in exporter.errors:
+        yield f"# Export of {error.kind} failed: {error.reason}\n"
+
+async def tar_stream(exporter: ManifestExporter, namespace: str, kinds: List[str], label_selector: Optional[str] = None) -> AsyncIterator[bytes]:
+    """
+    Stream a tar archive with one <namespace>/<kind>/<name>.yaml member per manifest
+    """
+    buffer = io.BytesIO()
+    archive = tarfile.open(fileobj=buffer, mode="w|")
+    mtime = int(time.time())
+
+    def add(member_name: str, data: bytes):
+        info = tarfile.TarInfo(member_name)
+        info.size = len(data)
+        info.mtime = mtime
+        archive.addfile(info, io.BytesIO(data))
+
+    def drain() -> bytes:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    async for kind, documents in exporter.documents(namespace, kinds, label_selector):
+        for name, document in documents:
+            add(f"{namespace}/{kind}/{name}.yaml", document.encode("utf-8"))
+        chunk = drain()
+        if chunk:
+            yield chunk
+
+    if exporter.errors:
+        report = "".join(f"{error.kind}: {error.reason}\n" for error in exporter.errors)
+        add(f"{namespace}/errors.txt", report.encode("utf-8"))
+
+    archive.close()
+    yield drain()
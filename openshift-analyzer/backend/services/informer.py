@@ -0,0 +1,301 @@
+import json
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional, List, Callable, Iterable
+from kubernetes import client
+from kubernetes.client.rest import ApiException
+from kubernetes.watch.watch import iter_resp_lines
+
+from utils.kube import resource_path, get_json
+
+logger = logging.getLogger("openshift-analyzer")
+
+# Handlers receive the watch event type (ADDED, MODIFIED, DELETED or SYNCED
+# after a full list) and the affected object (None for SYNCED)
+EventHandler = Callable[[str, Optional[Dict[str, Any]]], None]
+
+class Store:
+    """
+    Thread-safe in-memory object store indexed by namespace and name
+
+    Cluster-scoped objects are stored under the empty namespace.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._by_namespace: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    @staticmethod
+    def _key(obj: Dict[str, Any]):
+        metadata = obj.get("metadata", {})
+        return metadata.get("namespace") or "", metadata["name"]
+
+    def replace(self, objects: Iterable[Dict[str, Any]]):
+        """Atomically replace the store content with a fresh list result"""
+        by_namespace: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for obj in objects:
+            namespace, name = self._key(obj)
+            by_namespace.setdefault(namespace, {})[name] = obj
+
+        with self._lock:
+            self._by_namespace = by_namespace
+
+    def upsert(self, obj: Dict[str, Any]):
+        namespace, name = self._key(obj)
+        with self._lock:
+            self._by_namespace.setdefault(namespace, {})[name] = obj
+
+    def delete(self, obj: Dict[str, Any]):
+        namespace, name = self._key(obj)
+        with self._lock:
+            objects = self._by_namespace.get(namespace)
+            if objects is not None:
+                objects.pop(name, None)
+                if not objects:
+                    del self._by_namespace[namespace]
+
+    def get(self, namespace: Optional[str], name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._by_namespace.get(namespace or "", {}).get(name)
+
+    def list(self, namespace: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            if namespace is not None:
+                return list(self._by_namespace.get(namespace, {}).values())
+            return [obj for objects in self._by_namespace.values() for obj in objects.values()]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(objects) for objects in self._by_namespace.values())
+
+class Informer:
+    """
+    List+watch loop for a single resource kind backed by a Store
+
+    The informer lists all objects once, then follows a watch from the
+    returned resourceVersion. Dropped watches are resumed from the last seen
+    resourceVersion (kept fresh with bookmarks); a full relist only happens
+    when the apiserver answers 410 Gone.
+
+    Any object with replace, upsert, delete and __len__ can be passed as
+    store, e.g. a bounded or specially indexed one.
+    """
+
+    def __init__(
+        self,
+        api_client: client.ApiClient,
+        kind: str,
+        resource_info: Dict[str, str],
+        page_size: int = 500,
+        watch_timeout: int = 300,
+        max_backoff: float = 30.0,
+        store: Optional[Store] = None,
+    ):
+        self.api_client = api_client
+        self.kind = kind
+        self.resource_info = resource_info
+        self.page_size = page_size
+        self.watch_timeout = watch_timeout
+        self.max_backoff = max_backoff
+        self.store = store if store is not None else Store()
+        self.resource_version: Optional[str] = None
+        self._path = resource_path(resource_info)
+        self._handlers: List[EventHandler] = []
+        self._synced = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def has_synced(self) -> bool:
+        return self._synced.is_set()
+
+    def add_handler(self, handler: EventHandler):
+        """Register a callback invoked from the informer thread on every change"""
+        self._handlers.append(handler)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name=f"informer-{self.kind}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def wait_for_sync(self, timeout: Optional[float] = None) -> bool:
+        return self._synced.wait(timeout)
+
+    def _run(self):
+        backoff = 1.0
+        while not self._stopped.is_set():
+            try:
+                if self.resource_version is None:
+                    self._list()
+                self._watch()
+                backoff = 1.0
+            except ApiException as e:
+                if e.status == 410:
+                    logger.info(f"Informer {self.kind}: resourceVersion {self.resource_version} expired, relisting")
+                    self.resource_version = None
+                    continue
+                logger.warning(f"Informer {self.kind}: API error {e.status}: {e.reason}")
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+            except Exception as e:
+                logger.warning(f"Informer {self.kind}: watch interrupted: {e}")
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    def _list(self):
+        items = []
+        continue_token = None
+
+        while True:
+            query_params = [("limit", self.page_size)]
+            if continue_token:
+                query_params.append(("continue", continue_token))
+
+            result = get_json(self.api_client, self._path, query_params)
+            for item in result.get("items", []):
+                # List items do not carry their own kind/apiVersion
+                item.setdefault("kind", self.kind)
+                item.setdefault("apiVersion", self.resource_info["api_version"])
+                items.append(item)
+
+            metadata = result.get("metadata", {})
+            continue_token = metadata.get("continue")
+            if not continue_token:
+                break
+
+        self.store.replace(items)
+        self.resource_version = metadata.get("resourceVersion")
+        self._synced.set()
+        logger.info(f"Informer {self.kind}: synced {len(items)} objects at resourceVersion {self.resource_version}")
+        self._notify("SYNCED", None)
+
+    def _watch(self):
+        query_params = [
+            ("watch", "true"),
+            ("resourceVersion", self.resource_version),
+            ("allowWatchBookmarks", "true"),
+            ("timeoutSeconds", self.watch_timeout),
+        ]
+        response = get_json(
+            self.api_client,
+            self._path,
+            query_params,
+            preload_content=False,
+            _request_timeout=(10, self.watch_timeout + 30),
+        )
+
+        try:
+            for line in iter_resp_lines(response):
+                if self._stopped.is_set():
+                    break
+
+                event = json.loads(line)
+                event_type = event["type"]
+                obj = event["object"]
+
+                if event_type == "ERROR":
+                    raise ApiException(status=obj.get("code"), reason=f"{obj.get('reason')}: {obj.get('message')}")
+
+                if event_type == "ADDED" or event_type == "MODIFIED":
+                    self.store.upsert(obj)
+                elif event_type == "DELETED":
+                    self.store.delete(obj)
+
+                resource_version = obj.get("metadata", {}).get("resourceVersion")
+                if resource_version:
+                    self.resource_version = resource_version
+
+                if event_type != "BOOKMARK":
+                    self._notify(event_type, obj)
+        finally:
+            response.close()
+            response.release_conn()
+
+    def _notify(self, event_type: str, obj: Optional[Dict[str, Any]]):
+        for handler in self._handlers:
+            try:
+                handler(event_type, obj)
+            except Exception as e:
+                logger.error(f"Informer {self.kind}: event handler failed: {e}")
+
+class InformerCache:
+    """
+    Shared set of informers serving reads by kind/namespace/name from memory
+    """
+
+    def __init__(self, api_client: client.ApiClient, page_size: int = 500, watch_timeout: int = 300):
+        self.api_client = api_client
+        self.page_size = page_size
+        self.watch_timeout = watch_timeout
+        self._informers: Dict[str, Informer] = {}
+
+    def start(self, kinds: Iterable[str], resource_info_lookup: Callable[[str], Optional[Dict[str, str]]]):
+        """
+        Start an informer for each kind
+
+        Args:
+            kinds: Resource kinds to watch
+            resource_info_lookup: Function mapping a kind to its API information
+        """
+        for kind in kinds:
+            if kind in self._informers:
+                continue
+            resource_info = resource_info_lookup(kind)
+            if not resource_info:
+                logger.warning(f"Informer cache: unknown resource kind {kind}, skipping")
+                continue
+            informer = Informer(
+                self.api_client,
+                kind,
+                resource_info,
+                page_size=self.page_size,
+                watch_timeout=self.watch_timeout,
+            )
+            self._informers[kind] = informer
+            informer.start()
+
+    def stop(self):
+        for informer in self._informers.values():
+            informer.stop()
+
+    def wait_for_sync(self, timeout: float) -> bool:
+        """
+        Block until every informer has completed its initial list
+
+        Returns:
+            Whether all informers synced within timeout seconds
+        """
+        deadline = time.monotonic() + timeout
+        return all(informer.wait_for_sync(max(deadline - time.monotonic(), 0)) for informer in list(self._informers.values()))
+
+    def informer(self, kind: str) -> Optional[Informer]:
+        return self._informers.get(kind)
+
+    def has_synced(self, kind: str) -> bool:
+        informer = self._informers.get(kind)
+        return informer is not None and informer.has_synced
+
+    def get(self, kind: str, namespace: Optional[str], name: str) -> Optional[Dict[str, Any]]:
+        return self._informers[kind].store.get(namespace, name)
+
+    def list(self, kind: str, namespace: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._informers[kind].store.list(namespace)
+
+    def add_handler(self, kind: str, handler: EventHandler):
+        self._informers[kind].add_handler(handler)
+
+    def status(self) -> Dict[str, Any]:
+        """Per-kind sync state, object counts and resourceVersions"""
+        return {
+            kind: {
+                "synced": informer.has_synced,
+                "objects": len(informer.store),
+                "resource_version": informer.resource_version,
+            }
+            for kind, informer in self._informers.items()
+        }
@@ -0,0 +1,281 @@
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import threading
+import yaml
+from typing import Dict, Any, Optional, List, Tuple
+
+from utils.cache import TTLCache
+
+logger = logging.getLogger("openshift-analyzer")
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by can for from has have how if in into is it its not of on or that the then this to was were when which will with".split()
+)
+ARTICLE_SUFFIXES = (".md", ".markdown", ".json")
+
+# BM25 parameters; title terms are counted TITLE_WEIGHT times
+K1 = 1.2
+B = 0.75
+TITLE_WEIGHT = 3
+SNIPPET_LENGTH = 240
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric terms without stopwords and single characters"""
+    return [term for term in TOKEN_PATTERN.findall(text.lower()) if len(term) > 1 and term not in STOPWORDS]
+
+def parse_markdown(text: str, default_title: str) -> Dict[str, Any]:
+    """
+    Read a markdown article with optional YAML front matter (title, url, tags)
+
+    Without a title in the front matter the first heading is used, then default_title.
+    """
+    article: Dict[str, Any] = {}
+    if text.startswith("---\n"):
+        front_matter, separator, body = text[4:].partition("\n---")
+        if separator:
+            article = yaml.safe_load(front_matter) or {}
+            if not isinstance(article, dict):
+                raise ValueError("front matter is not a mapping")
+            text = body.lstrip("-").lstrip("\n")
+
+    if not article.get("title"):
+        heading = re.search(r"^#\s+(.+)$", text, re.MULTILINE)
+        article["title"] = heading.group(1).strip() if heading else default_title
+    article["body"] = text
+    return article
+
+def parse_json(text: str) -> List[Dict[str, Any]]:
+    """
+    Read one article, a list of articles or {"articles": [...]} with title and body (or content/text)
+    """
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = data.get("articles", [data])
+    if not isinstance(data, list):
+        raise ValueError("expected an article, a list of articles or {\"articles\": [...]}")
+    articles = []
+    for item in data:
+        if not isinstance(item, dict):
+            raise ValueError("articles must be objects")
+        item = dict(item)
+        item["body"] = item.get("body") or item.get("content") or item.get("text") or ""
+        articles.append(item)
+    return articles
+
+class KnowledgeBase:
+    """
+    Full-text search over a directory of markdown and JSON articles
+
+    Articles are kept in an inverted index (term -> document -> term
+    frequency) and ranked with BM25. refresh() only re-reads files whose
+    inode, size or modification time changed and drops deleted ones, so a
+    ConfigMap or volume update re-indexes just the affected articles.
+    Results are cached per query in an LRU cache; the cache key includes
+    the index generation, so an update never serves stale results.
+
+    Args:
+        directory: Directory searched recursively; hidden entries (ConfigMap ..data links) are skipped
+        max_results: Default number of results
+        cache_size: Maximum number of cached queries
+        reload_interval: Seconds between refreshes in the background thread
+    """
+
+    def __init__(self, directory: str, max_results: int = 5, cache_size: int = 1024, reload_interval: float = 60):
+        self.directory = directory
+        self.max_results = max_results
+        self.reload_interval = reload_interval
+        self.cache = TTLCache(maxsize=cache_size, ttl=float("inf"))
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._files: Dict[str, Tuple[Tuple[int, int, int], List[str]]] = {}
+        self._total_length = 0
+        self._generation = 0
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Refresh the index periodically in a background thread"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="kb", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.wait(self.reload_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"KB refresh failed, keeping previous index: {e}")
+
+    def refresh(self) -> bool:
+        """
+        Index added and changed articles and drop deleted ones
+
+        Returns:
+            Whether the index changed
+        """
+        with self._refresh_lock:
+            return self._refresh()
+
+    def _refresh(self) -> bool:
+        signatures: Dict[str, Tuple[int, int, int]] = {}
+        for root, dirs, files in os.walk(self.directory):
+            dirs[:] = [name for name in dirs if not name.startswith(".")]
+            for name in files:
+                if name.startswith(".") or not name.endswith(ARTICLE_SUFFIXES):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                signatures[path] = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+        # Files are parsed outside the lock so searches continue meanwhile
+        parsed = {}
+        for path, signature in signatures.items():
+            known = self._files.get(path)
+            if known is None or known[0] != signature:
+                parsed[path] = self._read(path)
+        deleted = [path for path in self._files if path not in signatures]
+
+        if not parsed and not deleted:
+            return False
+
+        with self._lock:
+            for path in deleted:
+                self._remove_file(path)
+            for path, articles in parsed.items():
+                self._remove_file(path)
+                self._files[path] = (signatures[path], [self._add(path, index, article) for index, article in enumerate(articles)])
+            self._generation += 1
+        self.cache.clear()
+        logger.info(f"KB index updated: {len(parsed)} files indexed, {len(deleted)} removed, {len(self._docs)} articles")
+        return True
+
+    def _read(self, path: str) -> List[Dict[str, Any]]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            if path.endswith(".json"):
+                return parse_json(text)
+            return [parse_markdown(text, os.path.splitext(os.path.basename(path))[0])]
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            logger.warning(f"Skipping KB article {path}: {e}")
+            return []
+
+    def _add(self, path: str, index: int, article: Dict[str, Any]) -> str:
+        relative = os.path.relpath(path, self.directory)
+        doc_id = str(article.get("id") or (relative if index == 0 else f"{relative}#{index}"))
+        if doc_id in self._docs:
+            # Same explicit id in two files: the later one is kept under a unique id
+            doc_id = f"{relative}#{index}"
+
+        title = str(article.get("title") or doc_id)
+        body = str(article.get("body", ""))
+        terms: Dict[str, int] = {}
+        for term in tokenize(title):
+            terms[term] = terms.get(term, 0) + TITLE_WEIGHT
+        for term in tokenize(body):
+            terms[term] = terms.get(term, 0) + 1
+        for term in tokenize(" ".join(str(tag) for tag in article.get("tags") or [])):
+            terms[term] = terms.get(term, 0) + TITLE_WEIGHT
+
+        length = sum(terms.values())
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = frequency
+        self._docs[doc_id] = {"title": title, "url": article.get("url"), "body": body, "terms": terms, "length": length}
+        self._total_length += length
+        return doc_id
+
+    def _remove_file(self, path: str):
+        known = self._files.pop(path, None)
+        if known is None:
+            return
+        for doc_id in known[1]:
+            doc = self._docs.pop(doc_id, None)
+            if doc is None:
+                continue
+            self._total_length -= doc["length"]
+            for term in doc["terms"]:
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(doc_id, None)
+                    if not postings:
+                        del self._postings[term]
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Articles ranked by BM25 relevance to the query
+
+        Returns:
+            Up to limit (default max_results) results with id, title, url, score and snippet
+        """
+        limit = limit or self.max_results
+        terms = tuple(sorted(set(tokenize(query))))
+        if not terms:
+            return []
+
+        key = (self._generation, terms, limit)
+        results = self.cache.get(key)
+        if results is not None:
+            return results
+
+        with self._lock:
+            generation = self._generation
+            count = len(self._docs)
+            if not count:
+                return []
+            average_length = self._total_length / count
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    length = self._docs[doc_id]["length"]
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (K1 + 1) / (frequency + K1 * (1 - B + B * length / average_length))
+
+            results = [
+                {
+                    "id": doc_id,
+                    "title": self._docs[doc_id]["title"],
+                    "url": self._docs[doc_id]["url"],
+                    "score": round(score, 4),
+                    "snippet": _snippet(self._docs[doc_id]["body"], terms),
+                }
+                for doc_id, score in heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            ]
+
+        self.cache.set((generation, terms, limit), results)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "files": len(self._files),
+                "articles": len(self._docs),
+                "terms": len(self._postings),
+                "generation": self._generation,
+                "cache": self.cache.stats(),
+            }
+
+def _snippet(body: str, terms: Tuple[str, ...]) -> str:
+    """Text around the first occurrence of a query term, whitespace collapsed"""
+    lowered = body.lower()
+    positions = [position for position in (lowered.find(term) for term in terms) if position >= 0]
+    start = max(min(positions) - SNIPPET_LENGTH // 3, 0) if positions else 0
+    snippet = " ".join(body[start:start + SNIPPET_LENGTH].split())
+    return ("..." if start else "") + snippet + ("..." if start + SNIPPET_LENGTH < len(body) else "")
@@ -0,0 +1,176 @@
+import logging
+import os
+import time
+import httpx
+from typing import Dict, Any, Optional, List, Union, Iterable, Hashable
+
+from utils.cache import TTLCache
+from utils.access_log import record_upstream
+from utils.metrics import PROMETHEUS_QUERY_DURATION
+from utils.singleflight import SingleFlight
+
+logger = logging.getLogger("openshift-analyzer")
+
+SERVICE_ACCOUNT_TOKEN = "/var/run/secrets/kubernetes.io/serviceaccount/token"
+SERVICE_CA = "/var/run/secrets/kubernetes.io/serviceaccount/service-ca.crt"
+
+class PrometheusError(Exception):
+    """A query was rejected or the Prometheus API could not be reached"""
+
+class PrometheusClient:
+    """
+    Async client for the Prometheus HTTP API (Thanos Querier on OpenShift)
+
+    Queries are evaluated at times aligned down to a multiple of step, so
+    every caller within the same window asks for exactly the same result.
+    Results are cached per (query, aligned time) in an LRU cache until the
+    window ends, and identical queries that are in flight at the same time
+    share one HTTP request. Connections are pooled and kept alive.
+
+    Args:
+        url: Base URL, e.g. https://thanos-querier.openshift-monitoring.svc:9091
+        token_path: Bearer token file, re-read whenever it is rotated
+        verify: CA bundle path, or False to skip certificate verification
+        timeout: Request timeout in seconds
+        step: Width of the time window in seconds that results are aligned to and cached for
+        cache_size: Maximum number of cached results
+        max_connections: Size of the HTTP connection pool
+        transport: Optional httpx transport, e.g. httpx.MockTransport in tests
+    """
+
+    def __init__(
+        self,
+        url: str,
+        token_path: Optional[str] = SERVICE_ACCOUNT_TOKEN,
+        verify: Union[str, bool] = True,
+        timeout: float = 30,
+        step: float = 30,
+        cache_size: int = 256,
+        max_connections: int = 10,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.url = url
+        self.token_path = token_path
+        self.step = step
+        self.cache = TTLCache(maxsize=cache_size, ttl=step)
+        self._token: Optional[str] = None
+        self._token_mtime: Optional[float] = None
+        self._flight = SingleFlight(observe=None)
+        self._client = httpx.AsyncClient(
+            base_url=url,
+            verify=verify,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+
+    def align(self, at: Optional[float] = None) -> float:
+        """
+        Round a Unix timestamp (default now) down to a multiple of step
+        """
+        at = time.time() if at is None else at
+        return at - at % self.step
+
+    async def query(self, promql: str, at: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Run an instant query at the start of the step window containing at
+
+        Returns:
+            The result vector as returned by /api/v1/query
+
+        Raises:
+            PrometheusError: If the request or the query fails
+        """
+        evaluation_time = self.align(at)
+        return await self._cached(
+            ("query", promql, evaluation_time),
+            evaluation_time + self.step,
+            "/api/v1/query",
+            {"query": promql, "time": evaluation_time},
+        )
+
+    async def query_range(self, promql: str, start: float, end: float, step: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Run a range query with start and end aligned to the step
+
+        Returns:
+            The result matrix as returned by /api/v1/query_range
+
+        Raises:
+            PrometheusError: If the request or the query fails
+        """
+        step = step or self.step
+        start = start - start % step
+        end = end - end % step
+        return await self._cached(
+            ("query_range", promql, start, end, step),
+            self.align() + self.step,
+            "/api/v1/query_range",
+            {"query": promql, "start": start, "end": end, "step": step},
+        )
+
+    async def query_by_label(self, promql: str, label: str, values: Optional[Iterable[str]] = None, at: Optional[float] = None) -> Dict[str, float]:
+        """
+        Run an instant query and map each sample's label value to its value
+
+        Use this with a "by (label)" aggregation instead of one query per
+        label value; values restricts the result to those label values.
+        """
+        result = {
+            sample["metric"].get(label, ""): float(sample["value"][1])
+            for sample in await self.query(promql, at)
+        }
+        if values is not None:
+            result = {value: result[value] for value in values if value in result}
+        return result
+
+    async def close(self):
+        await self._client.aclose()
+
+    async def _cached(self, key: Hashable, expires_at: float, path: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+
+        # The request runs as its own task, so a caller that is cancelled
+        # neither aborts it for the others nor loses the cached result
+        return await self._flight.do(key, self._fetch, key, expires_at, path, params)
+
+    async def _fetch(self, key: Hashable, expires_at: float, path: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        result = await self._request(path, params)
+        self.cache.set(key, result, ttl=max(expires_at - time.time(), 0))
+        return result
+
+    async def _request(self, path: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        start = time.perf_counter()
+        try:
+            # POST keeps long vectorised queries out of the URL
+            response = await self._client.post(path, data=params, headers=self._headers())
+        except httpx.HTTPError as e:
+            raise PrometheusError(f"Prometheus request failed: {e}")
+        finally:
+            elapsed = time.perf_counter() - start
+            PROMETHEUS_QUERY_DURATION.labels(path.rsplit("/", 1)[-1]).observe(elapsed)
+            record_upstream("prometheus", elapsed)
+
+        try:
+            body = response.json()
+        except ValueError:
+            raise PrometheusError(f"Prometheus returned HTTP {response.status_code}")
+
+        if body.get("status") != "success":
+            raise PrometheusError(body.get("error") or f"Prometheus returned HTTP {response.status_code}")
+        return body["data"]["result"]
+
+    def _headers(self) -> Dict[str, str]:
+        if not self.token_path:
+            return {}
+        try:
+            mtime = os.stat(self.token_path).st_mtime
+            if mtime != self._token_mtime:
+                with open(self.token_path) as f:
+                    self._token = f.read().strip()
+                self._token_mtime = mtime
+        except OSError as e:
+            logger.warning(f"Cannot read Prometheus token {self.token_path}: {e}")
+        return {"Authorization": f"Bearer {self._token}"} if self._token else {}
@@ -0,0 +1,173 @@
+from typing import Dict, Any, Optional, List, Union, Iterable
+
+# Fields removed when no strip_fields are configured
+DEFAULT_STRIP_FIELDS = [
+    "status",
+    "metadata.managedFields",
+    "metadata.creationTimestamp",
+    "metadata.resourceVersion",
+    "metadata.selfLink",
+    "metadata.uid",
+    "metadata.generation",
+    "metadata.annotations.kubectl\\.kubernetes\\.io/last-applied-configuration",
+]
+
+class _Wildcard:
+    def __repr__(self):
+        return "*"
+
+# Matches any dict key or list element
+WILDCARD = _Wildcard()
+
+Token = Union[str, int, _Wildcard]
+
+def parse_path(path: str) -> List[Token]:
+    """
+    Parse a field path into tokens
+
+    Segments are separated by dots. A backslash escapes the next character,
+    so "metadata.annotations.kubectl\\.kubernetes\\.io/last-applied-configuration"
+    addresses a key containing dots. "*" matches any key or list element,
+    "[0]" a list index and "[*]" any list element.
+
+    Raises:
+        ValueError: If the path is malformed
+    """
+    tokens: List[Token] = []
+    segment: List[str] = []
+    escaped = False
+    i = 0
+
+    def flush():
+        nonlocal escaped
+        if segment:
+            key = "".join(segment)
+            tokens.append(WILDCARD if key == "*" and not escaped else key)
+            segment.clear()
+        escaped = False
+
+    while i < len(path):
+        char = path[i]
+        if char == "\\":
+            if i + 1 == len(path):
+                raise ValueError(f"Trailing escape in field path: {path}")
+            segment.append(path[i + 1])
+            escaped = True
+            i += 2
+        elif char == ".":
+            flush()
+            i += 1
+        elif char == "[":
+            flush()
+            end = path.find("]", i)
+            if end == -1:
+                raise ValueError(f"Unclosed list index in field path: {path}")
+            index = path[i + 1:end]
+            if index == "*":
+                tokens.append(WILDCARD)
+            elif index.isdigit():
+                tokens.append(int(index))
+            else:
+                raise ValueError(f"Invalid list index '{index}' in field path: {path}")
+            i = end + 1
+        else:
+            segment.append(char)
+            i += 1
+
+    flush()
+    if not tokens:
+        raise ValueError("Empty field path")
+    return tokens
+
+class _Node:
+    __slots__ = ("children", "wildcard", "terminal")
+
+    def __init__(self):
+        self.children: Dict[Union[str, int], "_Node"] = {}
+        self.wildcard: Optional["_Node"] = None
+        self.terminal = False
+
+    def child(self, token: Token) -> "_Node":
+        if token is WILDCARD:
+            if self.wildcard is None:
+                self.wildcard = _Node()
+            return self.wildcard
+        node = self.children.get(token)
+        if node is None:
+            node = self.children[token] = _Node()
+        return node
+
+    def merge(self, other: "_Node"):
+        """Fold another subtree into this one"""
+        self.terminal = self.terminal or other.terminal
+        for token, node in other.children.items():
+            self.child(token).merge(node)
+        if other.wildcard is not None:
+            self.child(WILDCARD).merge(other.wildcard)
+
+    def finalize(self):
+        """Make exact children also carry the wildcard subtree, so a lookup is one dict access"""
+        if self.wildcard is not None:
+            self.wildcard.finalize()
+            for node in self.children.values():
+                node.merge(self.wildcard)
+        for node in self.children.values():
+            node.finalize()
+
+class Sanitizer:
+    """
+    Field stripper compiled once from a list of field paths
+
+    The paths are compiled into a trie. sanitize() walks the resource once
+    and only rebuilds the containers on a path that leads to a stripped
+    field; every untouched subtree is shared with the input rather than
+    copied. The input is never modified, but the result must be treated as
+    read-only below the top level.
+    """
+
+    def __init__(self, strip_fields: Optional[Iterable[str]] = None):
+        self.strip_fields = list(strip_fields) if strip_fields is not None else list(DEFAULT_STRIP_FIELDS)
+        self._root = _Node()
+        for path in self.strip_fields:
+            node = self._root
+            for token in parse_path(path):
+                node = node.child(token)
+            node.terminal = True
+        self._root.finalize()
+
+    def sanitize(self, resource: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Return a copy of the resource without the configured fields
+        """
+        return self._prune_dict(resource, self._root)
+
+    def _prune_dict(self, value: Dict[str, Any], node: _Node) -> Dict[str, Any]:
+        children = node.children
+        wildcard = node.wildcard
+        result = {}
+        for key, item in value.items():
+            child = children.get(key, wildcard)
+            if child is None:
+                result[key] = item
+            elif not child.terminal:
+                result[key] = self._prune(item, child)
+        return result
+
+    def _prune_list(self, value: List[Any], node: _Node) -> List[Any]:
+        children = node.children
+        wildcard = node.wildcard
+        result = []
+        for index, item in enumerate(value):
+            child = children.get(index, wildcard)
+            if child is None:
+                result.append(item)
+            elif not child.terminal:
+                result.append(self._prune(item, child))
+        return result
+
+    def _prune(self, value: Any, node: _Node) -> Any:
+        if isinstance(value, dict):
+            return self._prune_dict(value, node)
+        if isinstance(value, list):
+            return self._prune_list(value, node)
+        return value
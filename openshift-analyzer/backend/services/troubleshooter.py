@@ -0,0 +1,524 @@
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Set, Tuple, Callable, Iterable
+from kubernetes import client
+from kubernetes.client.rest import ApiException
+
+from services.informer import Informer, InformerCache
+from services.kb import KnowledgeBase
+from utils.kube import resource_path, get_json
+from utils.offload import BlockingExecutor
+from utils.singleflight import SingleFlight, kube_read_key
+
+logger = logging.getLogger("openshift-analyzer")
+
+EVENT_RESOURCE = {"api_version": "v1", "group": "", "version": "v1", "plural": "events", "namespaced": True}
+POD_RESOURCE = {"api_version": "v1", "group": "", "version": "v1", "plural": "pods", "namespaced": True}
+
+# Kinds whose pods are diagnosed together with them
+POD_CONTROLLERS = {"Deployment", "ReplicaSet", "StatefulSet", "DaemonSet", "Job"}
+MAX_OWNER_DEPTH = 5
+SEVERITY_ORDER = {"critical": 0, "warning": 1, "info": 2}
+
+# Built-in rules; features.troubleshooter.rules entries with the same name replace them
+DEFAULT_RULES = [
+    {
+        "name": "CrashLoopBackOff",
+        "reasons": ["BackOff"],
+        "message": "Back-off restarting failed container",
+        "kinds": ["Pod"],
+        "severity": "critical",
+        "summary": "A container keeps crashing and is restarted with back-off",
+        "hint": "Check the logs of the previous container instance (oc logs --previous) and its last termination reason and exit code",
+    },
+    {
+        "name": "ImagePullBackOff",
+        "reasons": ["Failed", "BackOff"],
+        "message": "ErrImagePull|ImagePullBackOff|Back-off pulling image|Failed to pull image",
+        "kinds": ["Pod"],
+        "severity": "critical",
+        "summary": "The container image cannot be pulled",
+        "hint": "Check the image reference, the pull secret of the service account and that the registry is reachable from the nodes",
+    },
+    {
+        "name": "FailedScheduling",
+        "reasons": ["FailedScheduling"],
+        "kinds": ["Pod"],
+        "severity": "warning",
+        "summary": "The pod cannot be placed on any node",
+        "hint": "Compare the requests with free node capacity and check node selectors, affinity, taints and unbound PersistentVolumeClaims",
+    },
+    {
+        "name": "FailedMount",
+        "reasons": ["FailedMount", "FailedAttachVolume"],
+        "kinds": ["Pod"],
+        "severity": "warning",
+        "summary": "A volume cannot be attached or mounted",
+        "hint": "Check that the referenced Secrets, ConfigMaps and PersistentVolumeClaims exist and that the volume is not attached to another node",
+    },
+    {
+        "name": "ProbeFailure",
+        "reasons": ["Unhealthy"],
+        "message": "probe failed",
+        "kinds": ["Pod"],
+        "min_count": 3,
+        "severity": "warning",
+        "summary": "Liveness, readiness or startup probes keep failing",
+        "hint": "Check the probe endpoint, port and timeouts against the application's start-up time",
+    },
+    {
+        "name": "FailedCreate",
+        "reasons": ["FailedCreate"],
+        "severity": "critical",
+        "summary": "The controller cannot create its pods",
+        "hint": "The event message names the cause, typically a ResourceQuota, LimitRange or SecurityContextConstraints rejection",
+    },
+]
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+def _isoformat(value: Optional[float]) -> Optional[str]:
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def _controller_ref(obj: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    for ref in obj.get("metadata", {}).get("ownerReferences") or []:
+        if ref.get("controller"):
+            return ref
+    return None
+
+class EventRecord:
+    """
+    The fields of a core/v1 Event used by the rules, without the rest of the object
+    """
+
+    __slots__ = (
+        "uid", "namespace", "reason", "type", "message", "count", "first_seen", "last_seen",
+        "kind", "name", "object_uid", "source",
+    )
+
+    def __init__(self, event: Dict[str, Any]):
+        metadata = event.get("metadata", {})
+        involved = event.get("involvedObject", {})
+        series = event.get("series") or {}
+        created = metadata.get("creationTimestamp")
+
+        self.uid = metadata.get("uid") or f"{metadata.get('namespace')}/{metadata.get('name')}"
+        self.namespace = metadata.get("namespace") or ""
+        self.reason = event.get("reason") or ""
+        self.type = event.get("type") or "Normal"
+        self.message = event.get("message") or ""
+        self.count = int(series.get("count") or event.get("count") or 1)
+        self.first_seen = _timestamp(event.get("firstTimestamp") or event.get("eventTime") or created)
+        self.last_seen = _timestamp(series.get("lastObservedTime") or event.get("lastTimestamp") or event.get("eventTime") or created)
+        self.kind = involved.get("kind") or ""
+        self.name = involved.get("name") or ""
+        self.object_uid = involved.get("uid") or f"{self.kind}/{involved.get('namespace') or ''}/{self.name}"
+        self.source = (event.get("source") or {}).get("component") or event.get("reportingComponent") or ""
+
+    def involved(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "namespace": self.namespace, "name": self.name, "uid": self.object_uid}
+
+class EventStore:
+    """
+    Bounded in-memory ring of Events indexed by involved object UID, namespace and reason
+
+    When max_events is exceeded the least recently updated event is
+    evicted. Deletions by the apiserver's event TTL (one hour by default)
+    are ignored, so recent history stays available until it is evicted.
+    It implements the store interface used by Informer.
+
+    Args:
+        max_events: Maximum number of events kept
+    """
+
+    def __init__(self, max_events: int = 20000):
+        self.max_events = max_events
+        self._lock = threading.RLock()
+        self._events: "OrderedDict[str, EventRecord]" = OrderedDict()
+        self._by_object: Dict[str, Dict[str, None]] = {}
+        self._by_namespace: Dict[str, Dict[str, None]] = {}
+        self._by_reason: Dict[str, Dict[str, None]] = {}
+        self._evicted = 0
+
+    def replace(self, objects: Iterable[Dict[str, Any]]):
+        """Merge a fresh list result, oldest first so the newest events survive eviction"""
+        records = sorted((EventRecord(obj) for obj in objects), key=lambda record: record.last_seen or 0)
+        with self._lock:
+            for record in records:
+                self._add(record)
+
+    def upsert(self, obj: Dict[str, Any]):
+        record = EventRecord(obj)
+        with self._lock:
+            self._add(record)
+
+    def delete(self, obj: Dict[str, Any]):
+        pass
+
+    def _add(self, record: EventRecord):
+        previous = self._events.pop(record.uid, None)
+        if previous is not None:
+            self._unindex(previous)
+        self._events[record.uid] = record
+        self._by_object.setdefault(record.object_uid, {})[record.uid] = None
+        self._by_namespace.setdefault(record.namespace, {})[record.uid] = None
+        self._by_reason.setdefault(record.reason, {})[record.uid] = None
+
+        while len(self._events) > self.max_events:
+            _, oldest = self._events.popitem(last=False)
+            self._unindex(oldest)
+            self._evicted += 1
+
+    def _unindex(self, record: EventRecord):
+        for index, key in ((self._by_object, record.object_uid), (self._by_namespace, record.namespace), (self._by_reason, record.reason)):
+            uids = index.get(key)
+            if uids is not None:
+                uids.pop(record.uid, None)
+                if not uids:
+                    del index[key]
+
+    def for_objects(self, object_uids: Iterable[str]) -> List[EventRecord]:
+        """Events whose involved object has one of the UIDs"""
+        with self._lock:
+            return [self._events[uid] for object_uid in object_uids for uid in self._by_object.get(object_uid, ())]
+
+    def for_namespace(self, namespace: str, reason: Optional[str] = None) -> List[EventRecord]:
+        """Events in a namespace, optionally with one reason, walking the smaller index"""
+        with self._lock:
+            uids = self._by_namespace.get(namespace, {})
+            if reason is not None:
+                by_reason = self._by_reason.get(reason, {})
+                if len(by_reason) < len(uids):
+                    return [self._events[uid] for uid in by_reason if self._events[uid].namespace == namespace]
+                return [self._events[uid] for uid in uids if self._events[uid].reason == reason]
+            return [self._events[uid] for uid in uids]
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "events": len(self._events),
+                "max_events": self.max_events,
+                "evicted": self._evicted,
+                "objects": len(self._by_object),
+                "namespaces": len(self._by_namespace),
+                "reasons": len(self._by_reason),
+            }
+
+class Rule:
+    """
+    One troubleshooting rule, compiled from its configuration
+
+    An event matches when its reason is one of reasons, its involved kind
+    is one of kinds (if given) and its message matches the message regex
+    (if given). A finding is reported once the matching events of an
+    object add up to min_count occurrences.
+    """
+
+    __slots__ = ("name", "reasons", "message", "kinds", "min_count", "severity", "summary", "hint")
+
+    def __init__(self, config: Dict[str, Any]):
+        try:
+            self.name = config["name"]
+            self.reasons = frozenset(config["reasons"])
+        except KeyError as e:
+            raise ValueError(f"Troubleshooter rule needs {e}")
+        try:
+            self.message = re.compile(config["message"], re.IGNORECASE) if config.get("message") else None
+        except re.error as e:
+            raise ValueError(f"Invalid message pattern in troubleshooter rule {self.name}: {e}")
+        self.kinds = frozenset(config["kinds"]) if config.get("kinds") else None
+        self.min_count = int(config.get("min_count", 1))
+        self.severity = config.get("severity", "warning")
+        self.summary = config.get("summary", "")
+        self.hint = config.get("hint", "")
+
+    def matches(self, event: EventRecord) -> bool:
+        return (self.kinds is None or event.kind in self.kinds) and (self.message is None or self.message.search(event.message) is not None)
+
+class RuleSet:
+    """
+    Rules indexed by event reason, so each event is only tested against the rules for its reason
+    """
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+        self._by_reason: Dict[str, List[Rule]] = {}
+        for rule in rules:
+            for reason in rule.reasons:
+                self._by_reason.setdefault(reason, []).append(rule)
+
+    def evaluate(self, events: Iterable[EventRecord], since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Aggregate matching events into one finding per rule and involved object
+
+        Args:
+            events: Events to evaluate
+            since: Ignore events last seen before this Unix time
+
+        Returns:
+            Findings, most severe and most recent first
+        """
+        matched: Dict[tuple, Dict[str, Any]] = {}
+        for event in events:
+            rules = self._by_reason.get(event.reason)
+            if not rules or (since is not None and event.last_seen is not None and event.last_seen < since):
+                continue
+            for rule in rules:
+                if not rule.matches(event):
+                    continue
+                key = (rule.name, event.object_uid)
+                finding = matched.get(key)
+                if finding is None:
+                    matched[key] = {"rule": rule, "event": event, "count": event.count, "first_seen": event.first_seen}
+                    continue
+                finding["count"] += event.count
+                if event.first_seen is not None and (finding["first_seen"] is None or event.first_seen < finding["first_seen"]):
+                    finding["first_seen"] = event.first_seen
+                if (event.last_seen or 0) > (finding["event"].last_seen or 0):
+                    finding["event"] = event
+
+        findings = [
+            {
+                "rule": finding["rule"].name,
+                "severity": finding["rule"].severity,
+                "summary": finding["rule"].summary,
+                "hint": finding["rule"].hint,
+                "object": finding["event"].involved(),
+                "reason": finding["event"].reason,
+                "message": finding["event"].message,
+                "count": finding["count"],
+                "first_seen": _isoformat(finding["first_seen"]),
+                "last_seen": _isoformat(finding["event"].last_seen),
+            }
+            for finding in matched.values()
+            if finding["count"] >= finding["rule"].min_count
+        ]
+        findings.sort(key=lambda finding: finding["last_seen"] or "", reverse=True)
+        findings.sort(key=lambda finding: SEVERITY_ORDER.get(finding["severity"], len(SEVERITY_ORDER)))
+        return findings
+
+def compile_rules(extra_rules: Iterable[Dict[str, Any]] = ()) -> RuleSet:
+    """
+    Compile the built-in rules and the configured ones
+
+    Raises:
+        ValueError: If a configured rule is invalid
+    """
+    configs = {config["name"]: config for config in DEFAULT_RULES}
+    for config in extra_rules:
+        configs[config.get("name")] = config
+    return RuleSet([Rule(config) for config in configs.values()])
+
+class Troubleshooter:
+    """
+    Diagnose resources from Events watched cluster-wide into an EventStore
+
+    Answers come from the event index in memory. Only the requested
+    object, its owners and, for controllers, its pods are read, from the
+    informer cache when those kinds are watched. Scanning the index,
+    evaluating the rules and the KB lookups run in the analysis executor.
+
+    Args:
+        watch_client: API client used for the Events watch
+        kube: Executor for blocking Kubernetes client calls
+        analysis: Executor for the CPU-bound rule evaluation and KB lookups
+        api_client: API client for object reads
+        flight: Coalescer for identical concurrent reads
+        lookup: Function mapping a kind or "Kind.group" to its API information
+        informers: Function returning the informer cache, once started
+        rules: Compiled rules
+        max_events: Size of the event ring buffer
+        window: Seconds of events considered by the rules
+        page_size: Page size of the initial Events list
+        watch_timeout: Seconds before the Events watch is renewed
+        kb: Local KB whose best articles are attached to each finding
+    """
+
+    def __init__(
+        self,
+        watch_client: client.ApiClient,
+        kube: BlockingExecutor,
+        analysis: BlockingExecutor,
+        api_client: client.ApiClient,
+        flight: SingleFlight,
+        lookup: Callable[[str], Optional[Dict[str, Any]]],
+        informers: Callable[[], Optional[InformerCache]],
+        rules: RuleSet,
+        max_events: int = 20000,
+        window: float = 3600,
+        page_size: int = 500,
+        watch_timeout: int = 300,
+        kb: Optional[KnowledgeBase] = None,
+    ):
+        self.kube = kube
+        self.analysis = analysis
+        self.api_client = api_client
+        self.flight = flight
+        self.lookup = lookup
+        self.informers = informers
+        self.rules = rules
+        self.window = window
+        self.kb = kb
+        self.events = EventStore(max_events)
+        self.informer = Informer(watch_client, "Event", EVENT_RESOURCE, page_size=page_size, watch_timeout=watch_timeout, store=self.events)
+
+    def start(self):
+        self.informer.start()
+
+    def stop(self):
+        self.informer.stop()
+
+    async def namespace_report(self, namespace: str) -> Dict[str, Any]:
+        """
+        Findings for every object in a namespace
+        """
+        return await self.analysis.run(self._namespace_report, namespace)
+
+    def _namespace_report(self, namespace: str) -> Dict[str, Any]:
+        events = self.events.for_namespace(namespace)
+        return {
+            "namespace": namespace,
+            "synced": self.informer.has_synced,
+            "window": self.window,
+            "events": len(events),
+            "findings": self._with_articles(self.rules.evaluate(events, since=time.time() - self.window)),
+        }
+
+    async def diagnose(self, namespace: str, kind: str, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Findings for a resource, its owners and, for controllers, its pods
+
+        Returns:
+            The report, or None if the resource does not exist
+
+        Raises:
+            ValueError: If the kind is unknown
+            ApiException: If the apiserver rejects a read
+            asyncio.TimeoutError: If a read times out
+        """
+        resource_info = self.lookup(kind)
+        if not resource_info:
+            raise ValueError(f"Unknown resource kind: {kind}")
+        if not resource_info.get("namespaced", True):
+            namespace = None
+
+        subject = await self._get(kind, resource_info, namespace, name)
+        if subject is None:
+            return None
+
+        related: Dict[str, Dict[str, Any]] = {}
+        self._relate(related, subject, kind, "subject")
+
+        current = subject
+        for _ in range(MAX_OWNER_DEPTH):
+            ref = _controller_ref(current)
+            if ref is None or ref.get("uid") in related:
+                break
+            # Events are indexed by UID, so the owner's events are found even if it cannot be read
+            related[ref["uid"]] = {"kind": ref["kind"], "name": ref["name"], "uid": ref["uid"], "relation": "owner"}
+            group = ref.get("apiVersion", "").rpartition("/")[0]
+            owner_info = self.lookup(f"{ref['kind']}.{group}" if group else ref["kind"]) or self.lookup(ref["kind"])
+            if not owner_info:
+                break
+            current = await self._get(ref["kind"], owner_info, namespace, ref["name"])
+            if current is None:
+                break
+
+        replicasets: Set[str] = set()
+        if kind in POD_CONTROLLERS and namespace:
+            for pod in await self._pods(namespace):
+                ref = _controller_ref(pod)
+                if ref is None:
+                    continue
+                # Deployment pods belong to a ReplicaSet named <deployment>-<pod-template-hash>
+                if kind == "Deployment" and ref.get("kind") == "ReplicaSet" and ref["name"].rpartition("-")[0] == name:
+                    replicasets.add(ref["name"])
+                    related.setdefault(ref["uid"], {"kind": "ReplicaSet", "name": ref["name"], "uid": ref["uid"], "relation": "replicaset"})
+                elif ref.get("uid") not in related:
+                    continue
+                self._relate(related, pod, "Pod", "pod")
+
+        events, findings = await self.analysis.run(self._evaluate, related, kind, namespace, name, replicasets)
+        return {
+            "subject": {"kind": kind, "namespace": namespace, "name": name, "uid": subject.get("metadata", {}).get("uid")},
+            "related": list(related.values()),
+            "synced": self.informer.has_synced,
+            "window": self.window,
+            "events": events,
+            "findings": findings,
+        }
+
+    def _evaluate(
+        self,
+        related: Dict[str, Dict[str, Any]],
+        kind: str,
+        namespace: Optional[str],
+        name: str,
+        replicasets: Set[str],
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        events = self.events.for_objects(related)
+        if kind == "Deployment" and namespace:
+            # ReplicaSets are not watched and replaced pods are gone, so their
+            # events are matched by name: <deployment>-<hash> and <deployment>-<hash>-<suffix>
+            known = {event.uid for event in events}
+            candidates = [event for event in self.events.for_namespace(namespace) if event.uid not in known and event.kind in ("ReplicaSet", "Pod")]
+            replicasets.update(event.name for event in candidates if event.kind == "ReplicaSet" and event.name.rpartition("-")[0] == name)
+            events.extend(
+                event for event in candidates
+                if (event.name if event.kind == "ReplicaSet" else event.name.rpartition("-")[0]) in replicasets
+            )
+        return len(events), self._with_articles(self.rules.evaluate(events, since=time.time() - self.window))
+
+    def _with_articles(self, findings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # The query only depends on the rule, so repeated findings hit the KB result cache
+        if self.kb is not None:
+            for finding in findings:
+                finding["articles"] = self.kb.search(f"{finding['rule']} {finding['summary']}")
+        return findings
+
+    @staticmethod
+    def _relate(related: Dict[str, Dict[str, Any]], obj: Dict[str, Any], kind: str, relation: str):
+        metadata = obj.get("metadata", {})
+        uid = metadata.get("uid")
+        if uid and uid not in related:
+            related[uid] = {"kind": kind, "name": metadata.get("name"), "uid": uid, "relation": relation}
+
+    async def _get(self, kind: str, resource_info: Dict[str, Any], namespace: Optional[str], name: str) -> Optional[Dict[str, Any]]:
+        informers = self.informers()
+        if informers is not None and informers.has_synced(kind):
+            return informers.get(kind, namespace, name)
+
+        key = kube_read_key("get", resource_info, namespace, name)
+        try:
+            return await self.flight.do(key, self.kube.run, get_json, self.api_client, resource_path(resource_info, namespace, name))
+        except ApiException as e:
+            if e.status == 404:
+                return None
+            raise
+
+    async def _pods(self, namespace: str) -> List[Dict[str, Any]]:
+        informers = self.informers()
+        if informers is not None and informers.has_synced("Pod"):
+            return informers.list("Pod", namespace)
+
+        key = kube_read_key("list", POD_RESOURCE, namespace)
+        result = await self.flight.do(key, self.kube.run, get_json, self.api_client, resource_path(POD_RESOURCE, namespace))
+        return result.get("items", [])
+
+    def stats(self) -> Dict[str, Any]:
+        return {"synced": self.informer.has_synced, "rules": len(self.rules.rules), **self.events.stats()}
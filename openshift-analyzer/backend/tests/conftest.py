@@ -0,0 +1,147 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any
+from urllib.parse import parse_qs
+
+import pytest
+import yaml
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_TEMPLATE = os.path.join(BACKEND_DIR, "..", "config", "config.yaml")
+
+def empty_list(kind: str) -> dict:
+    return {"kind": kind, "metadata": {"resourceVersion": "1"}, "items": []}
+
+# Discovery and the lists read during start-up and warm-up
+APISERVER_RESPONSES = {
+    "/api": {"kind": "APIVersions", "versions": ["v1"]},
+    "/apis": {"kind": "APIGroupList", "groups": []},
+    "/api/v1": {
+        "kind": "APIResourceList",
+        "resources": [
+            {"name": "namespaces", "kind": "Namespace", "namespaced": False},
+            {"name": "pods", "kind": "Pod", "namespaced": True},
+            {"name": "events", "kind": "Event", "namespaced": True},
+        ],
+    },
+    "/api/v1/namespaces": {
+        "kind": "NamespaceList",
+        "metadata": {"resourceVersion": "1"},
+        "items": [{"metadata": {"name": "default", "uid": "ns-default"}, "status": {"phase": "Active"}}],
+    },
+    "/api/v1/events": empty_list("EventList"),
+    "/apis/operators.coreos.com/v1alpha1/clusterserviceversions": empty_list("ClusterServiceVersionList"),
+    "/apis/config.openshift.io/v1/clusterversions": empty_list("ClusterVersionList"),
+}
+
+class FakeApiserverHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        params = parse_qs(query)
+        self.server.requests.append(self.path)
+        if params.get("watch", [""])[0] in ("true", "1"):
+            # An idle watch that ends quickly; informers simply re-watch
+            time.sleep(0.5)
+            self.send_json(200, b"")
+            return
+        body = self.server.responses.get(path)
+        if body is None:
+            self.send_json(404, json.dumps({"kind": "Status", "code": 404, "reason": "NotFound"}).encode())
+            return
+        if "limit" in params and "items" in body:
+            # Chunked list: the continue token is the offset of the next item
+            offset = int(params.get("continue", ["0"])[0])
+            end = offset + int(params["limit"][0])
+            metadata = dict(body.get("metadata", {}))
+            if end < len(body["items"]):
+                metadata["continue"] = str(end)
+            body = dict(body, metadata=metadata, items=body["items"][offset:end])
+        self.send_json(200, json.dumps(body).encode())
+
+    def send_json(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class FakeApiserver(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, responses: Dict[str, Any]):
+        super().__init__(("127.0.0.1", 0), FakeApiserverHandler)
+        self.responses = responses
+        self.requests = []
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+
+    def handle_error(self, request, client_address):
+        # Clients closing watches and pooled connections early are expected
+        pass
+
+@pytest.fixture(scope="session")
+def start_apiserver():
+    """
+    Start FakeApiservers answering GETs from a path -> body dict
+
+    Lists are paginated when the request has a limit. Every server is
+    stopped at the end of the session.
+    """
+    servers = []
+
+    def start(responses: Dict[str, Any]) -> FakeApiserver:
+        server = FakeApiserver(responses)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+@pytest.fixture(scope="session")
+def fake_apiserver(start_apiserver):
+    """URL of an HTTP server answering discovery and list requests like an empty cluster"""
+    return start_apiserver(APISERVER_RESPONSES).url
+
+@pytest.fixture(scope="session")
+def app_config(tmp_path_factory, fake_apiserver) -> str:
+    """
+    Path of a config.yaml derived from the shipped one, pointing at the fake apiserver
+
+    Auth, Prometheus and config hot reload are disabled; data directories
+    are temporary.
+    """
+    directory = tmp_path_factory.mktemp("config")
+    kubeconfig = directory / "kubeconfig"
+    kubeconfig.write_text(yaml.safe_dump({
+        "apiVersion": "v1",
+        "kind": "Config",
+        "clusters": [{"name": "test", "cluster": {"server": fake_apiserver}}],
+        "users": [{"name": "test", "user": {"token": "test"}}],
+        "contexts": [{"name": "test", "context": {"cluster": "test", "user": "test"}}],
+        "current-context": "test",
+    }))
+
+    with open(CONFIG_TEMPLATE) as f:
+        config = yaml.safe_load(f)
+    config["auth"]["enabled"] = False
+    config["server"]["config_reload"]["enabled"] = False
+    config["prometheus"]["url"] = ""
+    config["kubernetes"]["in_cluster"] = False
+    config["kubernetes"]["kubeconfig_path"] = str(kubeconfig)
+    config["features"]["cluster_comparison"]["kubeconfig_path"] = str(kubeconfig)
+    config["features"]["capacity"]["report_dir"] = str(directory / "capacity")
+    config["features"]["troubleshooter"]["kb_search"]["directory"] = str(directory / "kb")
+
+    path = directory / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+    return str(path)
@@ -0,0 +1,128 @@
+import asyncio
+import copy
+from typing import Dict, Any, List
+
+import pytest
+import yaml
+from kubernetes import client
+from kubernetes.config import ConfigException
+
+from services.comparison import ComparisonEngine, KubeconfigClients, structural_diff
+from services.sanitizer import Sanitizer
+from utils.offload import BlockingExecutor
+
+CONFIGMAP = {"api_version": "v1", "group": "", "version": "v1", "plural": "configmaps", "namespaced": True}
+
+def configmap(name: str, data: Dict[str, str], uid: str) -> Dict[str, Any]:
+    return {
+        "apiVersion": "v1",
+        "kind": "ConfigMap",
+        "metadata": {"name": name, "namespace": "demo", "uid": uid, "resourceVersion": uid, "creationTimestamp": "2026-01-01T00:00:00Z"},
+        "data": data,
+    }
+
+def configmap_list(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {"kind": "ConfigMapList", "metadata": {"resourceVersion": "1"}, "items": items}
+
+@pytest.fixture
+def clusters(start_apiserver, tmp_path):
+    """Two fake apiservers holding five identical ConfigMaps plus a changed one and one only on the left"""
+    shared = [configmap(f"shared-{i}", {"key": str(i)}, uid=f"left-{i}") for i in range(5)]
+    left = shared + [
+        configmap("changed", {"mode": "a", "level": "info"}, uid="left-changed"),
+        configmap("left-only", {}, uid="left-only"),
+    ]
+    # Only fields the sanitizer strips differ on the shared objects
+    right = [copy.deepcopy(obj) for obj in shared]
+    for obj in right:
+        obj["metadata"]["uid"] = obj["metadata"]["resourceVersion"] = "right"
+    right.append(configmap("changed", {"mode": "b", "extra": "yes", "level": "info"}, uid="right-changed"))
+
+    servers = {
+        "left": start_apiserver({"/api/v1/namespaces/demo/configmaps": configmap_list(left)}),
+        "right": start_apiserver({"/api/v1/namespaces/demo/configmaps": configmap_list(right)}),
+    }
+    kubeconfig = tmp_path / "kubeconfig"
+    kubeconfig.write_text(yaml.safe_dump({
+        "apiVersion": "v1",
+        "kind": "Config",
+        "clusters": [{"name": name, "cluster": {"server": server.url}} for name, server in servers.items()],
+        "users": [{"name": "test", "user": {"token": "test"}}],
+        "contexts": [{"name": name, "context": {"cluster": name, "user": "test"}} for name in servers],
+    }))
+    return servers, str(kubeconfig)
+
+def compare(kubeconfig: str, contexts: List[str], kinds: List[str], page_size: int = 2):
+    async def run():
+        engine = ComparisonEngine(
+            BlockingExecutor("kube", timeout_kwarg="_request_timeout"),
+            BlockingExecutor("analysis", max_concurrency=2, timeout=None),
+            Sanitizer(),
+            {"ConfigMap": CONFIGMAP}.get,
+            KubeconfigClients(client.ApiClient(), kubeconfig).get,
+            page_size=page_size,
+        )
+        return engine, await engine.compare(contexts, kinds, "demo")
+    return asyncio.run(run())
+
+def test_identical_objects_are_skipped_by_hash(clusters):
+    _, kubeconfig = clusters
+
+    _, comparison = compare(kubeconfig, ["left", "right"], ["ConfigMap"])
+    summary = comparison.summary()
+
+    assert summary["objects"] == {"left": 7, "right": 6}
+    assert summary["identical"] == 5
+    assert summary["different"] == 2
+    assert summary["errors"] == {}
+    assert [key[2] for key in comparison.differences] == ["changed", "left-only"]
+
+def test_changed_objects_get_a_structural_diff(clusters):
+    _, kubeconfig = clusters
+    _, comparison = compare(kubeconfig, ["left", "right"], ["ConfigMap"])
+
+    changed, missing = comparison.page(0, 10)
+
+    assert changed["status"] == "different"
+    assert changed["base"] == "left"
+    assert changed["changes"] == {"right": [
+        {"path": "data.extra", "op": "added", "left": None, "right": "yes"},
+        {"path": "data.mode", "op": "changed", "left": "a", "right": "b"},
+    ]}
+    assert missing["status"] == "missing"
+    assert missing["present_in"] == ["left"]
+    assert missing["changes"] == {}
+
+def test_lists_and_results_are_paginated(clusters):
+    servers, kubeconfig = clusters
+    del servers["left"].requests[:]
+
+    engine, comparison = compare(kubeconfig, ["left", "right"], ["ConfigMap"], page_size=3)
+
+    # Seven objects in pages of three
+    assert [request.partition("?")[2] for request in servers["left"].requests] == [
+        "limit=3",
+        "limit=3&continue=3",
+        "limit=3&continue=6",
+    ]
+    assert [item["name"] for item in comparison.page(0, 1)] == ["changed"]
+    assert [item["name"] for item in comparison.page(1, 1)] == ["left-only"]
+    assert comparison.page(2, 1) == []
+    assert engine.get(comparison.id) is comparison
+
+def test_unknown_kinds_and_contexts_are_rejected(clusters):
+    _, kubeconfig = clusters
+
+    with pytest.raises(ValueError):
+        compare(kubeconfig, ["left", "right"], ["Widget"])
+    with pytest.raises(ConfigException):
+        compare(kubeconfig, ["left", "missing"], ["ConfigMap"])
+
+def test_structural_diff_escapes_dotted_keys_and_indexes_lists():
+    left = {"metadata": {"labels": {"app.kubernetes.io/name": "web"}}, "spec": {"ports": [80, 443]}}
+    right = {"metadata": {"labels": {"app.kubernetes.io/name": "api"}}, "spec": {"ports": [80]}}
+
+    assert structural_diff(left, right) == [
+        {"path": "metadata.labels.app\\.kubernetes\\.io/name", "op": "changed", "left": "web", "right": "api"},
+        {"path": "spec.ports[1]", "op": "removed", "left": 443, "right": None},
+    ]
@@ -0,0 +1,111 @@
+import asyncio
+import io
+import tarfile
+from typing import Dict, Any, List, Optional
+
+import pytest
+import yaml
+from kubernetes import client
+
+from services.export import ManifestExporter, tar_stream, yaml_stream
+from services.sanitizer import Sanitizer
+from utils.offload import BlockingExecutor
+
+RESOURCES = {
+    "ConfigMap": {"api_version": "v1", "group": "", "version": "v1", "plural": "configmaps", "namespaced": True},
+    "Secret": {"api_version": "v1", "group": "", "version": "v1", "plural": "secrets", "namespaced": True},
+    "Node": {"api_version": "v1", "group": "", "version": "v1", "plural": "nodes", "namespaced": False},
+}
+
+CONFIGMAPS = [
+    {"metadata": {"name": f"config-{i}", "namespace": "demo", "uid": f"uid-{i}", "resourceVersion": str(i)}, "data": {"index": str(i)}}
+    for i in range(5)
+]
+
+class StaticDiscovery:
+    def lookup(self, kind: str) -> Optional[Dict[str, Any]]:
+        return RESOURCES.get(kind)
+
+class SyncedInformers:
+    """Informer cache stand-in holding every kind as synced"""
+
+    def __init__(self, objects: Dict[str, List[Dict[str, Any]]]):
+        self.objects = objects
+
+    def has_synced(self, kind: str) -> bool:
+        return kind in self.objects
+
+    def list(self, kind: str, namespace: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self.objects[kind]
+
+@pytest.fixture(scope="module")
+def apiserver(start_apiserver):
+    # Secrets are missing, so listing them fails with 404
+    return start_apiserver({
+        "/api/v1/namespaces/demo/configmaps": {"kind": "ConfigMapList", "metadata": {}, "items": CONFIGMAPS},
+    })
+
+def export(apiserver, stream, kinds: List[str], informers=None) -> tuple:
+    """Run stream over a fresh exporter with a page size of two; return the joined output and the analysis executor stats"""
+    async def run():
+        configuration = client.Configuration()
+        configuration.host = apiserver.url
+        analysis = BlockingExecutor("analysis", max_concurrency=2, timeout=None)
+        exporter = ManifestExporter(
+            BlockingExecutor("kube", timeout_kwarg="_request_timeout"),
+            analysis,
+            client.ApiClient(configuration),
+            StaticDiscovery(),
+            informers,
+            Sanitizer().sanitize,
+            page_size=2,
+        )
+        chunks = [chunk async for chunk in stream(exporter, "demo", kinds)]
+        return chunks, analysis.stats()
+    chunks, stats = asyncio.run(run())
+    return (b"" if chunks and isinstance(chunks[0], bytes) else "").join(chunks), stats
+
+def test_yaml_export_dumps_each_page_in_one_analysis_call(apiserver):
+    output, stats = export(apiserver, yaml_stream, ["ConfigMap"])
+
+    documents = list(yaml.safe_load_all(output))
+    assert [document["metadata"]["name"] for document in documents] == [f"config-{i}" for i in range(5)]
+    assert documents[0] == {"apiVersion": "v1", "kind": "ConfigMap", "metadata": {"name": "config-0", "namespace": "demo"}, "data": {"index": "0"}}
+    # Five objects in pages of two
+    assert stats["completed"] == 3
+
+def test_failed_and_cluster_scoped_kinds_are_reported_at_the_end(apiserver):
+    output, _ = export(apiserver, yaml_stream, ["ConfigMap", "Secret", "Node", "Widget"])
+
+    errors = [line for line in output.splitlines() if line.startswith("# ")]
+    assert sorted(errors) == [
+        "# Export of Node failed: cluster-scoped kind cannot be exported from a namespace",
+        "# Export of Secret failed: 404 Not Found",
+        "# Export of Widget failed: unknown resource kind",
+    ]
+    assert output.splitlines()[-3:] == errors
+    assert len(list(yaml.safe_load_all(output))) == 5
+
+def test_tar_export_has_one_member_per_manifest(apiserver):
+    output, _ = export(apiserver, tar_stream, ["ConfigMap", "Secret"])
+
+    with tarfile.open(fileobj=io.BytesIO(output)) as archive:
+        names = archive.getnames()
+        manifest = yaml.safe_load(archive.extractfile("demo/ConfigMap/config-3.yaml"))
+        errors = archive.extractfile("demo/errors.txt").read().decode()
+
+    assert sorted(names) == sorted([f"demo/ConfigMap/config-{i}.yaml" for i in range(5)] + ["demo/errors.txt"])
+    assert manifest["data"] == {"index": "3"}
+    assert errors == "Secret: 404 Not Found\n"
+
+def test_synced_informers_are_paged_the_same_way(apiserver):
+    informers = SyncedInformers({"ConfigMap": CONFIGMAPS})
+    requests = len(apiserver.requests)
+
+    output, stats = export(apiserver, yaml_stream, ["ConfigMap"], informers)
+
+    assert len(list(yaml.safe_load_all(output))) == 5
+    assert stats["completed"] == 3
+    assert len(apiserver.requests) == requests
+    # The sanitizer copies, so the cached objects keep their server fields
+    assert CONFIGMAPS[0]["metadata"]["uid"] == "uid-0"
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import os
+
+import pytest
+from kubernetes import client
+
+from services.kb import KnowledgeBase, parse_json, parse_markdown, tokenize
+from services.troubleshooter import Troubleshooter, compile_rules
+from utils.offload import BlockingExecutor
+from utils.singleflight import SingleFlight
+
+CRASHLOOP = """---
+title: Pod stuck in CrashLoopBackOff
+url: https://kb.example/crashloop
+tags: [restart]
+---
+# Ignored heading
+A container keeps crashing. Check the logs of the previous instance and its exit code.
+"""
+
+def write(path, text: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def ids(results):
+    return [result["id"] for result in results]
+
+@pytest.fixture
+def kb_dir(tmp_path):
+    write(tmp_path / "crashloop.md", CRASHLOOP)
+    write(tmp_path / "storage" / "mount.md", "# Volume mount failures\nFailedMount: the PersistentVolumeClaim is not bound or the volume is attached elsewhere.\n")
+    write(tmp_path / "more.json", json.dumps({"articles": [
+        {"id": "scheduling", "title": "FailedScheduling: insufficient cpu", "content": "No node fits the pod requests; check taints and node selectors."},
+        {"title": "Image pull errors", "text": "ImagePullBackOff: the registry is unreachable or the pull secret is missing."},
+    ]}))
+    return tmp_path
+
+def test_tokenize_drops_stopwords_and_single_characters():
+    assert tokenize("The Pod is in CrashLoopBackOff, a x restart-loop") == ["pod", "crashloopbackoff", "restart", "loop"]
+
+def test_parse_markdown_reads_front_matter():
+    article = parse_markdown(CRASHLOOP, "crashloop")
+
+    assert article["title"] == "Pod stuck in CrashLoopBackOff"
+    assert article["url"] == "https://kb.example/crashloop"
+    assert article["tags"] == ["restart"]
+    assert article["body"].startswith("# Ignored heading")
+
+def test_parse_markdown_falls_back_to_the_first_heading_then_the_file_name():
+    assert parse_markdown("Intro\n\n# Node pressure\nText", "node")["title"] == "Node pressure"
+    assert parse_markdown("No heading here", "node-pressure")["title"] == "node-pressure"
+
+def test_parse_markdown_rejects_front_matter_that_is_not_a_mapping():
+    with pytest.raises(ValueError):
+        parse_markdown("---\n- a\n- b\n---\nbody", "list")
+
+def test_parse_json_accepts_one_article_a_list_or_an_articles_key():
+    assert parse_json('{"title": "One", "body": "text"}') == [{"title": "One", "body": "text"}]
+    assert [article["body"] for article in parse_json('[{"title": "A", "content": "a"}, {"title": "B", "text": "b"}]')] == ["a", "b"]
+    assert [article["title"] for article in parse_json('{"articles": [{"title": "A"}]}')] == ["A"]
+    with pytest.raises(ValueError):
+        parse_json('"just a string"')
+
+def test_search_ranks_title_matches_and_rare_terms_first(tmp_path):
+    write(tmp_path / "title.md", "# Certificate rotation\nRotating serving certs.")
+    write(tmp_path / "body.md", "# Operators\nAn operator may mention a certificate in passing among many other words about upgrades.")
+    write(tmp_path / "common.md", "# Pods\nPods pods pods restart.")
+    write(tmp_path / "common2.md", "# More pods\nPods restart often.")
+    kb = KnowledgeBase(str(tmp_path))
+    kb.refresh()
+
+    assert ids(kb.search("certificate")) == ["title.md", "body.md"]
+    # "rotation" appears in one article, "pods" in two: the rare term decides
+    assert ids(kb.search("pods rotation"))[0] == "title.md"
+
+def test_search_limits_results_and_ignores_stopword_queries(kb_dir):
+    kb = KnowledgeBase(str(kb_dir), max_results=1)
+    kb.refresh()
+
+    assert len(kb.search("pod node volume")) == 1
+    assert len(kb.search("pod node volume", limit=3)) == 3
+    assert kb.search("the and of") == []
+
+def test_results_carry_metadata_and_a_snippet(kb_dir):
+    kb = KnowledgeBase(str(kb_dir))
+    kb.refresh()
+
+    result = kb.search("crashloopbackoff exit code")[0]
+
+    assert (result["id"], result["title"], result["url"]) == ("crashloop.md", "Pod stuck in CrashLoopBackOff", "https://kb.example/crashloop")
+    assert "exit code" in result["snippet"]
+    assert result["score"] > 0
+    assert set(ids(kb.search("insufficient cpu registry"))) == {"scheduling", "more.json#1"}
+
+def test_refresh_only_reads_changed_files(kb_dir, monkeypatch):
+    kb = KnowledgeBase(str(kb_dir))
+    kb.refresh()
+    read = []
+    original = kb._read
+    monkeypatch.setattr(kb, "_read", lambda path: read.append(os.path.basename(path)) or original(path))
+
+    assert kb.refresh() is False
+    assert read == []
+
+    with open(kb_dir / "crashloop.md", "a") as f:
+        f.write("\nOOMKilled containers also restart in a loop.\n")
+    assert kb.refresh() is True
+    assert read == ["crashloop.md"]
+    assert ids(kb.search("oomkilled")) == ["crashloop.md"]
+
+def test_refresh_drops_deleted_files_and_their_terms(kb_dir):
+    kb = KnowledgeBase(str(kb_dir))
+    kb.refresh()
+    terms = kb.stats()["terms"]
+
+    os.remove(kb_dir / "storage" / "mount.md")
+
+    assert kb.refresh() is True
+    assert kb.search("persistentvolumeclaim") == []
+    assert kb.stats()["articles"] == 3
+    assert kb.stats()["terms"] < terms
+
+def test_updates_are_never_served_from_the_result_cache(kb_dir):
+    kb = KnowledgeBase(str(kb_dir))
+    kb.refresh()
+    assert ids(kb.search("quota")) == []
+
+    write(kb_dir / "quota.md", "# Exceeded quota\nThe ResourceQuota of the namespace rejects new pods.")
+    kb.refresh()
+
+    assert ids(kb.search("quota")) == ["quota.md"]
+
+def test_hidden_entries_and_broken_files_are_skipped(kb_dir):
+    write(kb_dir / "..2026_01_01" / "crashloop.md", CRASHLOOP)
+    write(kb_dir / ".draft.md", "# Draft crashloopbackoff")
+    write(kb_dir / "broken.json", "{not json")
+    kb = KnowledgeBase(str(kb_dir))
+    kb.refresh()
+
+    assert ids(kb.search("crashloopbackoff")) == ["crashloop.md"]
+    assert kb.stats()["articles"] == 4
+
+def test_duplicate_explicit_ids_stay_unique(tmp_path):
+    write(tmp_path / "a.json", '{"id": "same", "title": "First quota article"}')
+    write(tmp_path / "b.json", '{"id": "same", "title": "Second quota article"}')
+    kb = KnowledgeBase(str(tmp_path))
+    kb.refresh()
+
+    assert len(set(ids(kb.search("quota")))) == 2
+
+def test_troubleshooter_findings_carry_kb_articles(kb_dir):
+    kb = KnowledgeBase(str(kb_dir))
+    kb.refresh()
+    troubleshooter = Troubleshooter(
+        client.ApiClient(),
+        BlockingExecutor("kube"),
+        BlockingExecutor("analysis", max_concurrency=1, timeout=None),
+        client.ApiClient(),
+        SingleFlight(observe=None),
+        lambda kind: None,
+        lambda: None,
+        compile_rules(),
+        kb=kb,
+    )
+    troubleshooter.events.upsert({
+        "metadata": {"uid": "e1", "namespace": "demo", "name": "e1", "creationTimestamp": "2099-01-01T00:00:00Z"},
+        "involvedObject": {"kind": "Pod", "namespace": "demo", "name": "web-1", "uid": "pod-1"},
+        "reason": "BackOff",
+        "message": "Back-off restarting failed container app",
+    })
+
+    report = asyncio.run(troubleshooter.namespace_report("demo"))
+
+    assert [finding["rule"] for finding in report["findings"]] == ["CrashLoopBackOff"]
+    assert ids(report["findings"][0]["articles"])[0] == "crashloop.md"
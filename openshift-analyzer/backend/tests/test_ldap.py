@@ -0,0 +1,292 @@
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+import pytest
+
+ldap = pytest.importorskip("ldap")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import auth.ldap_pool
+import auth.tokens
+from auth.ldap import LdapAuthenticator, router
+from auth.ldap_pool import LdapConnectionPool, PoolTimeout
+from utils.offload import BlockingExecutor
+
+SERVICE_DN = "cn=reader,dc=example,dc=org"
+ALICE_DN = "uid=alice,ou=people,dc=example,dc=org"
+
+class StubDirectory:
+    """In-process stand-in for ldap.initialize and the server behind it"""
+
+    def __init__(self):
+        self.passwords = {SERVICE_DN: "reader-secret", ALICE_DN: "wonderland"}
+        self.entries = {
+            "(uid=alice)": (ALICE_DN, {
+                "uid": [b"alice"],
+                "mail": [b"alice@example.org"],
+                "cn": [b"Alice Liddell"],
+                "memberOf": [b"cn=admins,ou=groups,dc=example,dc=org", b"cn=dev,ou=groups,dc=example,dc=org"],
+            }),
+        }
+        self.connections: List["StubConnection"] = []
+        self.binds: List[str] = []
+        self.searches: List[str] = []
+
+    def __call__(self, uri: str) -> "StubConnection":
+        conn = StubConnection(self)
+        self.connections.append(conn)
+        return conn
+
+class StubConnection:
+    def __init__(self, directory: StubDirectory):
+        self.directory = directory
+        self.options: Dict[int, Any] = {}
+        self.alive = True
+        self.unbound = False
+
+    def set_option(self, option: int, value: Any):
+        self.options[option] = value
+
+    def simple_bind_s(self, dn: str, password: str):
+        self.directory.binds.append(dn)
+        if not self.alive:
+            raise ldap.SERVER_DOWN({"desc": "Can't contact LDAP server"})
+        if self.directory.passwords.get(dn) != password:
+            raise ldap.INVALID_CREDENTIALS({"desc": "Invalid credentials"})
+
+    def whoami_s(self) -> str:
+        if not self.alive:
+            raise ldap.SERVER_DOWN({"desc": "Can't contact LDAP server"})
+        return f"dn:{SERVICE_DN}"
+
+    def search_s(self, base: str, scope: int, filterstr: str, attrlist: List[str]):
+        self.directory.searches.append(filterstr)
+        entry = self.directory.entries.get(filterstr)
+        # Servers may add continuation references without a DN
+        return ([entry] if entry else []) + [(None, ["ldap://other.example.org/dc=example,dc=org"])]
+
+    def unbind_s(self):
+        self.unbound = True
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+@pytest.fixture
+def directory() -> StubDirectory:
+    return StubDirectory()
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(auth.ldap_pool, "time", clock)
+    return clock
+
+def pool(directory: StubDirectory, bind_dn: Optional[str] = SERVICE_DN, **kwargs) -> LdapConnectionPool:
+    return LdapConnectionPool(
+        "ldap://ldap.example.org",
+        bind_dn,
+        "reader-secret" if bind_dn else None,
+        factory=directory,
+        **kwargs,
+    )
+
+def authenticator(directory: StubDirectory, search: bool = True, **kwargs) -> LdapAuthenticator:
+    return LdapAuthenticator(
+        pool(directory) if search else None,
+        pool(directory, bind_dn=None, **kwargs),
+        "ou=people,dc=example,dc=org",
+        "(uid=%s)" if search else "uid=%s,ou=people,dc=example,dc=org",
+    )
+
+def test_connections_are_checked_in_and_reused(directory):
+    connections = pool(directory)
+
+    with connections.connection() as first:
+        pass
+    with connections.connection() as second:
+        pass
+
+    assert first is second
+    assert directory.binds == [SERVICE_DN]
+    assert first.options[ldap.OPT_REFERRALS] == 0
+    assert connections.stats() == {"opened": 1, "reused": 1, "dropped": 0, "health_checks": 0, "idle": 1, "size": 4}
+
+def test_checkouts_are_bounded_by_the_pool_size(directory):
+    connections = pool(directory, size=2, timeout=0.05)
+
+    with connections.connection(), connections.connection():
+        with pytest.raises(PoolTimeout):
+            with connections.connection():
+                pass
+    with connections.connection():
+        pass
+
+    assert len(directory.connections) == 2
+
+def test_concurrent_checkouts_never_exceed_the_pool_size(directory):
+    connections = pool(directory, size=3, timeout=5)
+    lock = threading.Lock()
+    active = []
+    peak = []
+
+    def login():
+        with connections.connection():
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.01)
+            with lock:
+                active.pop()
+
+    threads = [threading.Thread(target=login) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) <= 3
+    assert len(directory.connections) <= 3
+
+def test_idle_connections_failing_whoami_are_replaced(directory, clock):
+    connections = pool(directory, health_check_interval=30)
+    with connections.connection() as stale:
+        pass
+
+    clock.now += 31
+    stale.alive = False
+    with connections.connection() as fresh:
+        pass
+
+    assert fresh is not stale
+    assert stale.unbound
+    assert connections.stats()["health_checks"] == 1
+    assert connections.stats()["dropped"] == 1
+
+def test_healthy_idle_connections_are_reused_after_a_whoami(directory, clock):
+    connections = pool(directory, health_check_interval=30)
+    with connections.connection() as first:
+        pass
+
+    clock.now += 10
+    with connections.connection() as recent:
+        pass
+    clock.now += 31
+    with connections.connection() as checked:
+        pass
+
+    assert first is recent is checked
+    assert connections.stats()["health_checks"] == 1
+
+def test_connections_are_reopened_after_max_lifetime(directory, clock):
+    connections = pool(directory, max_lifetime=600)
+    with connections.connection() as old:
+        pass
+
+    clock.now += 601
+    with connections.connection() as new:
+        pass
+
+    assert new is not old
+    assert old.unbound
+    assert connections.stats()["health_checks"] == 0
+
+def test_network_errors_drop_the_connection_but_bind_failures_do_not(directory):
+    connections = pool(directory, bind_dn=None)
+
+    with pytest.raises(ldap.INVALID_CREDENTIALS):
+        with connections.connection() as conn:
+            conn.simple_bind_s(ALICE_DN, "wrong")
+    with pytest.raises(ldap.SERVER_DOWN):
+        with connections.connection() as same:
+            same.alive = False
+            same.simple_bind_s(ALICE_DN, "wonderland")
+
+    assert same is conn
+    assert conn.unbound
+    assert connections.stats()["idle"] == 0
+
+def test_warm_opens_bound_connections_up_to_the_pool_size(directory):
+    connections = pool(directory, size=3)
+
+    connections.warm()
+
+    assert connections.stats()["idle"] == 3
+    assert directory.binds == [SERVICE_DN] * 3
+
+def test_authenticate_searches_then_binds_as_the_user(directory):
+    ldap_auth = authenticator(directory)
+
+    user = ldap_auth.authenticate("alice", "wonderland")
+
+    assert user == {
+        "username": "alice",
+        "dn": ALICE_DN,
+        "email": "alice@example.org",
+        "full_name": "Alice Liddell",
+        "groups": ["admins", "dev"],
+    }
+    assert directory.binds == [SERVICE_DN, ALICE_DN]
+
+def test_repeated_logins_reuse_the_cached_lookup(directory):
+    ldap_auth = authenticator(directory)
+
+    assert ldap_auth.authenticate("alice", "wonderland")
+    assert ldap_auth.authenticate("alice", "wrong") is None
+    assert ldap_auth.authenticate("alice", "wonderland")
+
+    assert directory.searches == ["(uid=alice)"]
+    assert ldap_auth.cache.stats()["hits"] == 2
+
+@pytest.mark.parametrize("username, password", [("alice", ""), ("", "wonderland"), ("alice", None)])
+def test_empty_credentials_are_rejected_without_a_bind(directory, username, password):
+    ldap_auth = authenticator(directory)
+
+    assert ldap_auth.authenticate(username, password) is None
+    assert directory.binds == []
+
+def test_unknown_users_and_filter_injection_are_rejected(directory):
+    ldap_auth = authenticator(directory)
+
+    assert ldap_auth.authenticate("bob", "secret") is None
+    assert ldap_auth.authenticate("*)(uid=*", "secret") is None
+    assert directory.searches == ["(uid=bob)", "(uid=\\2a\\29\\28uid=\\2a)"]
+
+def test_direct_bind_builds_an_escaped_dn(directory):
+    ldap_auth = authenticator(directory, search=False)
+    directory.passwords["uid=a\\,b,ou=people,dc=example,dc=org"] = "secret"
+
+    assert ldap_auth.authenticate("alice", "wonderland") == {"username": "alice", "dn": ALICE_DN}
+    assert ldap_auth.authenticate("a,b", "secret")["dn"] == "uid=a\\,b,ou=people,dc=example,dc=org"
+    assert directory.searches == []
+
+@pytest.fixture
+def ldap_app(directory, monkeypatch):
+    monkeypatch.setattr(auth.tokens, "JWT_SECRET_KEY", "a-test-secret-that-is-at-least-32-bytes")
+    app = FastAPI()
+    app.include_router(router, prefix="/auth")
+    app.state.ldap_authenticator = authenticator(directory, size=1, timeout=0.05)
+    app.state.ldap_executor = BlockingExecutor("ldap", timeout=5)
+    return app
+
+def test_token_endpoint_issues_a_token_or_401(ldap_app):
+    with TestClient(ldap_app) as http:
+        ok = http.post("/auth/token", data={"username": "alice", "password": "wonderland"})
+        denied = http.post("/auth/token", data={"username": "alice", "password": "wrong"})
+
+    assert ok.status_code == 200
+    assert ok.json()["token_type"] == "bearer"
+    assert denied.status_code == 401
+
+def test_token_endpoint_returns_503_when_the_pool_is_exhausted(ldap_app):
+    with TestClient(ldap_app) as http:
+        with ldap_app.state.ldap_authenticator.bind_pool.connection():
+            response = http.post("/auth/token", data={"username": "alice", "password": "wonderland"})
+
+    assert response.status_code == 503
@@ -0,0 +1,151 @@
+import asyncio
+import time
+from typing import Dict, Any, List
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from services.prometheus import PrometheusClient, PrometheusError
+
+# Five seconds into a 30 second step window
+NOW = 1000000025.0
+ALIGNED = 1000000020.0
+
+NODE_CPU = [
+    {"metric": {"node": "worker-1"}, "value": [ALIGNED, "0.25"]},
+    {"metric": {"node": "worker-2"}, "value": [ALIGNED, "0.5"]},
+    {"metric": {"node": "master-0"}, "value": [ALIGNED, "0.75"]},
+]
+
+class StubPrometheus:
+    """httpx handler answering every query with result and recording the requests"""
+
+    def __init__(self, result: List[Dict[str, Any]], delay: float = 0, body: Dict[str, Any] = None):
+        self.result = result
+        self.delay = delay
+        self.body = body
+        self.requests: List[Dict[str, Any]] = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        form = {key: values[0] for key, values in parse_qs(request.content.decode()).items()}
+        self.requests.append({"method": request.method, "path": request.url.path, "auth": request.headers.get("Authorization"), **form})
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return httpx.Response(200, json=self.body or {"status": "success", "data": {"resultType": "vector", "result": self.result}})
+
+@pytest.fixture(autouse=True)
+def frozen_time(monkeypatch):
+    monkeypatch.setattr(time, "time", lambda: NOW)
+
+def run(stub: StubPrometheus, test, **kwargs):
+    """Run test(client) against a PrometheusClient talking to stub"""
+    async def main():
+        kwargs.setdefault("token_path", None)
+        client = PrometheusClient("http://prometheus.test", transport=httpx.MockTransport(stub), **kwargs)
+        try:
+            return await test(client)
+        finally:
+            await client.close()
+    return asyncio.run(main())
+
+def test_one_post_serves_every_node():
+    stub = StubPrometheus(NODE_CPU)
+
+    result = run(stub, lambda client: client.query_by_label("sum by (node) (cpu)", "node"))
+
+    assert result == {"worker-1": 0.25, "worker-2": 0.5, "master-0": 0.75}
+    assert [(request["method"], request["path"], request["query"]) for request in stub.requests] == [
+        ("POST", "/api/v1/query", "sum by (node) (cpu)"),
+    ]
+
+def test_label_values_restrict_the_shared_result():
+    stub = StubPrometheus(NODE_CPU)
+
+    async def test(client):
+        return (
+            await client.query_by_label("sum by (node) (cpu)", "node", ["worker-2", "missing"]),
+            await client.query_by_label("sum by (node) (cpu)", "node", ["master-0"]),
+        )
+
+    assert run(stub, test) == ({"worker-2": 0.5}, {"master-0": 0.75})
+    assert len(stub.requests) == 1
+
+def test_evaluation_times_are_aligned_to_the_step():
+    stub = StubPrometheus([])
+
+    async def test(client):
+        await client.query("up", at=NOW + 4)
+        await client.query_range("up", start=NOW - 3600, end=NOW, step=60)
+
+    run(stub, test)
+
+    instant, matrix = stub.requests
+    assert float(instant["time"]) == ALIGNED
+    assert (float(matrix["start"]), float(matrix["end"]), float(matrix["step"])) == (999996420, 1000000020, 60)
+
+def test_results_are_cached_until_the_window_ends():
+    stub = StubPrometheus(NODE_CPU)
+
+    async def test(client):
+        first = await client.query("up")
+        second = await client.query("up", at=NOW + 10)
+        next_window = await client.query("up", at=NOW + 30)
+        return first, second, next_window, client.cache.stats()
+
+    first, second, next_window, stats = run(stub, test)
+
+    assert first is second
+    assert next_window == first
+    assert len(stub.requests) == 2
+    assert stats["hits"] == 1
+
+def test_concurrent_identical_queries_share_one_request():
+    stub = StubPrometheus(NODE_CPU, delay=0.05)
+
+    async def test(client):
+        results = await asyncio.gather(*(client.query("up") for _ in range(5)), client.query("down"))
+        return results, client._flight.stats()
+
+    results, flight = run(stub, test)
+
+    assert all(result == NODE_CPU for result in results)
+    assert sorted(request["query"] for request in stub.requests) == ["down", "up"]
+    assert (flight["issued"], flight["coalesced"]) == (2, 4)
+
+def test_a_cancelled_caller_does_not_abort_the_shared_request():
+    stub = StubPrometheus(NODE_CPU, delay=0.05)
+
+    async def test(client):
+        first = asyncio.ensure_future(client.query("up"))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(client.query("up"))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second, await client.query("up")
+
+    second, cached = run(stub, test)
+
+    assert second == cached == NODE_CPU
+    assert len(stub.requests) == 1
+
+def test_failed_queries_raise_and_are_not_cached():
+    stub = StubPrometheus([], body={"status": "error", "errorType": "bad_data", "error": "parse error"})
+
+    async def test(client):
+        for _ in range(2):
+            with pytest.raises(PrometheusError, match="parse error"):
+                await client.query("sum(")
+
+    run(stub, test)
+
+    assert len(stub.requests) == 2
+
+def test_the_bearer_token_is_read_from_the_token_file(tmp_path):
+    token = tmp_path / "token"
+    token.write_text("secret\n")
+    stub = StubPrometheus([])
+
+    run(stub, lambda client: client.query("up"), token_path=str(token))
+
+    assert stub.requests[0]["auth"] == "Bearer secret"
@@ -0,0 +1,56 @@
+import asyncio
+import json
+from typing import List
+
+import pytest
+from fastapi import Response
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+import utils.responses
+from api.routes import NamespaceInfo, Resource
+from utils.responses import FastJSONResponse, fast_json
+
+NAMESPACES = [
+    {"name": "default", "status": "Active", "labels": {"kubernetes.io/metadata.name": "default"}, "annotations": None},
+    {"name": "prod-é", "status": "Terminating", "labels": None, "annotations": {"openshift.io/requester": "alice"}},
+]
+
+@pytest.fixture(params=["orjson", "json"])
+def encoder(request, monkeypatch):
+    """Run a test with orjson and with the stdlib fallback"""
+    if request.param == "orjson":
+        if utils.responses.orjson is None:
+            pytest.skip("orjson is not installed")
+    else:
+        monkeypatch.setattr(utils.responses, "orjson", None)
+    return request.param
+
+def test_body_matches_the_response_model_serialisation(encoder):
+    field = create_response_field(name="response_namespaces", type_=List[NamespaceInfo])
+    validated = asyncio.run(serialize_response(field=field, response_content=NAMESPACES))
+
+    assert json.loads(FastJSONResponse(NAMESPACES).body) == validated
+
+def test_body_is_compact_utf8(encoder):
+    body = FastJSONResponse({"name": "prod-é", "items": [1, 2]}).body
+
+    assert body == '{"name":"prod-é","items":[1,2]}'.encode("utf-8")
+
+def test_fast_json_keeps_the_injected_response_headers():
+    response = Response()
+    response.headers["ETag"] = '"abc"'
+    response.headers["X-Continue-Token"] = "next"
+
+    result = fast_json(NAMESPACES, response)
+
+    assert result.headers["etag"] == '"abc"'
+    assert result.headers["x-continue-token"] == "next"
+    assert result.media_type == "application/json"
+
+def test_fast_json_projects_onto_the_model_fields():
+    resource = {"kind": "Pod", "apiVersion": "v1", "metadata": {"name": "a"}, "spec": {}, "unexpected": True}
+
+    result = fast_json(resource, Response(), Resource)
+
+    assert json.loads(result.body) == {"kind": "Pod", "apiVersion": "v1", "metadata": {"name": "a"}, "spec": {}, "status": None}
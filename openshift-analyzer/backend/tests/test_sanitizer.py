@@ -0,0 +1,82 @@
+import copy
+
+import pytest
+
+from services.sanitizer import Sanitizer, WILDCARD, parse_path
+
+def test_parse_path_splits_on_dots():
+    assert parse_path("metadata.annotations") == ["metadata", "annotations"]
+
+def test_parse_path_escaped_dots_stay_in_the_key():
+    assert parse_path("metadata.annotations.kubectl\\.kubernetes\\.io/last-applied-configuration") == [
+        "metadata",
+        "annotations",
+        "kubectl.kubernetes.io/last-applied-configuration",
+    ]
+
+def test_parse_path_wildcards_and_list_indexes():
+    assert parse_path("spec.containers[*].env[0].*") == ["spec", "containers", WILDCARD, "env", 0, WILDCARD]
+
+def test_parse_path_escaped_star_is_a_literal_key():
+    assert parse_path("data.\\*") == ["data", "*"]
+
+@pytest.mark.parametrize("path", ["", "metadata\\", "spec.containers[0", "spec.containers[name]"])
+def test_parse_path_rejects_malformed_paths(path):
+    with pytest.raises(ValueError):
+        parse_path(path)
+
+def test_default_fields_are_stripped():
+    resource = {
+        "apiVersion": "v1",
+        "kind": "ConfigMap",
+        "metadata": {
+            "name": "example",
+            "uid": "1234",
+            "resourceVersion": "5",
+            "managedFields": [{"manager": "kubectl"}],
+            "annotations": {"kubectl.kubernetes.io/last-applied-configuration": "{}", "team": "a"},
+        },
+        "data": {"key": "value"},
+        "status": {"phase": "Active"},
+    }
+
+    assert Sanitizer().sanitize(resource) == {
+        "apiVersion": "v1",
+        "kind": "ConfigMap",
+        "metadata": {"name": "example", "annotations": {"team": "a"}},
+        "data": {"key": "value"},
+    }
+
+def test_wildcards_and_list_indexes_are_matched():
+    sanitizer = Sanitizer(["spec.containers[*].image", "spec.volumes[1]", "metadata.labels.*"])
+    resource = {
+        "metadata": {"name": "pod", "labels": {"app": "web", "tier": "front"}},
+        "spec": {
+            "containers": [{"name": "app", "image": "app:1"}, {"name": "proxy", "image": "proxy:2"}],
+            "volumes": [{"name": "a"}, {"name": "b"}, {"name": "c"}],
+        },
+    }
+
+    assert sanitizer.sanitize(resource) == {
+        "metadata": {"name": "pod", "labels": {}},
+        "spec": {
+            "containers": [{"name": "app"}, {"name": "proxy"}],
+            "volumes": [{"name": "a"}, {"name": "c"}],
+        },
+    }
+
+def test_exact_keys_also_follow_the_wildcard_branch():
+    # "a.b" is explicit, "*.c" comes from the wildcard: both apply under "a"
+    sanitizer = Sanitizer(["*.c", "a.b"])
+
+    assert sanitizer.sanitize({"a": {"b": 1, "c": 2, "d": 3}, "x": {"c": 4, "d": 5}}) == {"a": {"d": 3}, "x": {"d": 5}}
+
+def test_input_is_not_modified_and_untouched_subtrees_are_shared():
+    resource = {"metadata": {"name": "a", "uid": "1"}, "spec": {"replicas": 3, "template": {"spec": {}}}}
+    original = copy.deepcopy(resource)
+
+    result = Sanitizer().sanitize(resource)
+
+    assert resource == original
+    assert result["metadata"] is not resource["metadata"]
+    assert result["spec"] is resource["spec"]
@@ -0,0 +1,59 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from conftest import BACKEND_DIR
+
+# Upper bounds for a cold start against a local apiserver, medians of RUNS
+# fresh interpreters; the shared CI runners are several times slower than
+# a workstation, where import takes about 0.9s and ready about 1.1s
+IMPORT_BUDGET = 3.0
+SERVING_BUDGET = 4.0
+READY_BUDGET = 10.0
+RUNS = 3
+
+STARTUP_PROBE = """
+import json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    serving = time.perf_counter()
+    live = client.get("/health/live").status_code
+    while client.get("/health/ready").status_code != 200:
+        time.sleep(0.01)
+    ready = time.perf_counter()
+    warmup = client.get("/health/ready").json()["warmup"]
+print(json.dumps({"import": imported - started, "serving": serving - started, "ready": ready - started, "live": live, "warmup": warmup}))
+"""
+
+def probe_startup(config_path: str) -> dict:
+    """Start the app in a fresh interpreter and return its start-up timings"""
+    output = subprocess.run(
+        [sys.executable, "-c", STARTUP_PROBE],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "CONFIG_PATH": config_path, "PYTHONPATH": BACKEND_DIR},
+        capture_output=True,
+        text=True,
+        timeout=60,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def test_startup_within_budget(app_config):
+    results = [probe_startup(app_config) for _ in range(RUNS)]
+    timings = {phase: statistics.median(result[phase] for result in results) for phase in ("import", "serving", "ready")}
+
+    assert timings["import"] < IMPORT_BUDGET, timings
+    assert timings["serving"] < SERVING_BUDGET, timings
+    assert timings["ready"] < READY_BUDGET, timings
+
+def test_liveness_answers_before_warm_up(app_config):
+    result = probe_startup(app_config)
+
+    assert result["live"] == 200
+    assert result["warmup"]["discovery"] == "ready"
+    assert result["warmup"]["informers"] == "ready"
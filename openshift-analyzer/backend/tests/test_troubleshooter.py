@@ -0,0 +1,159 @@
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+
+import pytest
+
+from services.troubleshooter import EventRecord, EventStore, compile_rules
+
+def timestamp(ago: float) -> str:
+    return datetime.fromtimestamp(time.time() - ago, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def event(
+    uid: str,
+    reason: str,
+    message: str = "",
+    kind: str = "Pod",
+    name: str = "web-1",
+    object_uid: Optional[str] = None,
+    namespace: str = "demo",
+    count: int = 1,
+    ago: float = 60,
+) -> Dict[str, Any]:
+    return {
+        "metadata": {"uid": uid, "namespace": namespace, "name": uid},
+        "involvedObject": {"kind": kind, "namespace": namespace, "name": name, "uid": object_uid or f"{name}-uid"},
+        "reason": reason,
+        "message": message,
+        "count": count,
+        "type": "Warning",
+        "firstTimestamp": timestamp(ago + 600),
+        "lastTimestamp": timestamp(ago),
+    }
+
+def test_event_record_prefers_series_count_and_falls_back_to_event_time():
+    record = EventRecord({
+        "metadata": {"uid": "e1", "namespace": "demo"},
+        "involvedObject": {"kind": "Pod", "namespace": "demo", "name": "web-1"},
+        "reason": "BackOff",
+        "series": {"count": 7, "lastObservedTime": "2026-01-01T00:10:00Z"},
+        "eventTime": "2026-01-01T00:00:00Z",
+    })
+
+    assert record.count == 7
+    assert record.first_seen == datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp()
+    assert record.last_seen == datetime(2026, 1, 1, 0, 10, tzinfo=timezone.utc).timestamp()
+    assert record.object_uid == "Pod/demo/web-1"
+
+def test_store_indexes_by_object_namespace_and_reason():
+    store = EventStore()
+    store.replace([
+        event("e1", "BackOff", object_uid="pod-a"),
+        event("e2", "Unhealthy", object_uid="pod-a"),
+        event("e3", "BackOff", object_uid="pod-b", namespace="other"),
+    ])
+
+    assert {record.uid for record in store.for_objects(["pod-a"])} == {"e1", "e2"}
+    assert {record.uid for record in store.for_namespace("demo")} == {"e1", "e2"}
+    assert [record.uid for record in store.for_namespace("demo", reason="BackOff")] == ["e1"]
+    assert [record.uid for record in store.for_namespace("other", reason="BackOff")] == ["e3"]
+
+def test_store_upsert_moves_an_updated_event_between_indexes():
+    store = EventStore()
+    store.upsert(event("e1", "BackOff"))
+    store.upsert(event("e1", "Unhealthy"))
+
+    assert len(store) == 1
+    assert store.for_namespace("demo", reason="BackOff") == []
+    assert [record.reason for record in store.for_namespace("demo", reason="Unhealthy")] == ["Unhealthy"]
+
+def test_store_evicts_the_least_recently_updated_events():
+    store = EventStore(max_events=2)
+    # Listed newest first; replace() adds oldest first so the newest survive
+    store.replace([event("new", "BackOff", ago=10), event("old", "BackOff", object_uid="gone", ago=500), event("mid", "BackOff", ago=100)])
+
+    assert {record.uid for record in store.for_namespace("demo")} == {"new", "mid"}
+    assert store.for_objects(["gone"]) == []
+    assert store.stats()["evicted"] == 1
+
+def test_store_keeps_events_deleted_by_the_apiserver():
+    store = EventStore()
+    store.upsert(event("e1", "BackOff"))
+    store.delete(event("e1", "BackOff"))
+
+    assert len(store) == 1
+
+def evaluate(*events, since: Optional[float] = None, rules=None):
+    return (rules or compile_rules()).evaluate([EventRecord(item) for item in events], since=since)
+
+def test_matching_events_of_one_object_are_aggregated():
+    earlier = event("e1", "BackOff", "Back-off restarting failed container app", count=3, ago=300)
+    latest = event("e2", "BackOff", "Back-off restarting failed container app", count=4, ago=10)
+
+    findings = evaluate(earlier, latest)
+
+    assert len(findings) == 1
+    assert findings[0]["rule"] == "CrashLoopBackOff"
+    assert findings[0]["count"] == 7
+    assert findings[0]["first_seen"] == earlier["firstTimestamp"]
+    assert findings[0]["last_seen"] == latest["lastTimestamp"]
+
+def test_message_patterns_separate_rules_sharing_a_reason():
+    findings = evaluate(
+        event("e1", "BackOff", "Back-off restarting failed container app", name="crashing"),
+        event("e2", "BackOff", "Back-off pulling image \"registry/app:1\"", name="pulling"),
+        event("e3", "BackOff", "Something else backed off", name="unrelated"),
+    )
+
+    assert {(finding["rule"], finding["object"]["name"]) for finding in findings} == {
+        ("CrashLoopBackOff", "crashing"),
+        ("ImagePullBackOff", "pulling"),
+    }
+
+def test_min_count_and_kinds_are_enforced():
+    probe = "Readiness probe failed: connection refused"
+
+    assert evaluate(event("e1", "Unhealthy", probe, count=2)) == []
+    assert [finding["rule"] for finding in evaluate(event("e1", "Unhealthy", probe, count=3))] == ["ProbeFailure"]
+    # FailedScheduling is only reported for pods
+    assert evaluate(event("e1", "FailedScheduling", kind="Job")) == []
+
+def test_events_outside_the_window_are_ignored():
+    findings = evaluate(
+        event("e1", "FailedScheduling", ago=7200),
+        since=time.time() - 3600,
+    )
+
+    assert findings == []
+
+def test_findings_are_ordered_by_severity_then_recency():
+    findings = evaluate(
+        event("e1", "FailedScheduling", name="pending", ago=5),
+        event("e2", "Failed", "Error: ErrImagePull", name="old-pull", ago=600),
+        event("e3", "Failed", "Error: ErrImagePull", name="new-pull", ago=30),
+    )
+
+    assert [finding["object"]["name"] for finding in findings] == ["new-pull", "old-pull", "pending"]
+
+def test_configured_rules_replace_built_in_rules_by_name():
+    rules = compile_rules([
+        {"name": "ProbeFailure", "reasons": ["Unhealthy"], "min_count": 1, "severity": "critical"},
+        {"name": "OOMKilled", "reasons": ["OOMKilling"], "kinds": ["Node"]},
+    ])
+
+    assert len(rules.rules) == 7
+    findings = evaluate(
+        event("e1", "Unhealthy", "Liveness probe failed"),
+        event("e2", "OOMKilling", "Memory cgroup out of memory", kind="Node", name="worker-1", namespace=""),
+        rules=rules,
+    )
+    assert [(finding["rule"], finding["severity"]) for finding in findings] == [("ProbeFailure", "critical"), ("OOMKilled", "warning")]
+
+@pytest.mark.parametrize("config", [
+    {"reasons": ["BackOff"]},
+    {"name": "NoReasons"},
+    {"name": "BadPattern", "reasons": ["BackOff"], "message": "("},
+])
+def test_invalid_rules_are_rejected(config):
+    with pytest.raises(ValueError):
+        compile_rules([config])
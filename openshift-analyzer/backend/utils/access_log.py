@@ -0,0 +1,164 @@
+import json
+import logging
+import queue
+import random
+import sys
+import time
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Any, Optional, List
+
+ACCESS_LOGGER = "openshift-analyzer.access"
+
+# Time spent in upstream calls (apiserver, Prometheus, auth backends) by the current request
+_upstream: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("upstream_timings", default=None)
+
+def record_upstream(name: str, seconds: float):
+    """
+    Add one upstream call to the timings of the request being served, if any
+
+    Calls made outside a request (informers, background refreshes) are ignored.
+    """
+    timings = _upstream.get()
+    if timings is not None:
+        entry = timings.get(name)
+        if entry is None:
+            timings[name] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line; access records carry their fields in record.access
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        access = getattr(record, "access", None)
+        if access is not None:
+            entry.update(access)
+        else:
+            entry["message"] = record.getMessage()
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class _PassthroughQueueHandler(QueueHandler):
+    # The default prepare() formats the message in the calling thread;
+    # access records are immutable, so formatting is left to the listener
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+def configure_access_logger(stream=None) -> QueueListener:
+    """
+    Route the access logger through a queue to a JSON handler on its own thread
+
+    Returns:
+        The listener, which must be started and stopped by the caller
+    """
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JsonFormatter())
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    access_logger = logging.getLogger(ACCESS_LOGGER)
+    access_logger.handlers = [_PassthroughQueueHandler(records)]
+    access_logger.setLevel(logging.INFO)
+    access_logger.propagate = False
+    return QueueListener(records, handler)
+
+def _path_matches(path: str, prefix: str) -> bool:
+    return path == prefix or path.startswith(prefix.rstrip("/") + "/")
+
+class AccessLogMiddleware:
+    """
+    ASGI middleware writing one structured access log record per sampled request
+
+    Excluded paths (probes and /metrics by default) bypass the middleware
+    entirely. Other requests are sampled at the rate of the longest
+    matching prefix in sample_rates, falling back to default_sample_rate;
+    server errors and requests slower than slow_threshold are always logged.
+
+    Args:
+        exclude_paths: Path prefixes that are never logged
+        sample_rates: Path prefix to fraction of requests logged
+        default_sample_rate: Fraction of other requests logged
+        slow_threshold: Seconds after which a request is logged regardless of sampling
+    """
+
+    def __init__(
+        self,
+        app,
+        exclude_paths: Optional[List[str]] = None,
+        sample_rates: Optional[Dict[str, float]] = None,
+        default_sample_rate: float = 1.0,
+        slow_threshold: float = 5.0,
+    ):
+        self.app = app
+        self.exclude_paths = list(exclude_paths or [])
+        # Longest prefix first so the most specific rate wins
+        self.sample_rates = sorted((sample_rates or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self.default_sample_rate = default_sample_rate
+        self.slow_threshold = slow_threshold
+        self.logger = logging.getLogger(ACCESS_LOGGER)
+
+    def _sample_rate(self, path: str) -> float:
+        for prefix, rate in self.sample_rates:
+            if _path_matches(path, prefix):
+                return rate
+        return self.default_sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if any(_path_matches(path, prefix) for prefix in self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        rate = self._sample_rate(path)
+        sampled = rate >= 1.0 or random.random() < rate
+
+        status = 500
+        sent = 0
+
+        async def send_wrapper(message):
+            nonlocal status, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        timings: Dict[str, List[float]] = {}
+        token = _upstream.set(timings)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            _upstream.reset(token)
+            if sampled or status >= 500 or duration >= self.slow_threshold:
+                route = scope.get("route")
+                client = scope.get("client")
+                self.logger.info("access", extra={"access": {
+                    "method": scope["method"],
+                    "path": path,
+                    "route": getattr(route, "path", None),
+                    "query": scope.get("query_string", b"").decode("latin-1") or None,
+                    "status": status,
+                    "duration_ms": round(duration * 1000, 3),
+                    "bytes": sent,
+                    "client": client[0] if client else None,
+                    "sample_rate": rate,
+                    "upstream": {
+                        name: {"calls": int(calls), "ms": round(seconds * 1000, 3)}
+                        for name, (calls, seconds) in timings.items()
+                    },
+                }})
@@ -1,7 +1,10 @@
 import os
 import yaml
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Mapping, List, Callable, Tuple
+from pydantic import BaseModel, Field
 
 logger = logging.getLogger("openshift-analyzer")
 
@@ -67,7 +70,219 @@ def get_feature_config(feature_name: str, config: Optional[Dict[str, Any]] = Non
         Feature configuration dictionary
     """
     if config is None:
-        config_path = os.environ.get("CONFIG_PATH", "/app/config/config.yaml")
-        config = load_config(config_path)
+        return get_settings().feature(feature_name)
     
-    return config.get("features", {}).get(feature_name, {}) 
\ No newline at end of file
+    return config.get("features", {}).get(feature_name, {})
+
+CONFIG_PATH = os.environ.get("CONFIG_PATH", "/app/config/config.yaml")
+
+def freeze(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+class Section(Mapping):
+    """
+    Read-only configuration section, validated into a recursively frozen mapping
+    """
+
+    @classmethod
+    def __get_validators__(cls):
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, value: Any) -> Mapping[str, Any]:
+        if value is None:
+            value = {}
+        if not isinstance(value, Mapping):
+            raise TypeError("must be a mapping")
+        return freeze(value)
+
+class FrozenModel(BaseModel):
+    class Config:
+        allow_mutation = False
+
+class AppSettings(FrozenModel):
+    name: str = "OpenShift Analyzer"
+    version: str = "1.0.0"
+    description: str = "OpenShift resource analysis tool"
+
+class ServerSettings(FrozenModel):
+    host: str = "0.0.0.0"
+    port: int = 8080
+    debug: bool = False
+    cors: Section = Field(default_factory=dict)
+    config_reload: Section = Field(default_factory=dict)
+    fast_json: bool = False
+
+class AuthSettings(FrozenModel):
+    enabled: bool = False
+    type: str = "none"
+    oauth: Section = Field(default_factory=dict)
+    jwt: Section = Field(default_factory=dict)
+    sessions: Section = Field(default_factory=dict)
+    ldap: Section = Field(default_factory=dict)
+
+class Settings(FrozenModel):
+    """
+    Application configuration, parsed and env-expanded once and immutable afterwards
+
+    The top-level sections the application branches on are typed; the
+    others are read-only mappings handed to the components they configure.
+    A reload replaces the whole object instead of mutating it, so a request
+    always sees one consistent configuration.
+    """
+
+    app: AppSettings = Field(default_factory=AppSettings)
+    server: ServerSettings = Field(default_factory=ServerSettings)
+    auth: AuthSettings = Field(default_factory=AuthSettings)
+    kubernetes: Section = Field(default_factory=dict)
+    http: Section = Field(default_factory=dict)
+    prometheus: Section = Field(default_factory=dict)
+    metrics: Section = Field(default_factory=dict)
+    access_log: Section = Field(default_factory=dict)
+    features: Section = Field(default_factory=dict)
+    plugins: Section = Field(default_factory=dict)
+
+    @classmethod
+    def load(cls, config_path: str) -> "Settings":
+        """
+        Parse a YAML configuration file
+
+        Raises:
+            OSError: If the file cannot be read
+            yaml.YAMLError: If the file is not valid YAML
+            pydantic.ValidationError: If a setting has the wrong type
+        """
+        with open(config_path, 'r') as f:
+            config = yaml.safe_load(f) or {}
+        return cls.parse_obj(process_env_vars(config))
+
+    def feature(self, feature_name: str) -> Mapping[str, Any]:
+        """Configuration of one entry of the features section"""
+        return self.features.get(feature_name, freeze({}))
+
+_settings: Optional[Settings] = None
+_listeners: List[Callable[[Settings, Settings], None]] = []
+
+def get_settings() -> Settings:
+    """
+    Current settings, loaded from CONFIG_PATH on first use
+
+    Also usable as a FastAPI dependency; after a hot reload it returns the
+    new settings. A missing or invalid file yields the defaults.
+    """
+    global _settings
+    if _settings is None:
+        try:
+            _settings = Settings.load(CONFIG_PATH)
+            logger.info(f"Configuration loaded from {CONFIG_PATH}")
+        except FileNotFoundError:
+            logger.warning(f"Configuration file not found: {CONFIG_PATH}")
+            _settings = Settings()
+        except Exception as e:
+            logger.error(f"Failed to load configuration: {e}")
+            _settings = Settings()
+    return _settings
+
+def on_settings_change(listener: Callable[[Settings, Settings], None]):
+    """Call listener(old, new) whenever the settings are reloaded"""
+    _listeners.append(listener)
+
+def replace_settings(settings: Settings):
+    """Install new settings and notify the listeners"""
+    global _settings
+    old, _settings = get_settings(), settings
+    for listener in list(_listeners):
+        try:
+            listener(old, settings)
+        except Exception as e:
+            logger.error(f"Settings change listener failed: {e}")
+
+def changed_sections(old: Settings, new: Settings) -> List[str]:
+    """Names of the top-level sections that differ between two settings"""
+    return [name for name in Settings.__fields__ if getattr(old, name) != getattr(new, name)]
+
+class SettingsWatcher:
+    """
+    Reloads the settings when the configuration file changes
+
+    Kubernetes updates a mounted ConfigMap by atomically swapping a
+    symlink in the mount directory, so the directory is watched (with
+    inotify through watchfiles when installed, otherwise by polling) and
+    the resolved file is compared by inode, size and mtime. A file that
+    fails to parse or validate is logged and the current settings kept.
+
+    Args:
+        config_path: Configuration file to watch
+        poll_interval: Seconds between checks when watchfiles is not installed
+    """
+
+    def __init__(self, config_path: str = CONFIG_PATH, poll_interval: float = 10):
+        self.config_path = config_path
+        self.poll_interval = poll_interval
+        self._signature = self._stat()
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            await self._task
+
+    async def check(self) -> bool:
+        """
+        Reload the settings if the file changed
+
+        Returns:
+            Whether new settings were installed
+        """
+        signature = self._stat()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+
+        try:
+            settings = await asyncio.to_thread(Settings.load, self.config_path)
+        except Exception as e:
+            logger.error(f"Ignoring invalid configuration change in {self.config_path}: {e}")
+            return False
+
+        old = get_settings()
+        if settings == old:
+            return False
+        replace_settings(settings)
+        logger.info(f"Configuration reloaded, changed sections: {', '.join(changed_sections(old, settings))}")
+        return True
+
+    async def _run(self):
+        try:
+            from watchfiles import awatch
+        except ImportError:
+            awatch = None
+
+        try:
+            if awatch is not None:
+                async for _ in awatch(os.path.dirname(os.path.abspath(self.config_path)), stop_event=self._stop):
+                    await self.check()
+            else:
+                while not self._stop.is_set():
+                    try:
+                        await asyncio.wait_for(self._stop.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        await self.check()
+        except Exception as e:
+            logger.error(f"Configuration watcher stopped: {e}")
+
+    def _stat(self) -> Optional[Tuple[int, int, float]]:
+        try:
+            stat = os.stat(self.config_path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime
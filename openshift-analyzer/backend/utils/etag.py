@@ -0,0 +1,56 @@
+import hashlib
+from typing import Optional
+from fastapi import Response
+
+# Clients must revalidate before reusing a stored response; private because
+# responses depend on the user's session
+CACHE_CONTROL = "private, no-cache"
+
+def make_etag(*parts: Optional[str]) -> Optional[str]:
+    """
+    Build a strong ETag from the parts identifying a representation
+
+    The parts are typically a resourceVersion and whatever else changes the
+    response body for the same URL (e.g. sanitize). resourceVersions are
+    opaque to clients, so they are hashed rather than exposed verbatim.
+
+    Returns:
+        The quoted ETag, or None if any part is missing
+    """
+    if any(part is None for part in parts):
+        return None
+    digest = hashlib.blake2b("\0".join(str(part) for part in parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """
+    Evaluate an If-None-Match header against the current ETag
+
+    Uses the weak comparison required for If-None-Match, so tags weakened
+    by a compressing proxy (W/"...") still match.
+    """
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def not_modified(etag: str) -> Response:
+    """
+    An empty 304 response carrying the current ETag
+    """
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+def set_etag(response: Response, etag: Optional[str]):
+    """
+    Attach the ETag and revalidation headers to a 200 response
+    """
+    if etag:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
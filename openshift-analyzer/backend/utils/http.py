@@ -0,0 +1,44 @@
+import importlib.util
+import logging
+import httpx
+from typing import Dict, Any
+
+logger = logging.getLogger("openshift-analyzer")
+
+def create_http_client(http_config: Dict[str, Any]) -> httpx.AsyncClient:
+    """
+    Create the application-wide client for outbound HTTP calls (OAuth server, user API)
+
+    Connections are pooled and kept alive between requests, so a login
+    reuses the TCP and TLS session of the previous one. HTTP/2 is used when
+    the h2 package is installed, multiplexing concurrent calls to the same
+    host over one connection.
+
+    Args:
+        http_config: The http section of the configuration
+
+    Returns:
+        A client that must be closed with aclose() on shutdown
+    """
+    http2 = bool(http_config.get("http2", True))
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.info("h2 is not installed, outbound HTTP uses HTTP/1.1")
+        http2 = False
+
+    timeout_config = http_config.get("timeout", {})
+    timeout = httpx.Timeout(
+        float(timeout_config.get("read", 15)),
+        connect=float(timeout_config.get("connect", 5)),
+        pool=float(timeout_config.get("pool", 5)),
+    )
+    limits = httpx.Limits(
+        max_connections=int(http_config.get("max_connections", 20)),
+        max_keepalive_connections=int(http_config.get("max_keepalive_connections", 10)),
+        keepalive_expiry=float(http_config.get("keepalive_expiry", 60)),
+    )
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=timeout,
+        limits=limits,
+        verify=http_config.get("ca_path") or True,
+    )
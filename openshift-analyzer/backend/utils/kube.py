@@ -0,0 +1,169 @@
+import logging
+import socket
+import time
+from typing import Dict, Any, Optional, List, Tuple
+from kubernetes import client
+from kubernetes.client.rest import ApiException
+from urllib3.connection import HTTPConnection
+
+from utils.metrics import observe_kube_request
+
+logger = logging.getLogger("openshift-analyzer")
+
+def resource_path(resource_info: Dict[str, str], namespace: Optional[str] = None, name: Optional[str] = None) -> str:
+    """
+    Build the REST path for a resource described by DiscoveryIndex.lookup
+
+    Args:
+        resource_info: API information (group, version, plural)
+        namespace: Optional namespace, omitted for cluster-wide or cluster-scoped requests
+        name: Optional object name
+
+    Returns:
+        Path relative to the apiserver root, e.g. /apis/apps/v1/namespaces/default/deployments
+    """
+    group = resource_info["group"]
+    version = resource_info["version"]
+
+    if group:
+        path = f"/apis/{group}/{version}"
+    else:
+        path = f"/api/{version}"
+
+    if namespace:
+        path += f"/namespaces/{namespace}"
+
+    path += f"/{resource_info['plural']}"
+
+    if name:
+        path += f"/{name}"
+
+    return path
+
+def get_json(
+    api_client: client.ApiClient,
+    path: str,
+    query_params: Optional[List[Tuple[str, Any]]] = None,
+    preload_content: bool = True,
+    _request_timeout: Optional[Any] = None,
+) -> Any:
+    """
+    Issue a GET against the apiserver and return the decoded JSON body
+
+    Args:
+        api_client: Kubernetes API client
+        path: Path returned by resource_path
+        query_params: Optional list of query parameters
+        preload_content: When False the raw urllib3 response is returned (used for watches)
+        _request_timeout: Optional request timeout, named like the generated client APIs
+
+    Returns:
+        Decoded JSON as plain dicts/lists, or the raw response when preload_content is False
+    """
+    return api_client.call_api(
+        path,
+        "GET",
+        query_params=query_params or [],
+        header_params={"Accept": "application/json"},
+        response_type="object",
+        auth_settings=["BearerToken"],
+        _return_http_data_only=True,
+        _preload_content=preload_content,
+        _request_timeout=_request_timeout,
+    )
+
+class InstrumentedApiClient(client.ApiClient):
+    """
+    ApiClient recording latency and errors of every request by verb and group/version/resource
+
+    Every generated API class and get_json funnel through request(), so
+    this covers all apiserver traffic without touching call sites.
+    """
+
+    def request(self, method, url, query_params=None, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = super().request(method, url, query_params, *args, **kwargs)
+        except ApiException as e:
+            observe_kube_request(method, url, query_params, time.perf_counter() - start, e.status)
+            raise
+        except Exception as e:
+            observe_kube_request(method, url, query_params, time.perf_counter() - start, type(e).__name__)
+            raise
+        observe_kube_request(method, url, query_params, time.perf_counter() - start)
+        return response
+
+class ClientManager:
+    """
+    Application-scoped Kubernetes API clients sharing pooled connections
+
+    Request handlers share one ApiClient so TLS sessions and keep-alive
+    connections are reused across requests. Long-running watches get a
+    separate client so they never hold connections needed by request
+    handlers.
+    """
+
+    def __init__(
+        self,
+        pool_maxsize: int = 32,
+        watch_pool_maxsize: int = 16,
+        pool_block: bool = False,
+        keepalive: bool = True,
+        keepalive_idle: int = 60,
+    ):
+        self.pool_maxsize = pool_maxsize
+        self.api_client = self._create_client(pool_maxsize, pool_block, keepalive, keepalive_idle)
+        self.watch_client = self._create_client(watch_pool_maxsize, False, keepalive, keepalive_idle)
+
+    @staticmethod
+    def _create_client(maxsize: int, block: bool, keepalive: bool, keepalive_idle: int) -> client.ApiClient:
+        configuration = client.Configuration.get_default_copy()
+        configuration.connection_pool_maxsize = maxsize
+        api_client = InstrumentedApiClient(configuration)
+
+        # The generated REST client does not expose these urllib3 pool
+        # options, so they are set on the pool manager directly
+        pool_kw = api_client.rest_client.pool_manager.connection_pool_kw
+        pool_kw["block"] = block
+        if keepalive:
+            socket_options = list(HTTPConnection.default_socket_options)
+            socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+            if hasattr(socket, "TCP_KEEPIDLE"):
+                socket_options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, keepalive_idle))
+                socket_options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, keepalive_idle))
+            pool_kw["socket_options"] = socket_options
+
+        return api_client
+
+    @staticmethod
+    def _pool_stats(api_client: client.ApiClient) -> List[Dict[str, Any]]:
+        pool_manager = api_client.rest_client.pool_manager
+        stats = []
+        for key in list(pool_manager.pools.keys()):
+            pool = pool_manager.pools.get(key)
+            if pool is None or pool.pool is None:
+                continue
+            # The pool queue is pre-filled with placeholders, so anything
+            # missing from it is a connection currently checked out
+            maxsize = pool.pool.maxsize
+            in_use = maxsize - pool.pool.qsize()
+            stats.append({
+                "host": f"{pool.scheme}://{pool.host}:{pool.port}",
+                "maxsize": maxsize,
+                "in_use": in_use,
+                "saturation": in_use / maxsize if maxsize else 0.0,
+                "connections_opened": pool.num_connections,
+                "requests": pool.num_requests,
+            })
+        return stats
+
+    def stats(self) -> Dict[str, Any]:
+        """Connection pool usage for request and watch clients"""
+        return {
+            "api": self._pool_stats(self.api_client),
+            "watch": self._pool_stats(self.watch_client),
+        }
+
+    def close(self):
+        for api_client in (self.api_client, self.watch_client):
+            api_client.rest_client.pool_manager.clear()
@@ -0,0 +1,217 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List, Tuple, Callable, Iterator
+from urllib.parse import urlsplit
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from utils.access_log import record_upstream
+
+PREFIX = "openshift_analyzer"
+
+# Request latencies span from cached reads (sub-millisecond) to exports and comparisons (minutes)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+HTTP_REQUEST_DURATION = Histogram(
+    f"{PREFIX}_http_request_duration_seconds",
+    "HTTP request latency by route template, until the response body has been sent",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    f"{PREFIX}_http_requests_in_flight",
+    "HTTP requests currently being served",
+    ["method"],
+)
+KUBE_REQUEST_DURATION = Histogram(
+    f"{PREFIX}_kube_request_duration_seconds",
+    "Kubernetes API request latency by verb and group/version/resource; watches until the response headers",
+    ["verb", "gvr"],
+    buckets=LATENCY_BUCKETS,
+)
+KUBE_REQUEST_ERRORS = Counter(
+    f"{PREFIX}_kube_request_errors_total",
+    "Failed Kubernetes API requests by verb, group/version/resource and status code",
+    ["verb", "gvr", "code"],
+)
+KUBE_READ_CALLS = Counter(
+    f"{PREFIX}_kube_read_calls_total",
+    "Kubernetes API reads requested by handlers, by whether they issued an apiserver call or joined an identical one in flight",
+    ["verb", "gvr", "outcome"],
+)
+AUTH_REQUEST_DURATION = Histogram(
+    f"{PREFIX}_auth_backend_duration_seconds",
+    "Authentication backend latency",
+    ["backend", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+AUTH_REQUEST_ERRORS = Counter(
+    f"{PREFIX}_auth_backend_errors_total",
+    "Authentication backend calls that raised an error",
+    ["backend", "operation"],
+)
+PROMETHEUS_QUERY_DURATION = Histogram(
+    f"{PREFIX}_prometheus_query_duration_seconds",
+    "Prometheus API request latency, cache hits excluded",
+    ["endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Label used for requests that did not match any route, to bound cardinality
+UNMATCHED_ROUTE = "<unmatched>"
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency by route template and in-flight requests
+
+    Routes are labelled with their template (/api/resources/{namespace}/...)
+    rather than the concrete path. Latency includes streaming the body.
+    """
+
+    def __init__(self, app, exclude_paths: Optional[List[str]] = None):
+        self.app = app
+        self.exclude_paths = set(exclude_paths or [])
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            # The router stores the matched route in the shared scope
+            route = scope.get("route")
+            template = getattr(route, "path", None) or UNMATCHED_ROUTE
+            HTTP_REQUEST_DURATION.labels(method, template, str(status)).observe(time.perf_counter() - start)
+
+def kube_request_labels(method: str, url: str, query_params: Optional[List[Tuple[str, Any]]] = None) -> Tuple[str, str]:
+    """
+    Derive (verb, gvr) labels from a Kubernetes API request
+
+    The gvr label is "group/version/resource" ("v1/pods" for the core
+    group), "discovery" for /api and /apis or the first path segment for
+    anything else, so object names and namespaces never become labels.
+    """
+    segments = [segment for segment in urlsplit(url).path.split("/") if segment]
+
+    if segments[:1] == ["api"]:
+        group_version, rest = segments[1:2], segments[2:]
+    elif segments[:1] == ["apis"]:
+        group_version, rest = segments[1:3], segments[3:]
+    else:
+        return method.lower(), segments[0] if segments else "root"
+
+    if not rest:
+        return method.lower(), "discovery"
+
+    # namespaces/<ns>/<resource>[/<name>[/<subresource>]]
+    if rest[0] == "namespaces" and len(rest) >= 3:
+        rest = rest[2:]
+    resource, named = rest[0], len(rest) > 1
+    if len(rest) > 2:
+        resource = f"{resource}/{rest[2]}"
+    gvr = "/".join(group_version + [resource])
+
+    if method == "GET":
+        if named:
+            verb = "get"
+        elif any(key == "watch" and str(value).lower() in ("true", "1") for key, value in query_params or []):
+            verb = "watch"
+        else:
+            verb = "list"
+    else:
+        verb = {"POST": "create", "PUT": "update"}.get(method, method.lower())
+    return verb, gvr
+
+def observe_kube_request(method: str, url: str, query_params: Optional[List[Tuple[str, Any]]], duration: float, code: Optional[Any] = None):
+    """
+    Record one Kubernetes API request; code is set for failed requests
+    """
+    verb, gvr = kube_request_labels(method, url, query_params)
+    KUBE_REQUEST_DURATION.labels(verb, gvr).observe(duration)
+    if code is not None:
+        KUBE_REQUEST_ERRORS.labels(verb, gvr, str(code)).inc()
+
+@contextmanager
+def time_auth(backend: str, operation: str) -> Iterator[None]:
+    """
+    Time a call to an authentication backend, counting it as an error if it raises
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        AUTH_REQUEST_ERRORS.labels(backend, operation).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        AUTH_REQUEST_DURATION.labels(backend, operation).observe(elapsed)
+        record_upstream(backend, elapsed)
+
+class StatsCollector:
+    """
+    Export stats() of caches and executors at scrape time
+
+    Caches and executors already keep their own counters, so they are read
+    when Prometheus scrapes instead of being updated on every access.
+    """
+
+    def __init__(self):
+        self._caches: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._executors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def register_cache(self, name: str, stats: Callable[[], Dict[str, Any]]):
+        self._caches[name] = stats
+
+    def register_executor(self, name: str, stats: Callable[[], Dict[str, Any]]):
+        self._executors[name] = stats
+
+    def collect(self):
+        hits = CounterMetricFamily(f"{PREFIX}_cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily(f"{PREFIX}_cache_misses", "Cache misses", labels=["cache"])
+        ratio = GaugeMetricFamily(f"{PREFIX}_cache_hit_ratio", "Cache hits over lookups since start", labels=["cache"])
+        size = GaugeMetricFamily(f"{PREFIX}_cache_entries", "Entries currently cached", labels=["cache"])
+        for name, stats in list(self._caches.items()):
+            values = stats()
+            hits.add_metric([name], values["hits"])
+            misses.add_metric([name], values["misses"])
+            ratio.add_metric([name], values["hit_ratio"])
+            size.add_metric([name], values["size"])
+        yield from (hits, misses, ratio, size)
+
+        in_flight = GaugeMetricFamily(f"{PREFIX}_executor_in_flight", "Blocking calls running in the executor", labels=["executor"])
+        waiting = GaugeMetricFamily(f"{PREFIX}_executor_waiting", "Blocking calls waiting for an executor slot", labels=["executor"])
+        calls = CounterMetricFamily(f"{PREFIX}_executor_calls", "Finished executor calls by outcome", labels=["executor", "outcome"])
+        for name, stats in list(self._executors.items()):
+            values = stats()
+            in_flight.add_metric([name], values["in_flight"])
+            waiting.add_metric([name], values["waiting"])
+            for outcome in ("completed", "failed", "timed_out"):
+                calls.add_metric([name, outcome], values[outcome])
+        yield from (in_flight, waiting, calls)
+
+STATS_COLLECTOR = StatsCollector()
+REGISTRY.register(STATS_COLLECTOR)
+
+def latest() -> Tuple[bytes, str]:
+    """
+    Render every registered metric in the Prometheus text format
+
+    Returns:
+        (body, content type)
+    """
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,115 @@
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable
+
+from utils.access_log import record_upstream
+
+logger = logging.getLogger("openshift-analyzer")
+
+class BlockingExecutor:
+    """
+    Bounded thread pool for running blocking client calls off the event loop
+
+    At most max_concurrency calls run at once; further callers wait on a
+    semaphore instead of piling up in the pool queue. Every call is bounded
+    by a timeout, which is also passed to the client call itself through
+    timeout_kwarg so the worker thread is not left blocked on a dead socket.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int = 32,
+        timeout: Optional[float] = 30,
+        timeout_kwarg: Optional[str] = None,
+        slow_call_threshold: float = 5.0,
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.timeout_kwarg = timeout_kwarg
+        self.slow_call_threshold = slow_call_threshold
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=name)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._stats = {
+            "waiting": 0,
+            "in_flight": 0,
+            "completed": 0,
+            "failed": 0,
+            "timed_out": 0,
+            "total_seconds": 0.0,
+        }
+
+    async def run(self, func: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs) in the pool and await its result
+
+        Args:
+            func: Blocking callable
+            timeout: Per-call timeout in seconds, defaults to the executor timeout
+
+        Raises:
+            asyncio.TimeoutError: If the call did not complete within the timeout
+        """
+        if timeout is None:
+            timeout = self.timeout
+        if self.timeout_kwarg and timeout and self.timeout_kwarg not in kwargs:
+            kwargs[self.timeout_kwarg] = timeout
+
+        call = functools.partial(func, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return await asyncio.wait_for(self._run(call), timeout)
+        except asyncio.TimeoutError:
+            self._update("timed_out", 1)
+            raise
+        finally:
+            # Includes time spent waiting for a slot, as seen by the request
+            record_upstream(self.name, time.perf_counter() - start)
+
+    async def _run(self, call: Callable) -> Any:
+        self._update("waiting", 1)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._update("waiting", -1)
+
+        self._update("in_flight", 1)
+        start = time.perf_counter()
+        outcome = None
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._pool, call)
+            outcome = "completed"
+            return result
+        except Exception:
+            outcome = "failed"
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self._semaphore.release()
+            with self._lock:
+                self._stats["in_flight"] -= 1
+                if outcome:
+                    self._stats[outcome] += 1
+                self._stats["total_seconds"] += elapsed
+            if elapsed > self.slow_call_threshold:
+                logger.warning(f"Slow {self.name} call {getattr(call.func, '__name__', call.func)} took {elapsed:.2f}s")
+
+    def _update(self, key: str, delta: int):
+        with self._lock:
+            self._stats[key] += delta
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, in-flight calls and outcome counters"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["max_concurrency"] = self.max_concurrency
+        return stats
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
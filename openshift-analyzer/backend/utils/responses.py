@@ -0,0 +1,38 @@
+import json
+from typing import Any, Optional, Type
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded with orjson when installed, compact stdlib json otherwise
+
+    Returned directly from a handler it skips FastAPI's response_model
+    validation and jsonable_encoder pass, so it is only meant for data that
+    already has the model's shape (apiserver JSON and the dicts built from
+    it). The route's response_model still defines the OpenAPI schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+def fast_json(content: Any, response: Response, model: Optional[Type[BaseModel]] = None) -> FastJSONResponse:
+    """
+    Build a FastJSONResponse carrying the headers set on the injected response
+
+    Args:
+        content: Dict or list of dicts to send
+        response: The handler's Response parameter (ETag, X-Continue-Token, ...)
+        model: Keep only this model's top-level fields, as response_model filtering would
+    """
+    if model is not None:
+        content = {name: content.get(name) for name in model.__fields__}
+    return FastJSONResponse(content, headers=response.headers)
@@ -0,0 +1,105 @@
+import asyncio
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable, Hashable, NamedTuple
+
+from utils.metrics import KUBE_READ_CALLS
+
+class FlightKey(NamedTuple):
+    """Identity of an upstream read; reads with equal keys return the same result"""
+    verb: str
+    gvr: str
+    namespace: Optional[str]
+    name: Optional[str]
+    query: Tuple[Tuple[str, str], ...]
+
+def kube_read_key(
+    verb: str,
+    resource_info: Dict[str, str],
+    namespace: Optional[str] = None,
+    name: Optional[str] = None,
+    query_params: Optional[List[Tuple[str, Any]]] = None,
+) -> FlightKey:
+    """
+    Build the key of a Kubernetes API read
+
+    Args:
+        verb: get or list
+        resource_info: API information (group, version, plural)
+        namespace: Optional namespace
+        name: Optional object name
+        query_params: Query parameters, compared in order
+    """
+    gvr = "/".join(part for part in (resource_info["group"], resource_info["version"], resource_info["plural"]) if part)
+    query = tuple((key, str(value)) for key, value in query_params or [])
+    return FlightKey(verb, gvr, namespace or None, name, query)
+
+def observe_kube_read(key: FlightKey, outcome: str):
+    """Count an apiserver read in the kube_read_calls metric"""
+    KUBE_READ_CALLS.labels(key.verb, key.gvr, outcome).inc()
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent upstream reads into one call
+
+    The first caller for a key starts the call as a task; callers arriving
+    with the same key while it runs await that task instead of issuing
+    their own, so N identical requests cost one apiserver round trip. The
+    key is forgotten as soon as the call finishes, so nothing is cached
+    beyond the lifetime of the call. A caller that is cancelled (client
+    disconnect) does not cancel the shared call for the others.
+
+    Results are shared between callers and must be treated as read-only.
+
+    Args:
+        enabled: When False every caller issues its own call
+        observe: Called with the key and "issued" or "coalesced" for every caller
+    """
+
+    def __init__(self, enabled: bool = True, observe: Optional[Callable[[Any, str], None]] = observe_kube_read):
+        self.enabled = enabled
+        self.observe = observe
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._stats = {"issued": 0, "coalesced": 0}
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Await func(*args, **kwargs), or the identical call already in flight for key
+
+        Returns:
+            The result of the shared call; its exception is raised to every caller
+        """
+        if not self.enabled:
+            self._count(key, "issued")
+            return await func(*args, **kwargs)
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._done(key, done))
+            self._count(key, "issued")
+        else:
+            self._count(key, "coalesced")
+
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception as retrieved when every caller has gone away
+        if not task.cancelled():
+            task.exception()
+
+    def _count(self, key: Hashable, outcome: str):
+        self._stats[outcome] += 1
+        if self.observe is not None:
+            self.observe(key, outcome)
+
+    def stats(self) -> Dict[str, Any]:
+        """Issued and coalesced call counts and calls currently in flight"""
+        requested = self._stats["issued"] + self._stats["coalesced"]
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self._in_flight),
+            **self._stats,
+            "coalesced_ratio": self._stats["coalesced"] / requested if requested else 0.0,
+        }